@@ -6,6 +6,9 @@ from functools import wraps
 import random
 import logging
 
+# -- third party --
+import msgpack
+
 # -- own --
 
 
@@ -27,6 +30,13 @@ def server_side_only(f):
 
 class AccountBase(object):
 
+    _packed = None
+
+    def __setattr__(self, k, v):
+        # other is replaced as a whole when refreshed, never modified in place
+        object.__setattr__(self, k, v)
+        k != '_packed' and object.__setattr__(self, '_packed', None)
+
     @classmethod
     def parse(cls, data):
         acc = cls()
@@ -38,6 +48,21 @@ class AccountBase(object):
     def __data__(self):
         return ['forum', self.userid, self.username, self.other]
 
+    def __packed__(self):
+        p = self._packed
+        if p is None:
+            from endpoint import Endpoint
+            p = self._packed = msgpack.packb(self.__data__(), default=Endpoint._default, use_bin_type=True)
+
+        return p
+
+    @classmethod
+    def flush_credits(cls):
+        '''
+        Write pending add_credit() results now
+        '''
+        pass
+
     @classmethod
     def build_npc_account(cls, name):
         acc = cls()
@@ -14,7 +14,6 @@ import gevent
 from account.base import AccountBase, server_side_only
 from utils import password_hash
 from db import transactional, current_session
-from utils import log_failure
 from db import transactional
 
 
@@ -22,6 +21,14 @@ from db import transactional
 try_counter = itertools.count(10032).next
 log = logging.getLogger('forum_integration')
 
+CREDIT_COLUMNS = {
+    # type: updated in (DiscuzMemberCount, User), same as Account.add_user_credit
+    'jiecao': (True, True),
+    'games':  (True, True),
+    'drops':  (True, True),
+    'ppoint': (False, True),
+}
+
 
 def md5(s):
     return hashlib.md5(s).hexdigest()
@@ -262,17 +269,15 @@ class Account(AccountBase):
 
     @server_side_only
     def add_credit(self, lst):
-        if self.is_maoyu() < 0:
+        if self.is_maoyu():
             return
 
-        @gevent.spawn
-        @log_failure(log)
-        @transactional()
-        def worker():
-            uid = self.userid
-            user = self.find(uid)
-            self.add_user_credit(user, lst)
-            self.refresh()
+        ledger.add(self, lst)
+
+    @classmethod
+    @server_side_only
+    def flush_credits(cls):
+        ledger.flush()
 
     @server_side_only
     def is_maoyu(self):
@@ -296,3 +301,84 @@ class Account(AccountBase):
     @server_side_only
     def validate_by_cookie_pwd(user, password):
         return user.dz_member.password == password
+
+
+class CreditLedger(object):
+    '''
+    Write-behind accumulator for Account.add_credit.
+
+    Credits are summed per user in memory and written every FLUSH_INTERVAL
+    seconds in one transaction, users getting the same amount of the same
+    credit share one UPDATE. Accounts are refreshed from the updated rows.
+    A failed flush puts the amounts back for the next one.
+    '''
+
+    FLUSH_INTERVAL = 5
+
+    def __init__(self):
+        self.pending = {}  # uid -> (account, {type: amount})
+        self.flusher = None
+
+    def add(self, acc, lst):
+        _, credits = self.pending.setdefault(acc.userid, (acc, defaultdict(int)))
+        for type, amount in lst:
+            if type in CREDIT_COLUMNS:
+                credits[type] += amount
+
+        self.pending[acc.userid] = (acc, credits)  # keep the most recent account object
+        if not self.flusher:
+            self.flusher = gevent.spawn(self._flusher)
+
+    def _flusher(self):
+        gevent.sleep(self.FLUSH_INTERVAL)
+        self.flusher = None  # credits added while writing get the next one
+        self.flush()
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return
+
+        try:
+            rows = self._write(pending)
+        except Exception:
+            log.exception('Error writing credits of %d users, will retry', len(pending))
+            for uid, (acc, credits) in pending.iteritems():
+                self.add(acc, credits.items())
+
+            return
+
+        for uid, jiecao, games, drops in rows:
+            acc, _ = pending[uid]
+            acc.other = defaultdict(
+                lambda: None, acc.other,
+                credits=jiecao, games=games, drops=drops,
+            )
+
+    @staticmethod
+    @transactional()
+    def _write(pending):
+        from db.models import DiscuzMemberCount, User
+
+        s = current_session()
+        groups = defaultdict(list)  # (type, amount) -> [uid, ...]
+        for uid, (acc, credits) in pending.iteritems():
+            for type, amount in credits.iteritems():
+                amount and groups[type, amount].append(uid)
+
+        for (type, amount), uids in groups.iteritems():
+            for model, updated in zip((DiscuzMemberCount, User), CREDIT_COLUMNS[type]):
+                if not updated:
+                    continue
+
+                key = model.uid if model is DiscuzMemberCount else model.id
+                col = getattr(model, type)
+                s.query(model).filter(key.in_(uids)).update(
+                    {col: col + amount}, synchronize_session=False,
+                )
+
+        C = DiscuzMemberCount
+        return s.query(C.uid, C.jiecao, C.games, C.drops).filter(C.uid.in_(list(pending))).all()
+
+
+ledger = CreditLedger()
@@ -6,6 +6,7 @@ import logging
 
 # -- third party --
 from gevent import Greenlet
+from gevent.event import Event
 from gevent.queue import Channel
 import gevent
 
@@ -30,11 +31,21 @@ class Server(Endpoint, Greenlet):
         self.ctlcmds = Channel()
         self.gamedata = Gamedata(recording=True)
 
+        # Server sends 'catchup' with its current synctag before game_started/observe_started
+        # when we join a game in progress, history follows in one bulk frame.
+        # Game picks it up and runs headless till the synctag, then sets caught_up.
+        self.catchup_synctag = None
+        self.caught_up = Event()
+        self.caught_up.set()
+
     def _run(self):
         while True:
             cmd, data = self.read()
             if cmd == 'gamedata':
                 self.gamedata.feed(data)
+            elif cmd == 'catchup':
+                self.catchup_synctag = data
+                self.caught_up.clear()
             else:
                 self.ctlcmds.put([cmd, data])
 
@@ -53,10 +64,11 @@ class Server(Endpoint, Greenlet):
         self.raw_write(encoded)
 
     def wait_till_live(self):
+        self.caught_up.wait()
         self.gamedata.wait_empty()
 
     def gamedata_piled(self):
-        return len(self.gamedata.gdqueue) > 60
+        return not self.caught_up.is_set() or len(self.gamedata) > 60
 
     def shutdown(self):
         self.kill()
@@ -35,6 +35,8 @@ class GameManager(Greenlet):
         self.last_replay    = None
         self.event_cb       = event_cb
         self.server_name    = 'OFFLINE'
+        self.lobby_version  = None
+        self.lobby_status   = {'games': {}, 'users': {}}
 
     def _run(self):
         self.link_exception(lambda *a: self.event_cb('server_dropped'))
@@ -216,6 +218,35 @@ class GameManager(Greenlet):
                 self.server_name = name
                 self.event_cb('server_connected', self)
 
+        @handler(None, None)
+        def lobby_snapshot(self, data):
+            ver, games, users = data
+            self.lobby_version = ver
+            self.lobby_status = {'games': dict(games), 'users': dict(users)}
+            self.event_cb('current_games', self.lobby_status['games'].values())
+            self.event_cb('current_users', self.lobby_status['users'].values())
+
+        @handler(None, None)
+        def lobby_delta(self, data):
+            base, ver, ops = data
+            if base != self.lobby_version:
+                # missed something, start over
+                log.info('Lobby status version gap: %s -> %s, have %s', base, ver, self.lobby_version)
+                self.lobby_version = None
+                Executive.get_lobbyinfo()
+                return
+
+            self.lobby_version = ver
+            status = self.lobby_status
+            for cat, k, v in ops:
+                if v is None:
+                    status[cat].pop(k, None)
+                else:
+                    status[cat][k] = v
+
+            for cat in set(op[0] for op in ops):
+                self.event_cb('current_' + cat, status[cat].values())
+
         @handler(None, None)
         def ping(self, _):
             Executive.pong()
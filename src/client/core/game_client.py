@@ -12,6 +12,7 @@ import gevent
 
 # -- own --
 from account import Account
+from client.core.endpoint import Server
 from game.base import GameEnded, InputTransaction, TimeLimitExceeded, AbstractPlayer
 from utils import BatchList
 import game.base
@@ -65,7 +66,7 @@ def user_input(players, inputlet, timeout=25, type='single', trans=None):
         for p in players:
             g.emit_event('user_input_start', (trans, ilets[p]))
 
-        if g.me in players:  # me involved
+        if g.me in players and not g.catchup_synctag:  # me involved, and not answered already
             if not g.me.is_observer:  # Not observer or other things
                 inputproc = gevent.spawn(input_func, synctags[g.me])
 
@@ -148,7 +149,13 @@ class TheChosenOne(game.base.AbstractPlayer):
         # It's me, server will tell me what the hell these is.
         g = Game.getgame()
         st = g.get_synctag()
-        _, raw_data = self.server.gexpect('Sync:%d' % st)
+        batch = g.sync_batch
+        if st not in batch:
+            # server batches reveals, this is the first one of the next batch
+            _, l = self.server.gexpect('Sync:%d' % st)
+            batch.update(l)
+
+        raw_data = batch.pop(st)
         if isinstance(obj_list, (list, tuple)):
             for o, rd in zip(obj_list, raw_data):
                 o.sync(rd)
@@ -221,14 +228,28 @@ class Game(Greenlet, game.base.Game):
         self.game_items = {}
 
         self._my_user_input = (None, None)
+        self.sync_batch = {}  # synctag -> revealed data, see TheChosenOne.reveal
+        self.catchup_synctag = 0  # fast forwarding through history till this synctag
 
     def _run(g):
         g.synctag = 0
         Game.thegame = g
+
+        svr = g.me.server
+        if isinstance(svr, Server) and svr.catchup_synctag is not None:
+            g.catchup_synctag, svr.catchup_synctag = svr.catchup_synctag, None
+            log.info('Catching up to synctag %d', g.catchup_synctag)
+            g.catchup_synctag or svr.caught_up.set()
+
         try:
             g.process_action(g.bootstrap(g.game_params, g.game_items))
         except GameEnded:
             pass
+        finally:
+            # game ended or failed before catching up, don't leave the UI waiting
+            if g.catchup_synctag:
+                g.catchup_synctag = 0
+                svr.caught_up.set()
 
         assert g.ended
 
@@ -238,9 +259,17 @@ class Game(Greenlet, game.base.Game):
 
     def get_synctag(self):
         self.synctag += 1
+        if self.catchup_synctag and self.synctag >= self.catchup_synctag:
+            log.info('Caught up at synctag %d', self.synctag)
+            self.catchup_synctag = 0
+            self.me.server.caught_up.set()
+
         return self.synctag
 
     def pause(self, time):
+        if self.catchup_synctag:
+            return
+
         gevent.sleep(time)
 
     def _get_me(self):
@@ -23,6 +23,8 @@ import pyglet
 from client.core import Executive
 from client.ui.base import Control, Overlay
 from client.ui.base.interp import InterpDesc, LinearInterp
+from client.ui.listmodel import ListItem, ListModel
+from client.ui.markup import TextLog
 from client.ui.resloader import L
 from utils import flatten, inpoly, instantiate, pyperclip, rectv2f, rrectv2f, textsnap, imageurl2file
 from utils.stats import stats
@@ -1177,6 +1179,8 @@ class PlayerPortrait(Frame):
 
 
 class TextArea(Control):
+    # Paragraphs kept in the document, the oldest ones are trimmed
+    max_lines = 500
 
     def __init__(self, font=u'AncientPix', font_size=9, default_attrib={}, *args, **kwargs):
         Control.__init__(self, can_focus=True, *args, **kwargs)
@@ -1203,10 +1207,7 @@ class TextArea(Control):
         self.layout.x = 4
         self.layout.y = 4
 
-        self.pos_table = []
-        self.loc_table = []
-
-        self._text = u''
+        self.log = TextLog(self.document, self.default_attrib, self.max_lines)
 
         self.caret = pyglet.text.caret.Caret(self.layout)
 
@@ -1219,12 +1220,10 @@ class TextArea(Control):
         self.on_lostfocus()
 
     def _gettext(self):
-        return self._text
+        return self.log.text
 
     def _settext(self, text):
-        self._text = u''
-        self.pos_table = []
-        self.loc_table = []
+        self.log.reset()
         self.caret.mark = None
         l = self.layout
         l.begin_update()
@@ -1233,107 +1232,18 @@ class TextArea(Control):
         # l.end_update()  # self.append(text) will call it
 
     def append(self, text):
-        attrib = dict(self.default_attrib)
-        doc = self.document
-        pos = len(self._text)
-
-        def set_attrib(entry, val):
-            def scanner_cb(s, tok):
-                attrib[entry] = val
-            return scanner_cb
-
-        def shadowed_text(val):
-            def scanner_cb(s, tok):
-                attrib['color'] = (255, 255, 255, 255)
-                attrib['shadow'] = (2, ) + val
-            return scanner_cb
-
-        def restore(s, tok):
-            attrib.update(self.default_attrib)
-
-        def instext(s, tok):
-            tok = unicode(tok)
-            if s:
-                self.pos_table.append(pos + s.match.start())
-            else:
-                self.pos_table.append(pos + len(text) - len(tok))
-            self.loc_table.append(len(doc.text))
-            doc.insert_text(len(doc.text), tok, attrib)
-
-        def color(s, tok):
-            c = tok[2:]
-            color = (
-                int(c[0:2], 16),
-                int(c[2:4], 16),
-                int(c[4:6], 16),
-                int(c[6:8], 16),
-            )
-            attrib['color'] = color
-
-        def shadow(s, tok):
-            c = tok[3:]
-            shadow = (
-                int(tok[2]),
-                int(c[0:2], 16),
-                int(c[2:4], 16),
-                int(c[4:6], 16),
-                int(c[6:8], 16),
-            )
-            attrib['shadow'] = shadow
-
-        def hidden(s, tok):
-            color(s, '|c000000ff')
-            shadow(s, '|s2000000ff')
-
-        def insert_pipe(s, tok):
-            instext(s, '|')
-
-        import re
-        scanner = re.Scanner([
-            (r'[^|]+', instext),
-            (r'\|c[A-Fa-f0-9]{8}', color),
-            (r'\|s[12][A-Fa-f0-9]{8}', shadow),
-            (r'\|B', set_attrib('bold', True)),
-            (r'\|b', set_attrib('bold', False)),
-            (r'\|I', set_attrib('italic', True)),
-            (r'\|i', set_attrib('italic', False)),
-            (r'\|U', set_attrib('underline', (0, 0, 0, 255))),
-            (r'\|u', set_attrib('underline', None)),
-            (r'\|H', hidden),
-            (r'\|\|', insert_pipe),
-            (r'\|r', restore),
-
-            # shortcuts
-            (r'\|R', set_attrib('color', (0xff, 0x35, 0x35, 0xff))),
-            (r'\|G', set_attrib('color', (0x20, 0x80, 0x20, 0xff))),
-            (r'\|Y', set_attrib('color', (0xff, 0xff, 0x30, 0xff))),
-            (r'\|LB', set_attrib('color', (0x90, 0xdc, 0xe8, 0xff))),
-            (r'\|DB', set_attrib('color', (0x00, 0x00, 0x60, 0xff))),
-            (r'\|W', set_attrib('color', (0xff, 0xff, 0xff, 0xff))),
-
-            # for thbviewer
-            (r'\|!R', shadowed_text((0xff, 0x35, 0x35, 0xff))),
-            (r'\|!G', shadowed_text((0x20, 0x80, 0x20, 0xff))),
-            (r'\|!O', shadowed_text((0xff, 0xcc, 0x77, 0xff))),
-            (r'\|!B', shadowed_text((0x00, 0x00, 0x60, 0xff))),
-        ])
-
         l = self.layout
 
         bottom = (-l.view_y + l.height >= l.content_height)
         view_y = l.view_y
 
         l.begin_update()
-        toks, reminder = scanner.scan(text)
-        if reminder:
-            instext(None, reminder)
-
+        self.log.append(text)
         l.end_update()
         if bottom:
             l.view_y = -l.content_height
         else:
             l.view_y = view_y
-        self._text += text
 
     text = property(_gettext, _settext)
 
@@ -1375,24 +1285,10 @@ class TextArea(Control):
         return True
 
     def on_key_press(self, symbol, modifiers):
-        def get_pos(loc, left=True):
-            import bisect
-            if left:
-                bisect = bisect.bisect_left
-            else:
-                bisect = bisect.bisect_right
-
-            idx = bisect(self.loc_table, loc) - 1
-            if idx < 0: idx = 0
-
-            loc_diff = loc - self.loc_table[idx]
-
-            return self.pos_table[idx] + loc_diff, idx
-
         if modifiers & KEYMOD_MASK == key.MOD_CTRL:
             if symbol == key.A:
                 self.caret.position = 0
-                self.caret.mark = len(self.text)
+                self.caret.mark = len(self.log)
                 return pyglet.event.EVENT_HANDLED
 
             elif symbol == key.C:
@@ -1404,8 +1300,8 @@ class TextArea(Control):
 
         elif modifiers & KEYMOD_MASK == (key.MOD_CTRL | key.MOD_SHIFT):
             if symbol == key.C:
-                start = get_pos(self.layout.selection_start)[0]
-                end = get_pos(self.layout.selection_end)[0]
+                start = self.log.text_position(self.layout.selection_start)
+                end = self.log.text_position(self.layout.selection_end)
                 if start != end:
                     pyperclip.copy(self.text[start:end])
                 return pyglet.event.EVENT_HANDLED
@@ -1430,61 +1326,6 @@ class TextArea(Control):
         l.end_update()
 
 
-class ListItem(object):
-    def __init__(self, p, i, color=(0, 0, 0, 255)):
-        self.parent = p
-        self.color = color
-        n = len(p.columns)
-        self.labels = [None] * n
-        self._data = [''] * n
-        self.idx = i
-
-    def _set_data(self, val):
-        val = list(val)
-        p = self.parent
-        n = len(p.columns)
-        val = (val + n*[''])[:n]
-        for i, v in enumerate(val):
-            self[i] = unicode(v)
-        self._update_labels()
-
-    def _get_data(self):
-        return self._data
-
-    data = property(_get_data, _set_data)
-
-    def _update_labels(self):
-        p = self.parent
-        p.need_refresh = True
-        ox = 2
-        for (_, w), lbl in zip(p.columns, self.labels):
-            lbl.begin_update()
-            lbl.x, lbl.y = ox, -2 - self.idx * self.parent.line_height
-            lbl.color = self.color
-            lbl.end_update()
-            ox += w
-
-    def __getitem__(self, index):
-        if isinstance(index, basestring):
-            index = self.parent.col_lookup[index]
-        return self._data[index]
-
-    def __setitem__(self, index, val):
-        from pyglet.text import Label
-        p = self.parent
-        if isinstance(index, basestring):
-            index = p.col_lookup[index]
-        self._data[index] = val
-        c = p.color.text + (255,)
-        o = self.labels[index]
-        if o: o.delete()
-        self.labels[index] = Label(
-            text=val, font_name='AncientPix', font_size=9,
-            anchor_x='left', anchor_y='top', color=c,
-            batch=p.batch,
-        )
-
-
 class ListHeader(object):
     def __init__(self, p):
         self.parent = p
@@ -1522,16 +1363,24 @@ class ListView(Control):
     header_height = 25
     line_height = 17
 
+    # Only rows inside the viewport have labels. Rows are kept in a
+    # ListModel, keyed updates (upsert/retain) leave unchanged rows alone,
+    # and draw() asks the model what to build, drop, move or redraw.
+
     def __init__(self, color=Colors.green, *a, **k):
         Control.__init__(self, *a, **k)
         self.color = color
-        self.items = []
+        self.model = ListModel(self.line_height)
         self.columns = []
         self.col_lookup = {}
         self._view_y = 0
         self.batch = pyglet.graphics.Batch()
-        self.cur_select = None
-        self.need_refresh = True
+        self.labels = {}  # key -> [Label, ...] of rows in view
+        self.cur_select = None  # key of the selected row
+
+    @property
+    def items(self):
+        return self.model.items
 
     def set_columns(self, cols):
         # [('name1', 20), ('name2', 30)]
@@ -1548,23 +1397,40 @@ class ListView(Control):
             li = val
             li.parent = self
         elif isinstance(val, (list, tuple)):
-            li = self.li_class(self, len(self.items))
-            li.color = color
+            li = self.li_class(self, color=color)
             li.data = val
-        self.items.append(li)
+        return self.model.add(li)
+
+    def upsert(self, key, val, color=(0, 0, 0, 255)):
+        '''
+        Update the row with key in place, or append a new one
+        '''
+        li = self.model.get(key)
+        if li is None:
+            li = self.model.add(self.li_class(self, key, color))
+        else:
+            li.set_color(color)
+
+        li.data = val
         return li
 
+    def remove(self, key):
+        return self.model.remove(key)
+
+    def retain(self, keys):
+        self.model.retain(keys)
+
+    def sort(self, key):
+        self.model.sort(key)
+
     def clear(self):
-        self.items = []
+        self.model.clear()
         self.cur_select = None
-        self.batch = pyglet.graphics.Batch()
 
     def _set_view_y(self, val):
-        sum_h = len(self.items) * self.line_height
-        h = self.height - self.header_height
-        if val < 0: val = 0
-        bot_lim = max(sum_h - h, 0)
+        bot_lim = self.model.max_view_y(self.height - self.header_height)
         if val > bot_lim: val = bot_lim
+        if val < 0: val = 0
         self._view_y = val
 
     def _get_view_y(self):
@@ -1572,7 +1438,43 @@ class ListView(Control):
 
     view_y = property(_get_view_y, _set_view_y)
 
+    def _row_labels(self, i, li):
+        from pyglet.text import Label
+        ox, y = 2, -2 - i * self.line_height
+        l = []
+        for (_, w), text in zip(self.columns, li.data):
+            l.append(Label(
+                text=text, font_name='AncientPix', font_size=9,
+                anchor_x='left', anchor_y='top', color=li.color,
+                x=ox, y=y, batch=self.batch,
+            ))
+            ox += w
+
+        return l
+
+    def _layout(self):
+        self.view_y = self.view_y  # clamp, rows may be gone
+        labels = self.labels
+        build, drop, move, redraw = self.model.layout(self.view_y, self.height - self.header_height)
+
+        for k in drop:
+            for lbl in labels.pop(k, ()):
+                lbl.delete()
+
+        for i, li in redraw:
+            for lbl in labels.pop(li.key, ()):
+                lbl.delete()
+
+        for i, li in build + redraw:
+            labels[li.key] = self._row_labels(i, li)
+
+        for i, li in move:
+            y = -2 - i * self.line_height
+            for lbl in labels[li.key]:
+                lbl.y = y
+
     def draw(self):
+        self._layout()
         glColor3f(1, 1, 1)
 
         hh = self.header_height
@@ -1586,7 +1488,7 @@ class ListView(Control):
         ax, ay, w, h = map(int, (ax, ay, self.width, client_height))
         glScissor(ax, ay, w, h)
         self.batch.draw()
-        cs = self.cur_select
+        cs = self.model.position(self.cur_select)
         if cs is not None:
             c = Colors.get4f(self.color.light)
             glColor4f(c[0], c[1], c[2], 0.5)
@@ -1602,21 +1504,16 @@ class ListView(Control):
 
     def on_mouse_scroll(self, x, y, dx, dy):
         self.view_y -= dy * 40
-        self.need_refresh = True
 
     def _mouse_click(self, evt_type, x, y, button, modifier):
         h = self.height - self.header_height
         lh, vy = self.line_height, self.view_y
         i = int((h + vy - y) / lh)
-        n = len(self.items)
+        n = len(self.model)
         if 0 <= i < n:
-            # cs = self.cur_select
-            # if cs is not None and 0 <= cs < n:
-            #     item = self.items[cs]
-            self.dispatch_event(evt_type, self.items[i])
-            self.cur_select = i
-            # item = self.items[i]
-            self.need_refresh = True
+            item = self.model[i]
+            self.dispatch_event(evt_type, item)
+            self.cur_select = item.key
 
     on_mouse_click = lambda self, *a: self._mouse_click('on_item_select', *a)
     on_mouse_dblclick = lambda self, *a: self._mouse_click('on_item_dblclick', *a)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+# -- own --
+
+# -- code --
+# Headless part of ListView: rows, their order, and which of them are
+# inside the viewport. Nothing in here touches pyglet, ListView asks
+# layout() what changed and only builds labels for rows in view.
+
+
+class ListItem(object):
+    def __init__(self, p, key=None, color=(0, 0, 0, 255)):
+        self.parent = p
+        self.key    = key
+        self.color  = color
+        self._data  = [''] * len(p.columns)
+
+    def _set_data(self, val):
+        n = len(self._data)
+        val = [unicode(v) for v in (list(val) + n*[''])[:n]]
+        if val != self._data:
+            self._data = val
+            self.parent.model.changed(self)
+
+    def _get_data(self):
+        return self._data
+
+    data = property(_get_data, _set_data)
+
+    def __getitem__(self, index):
+        if isinstance(index, basestring):
+            index = self.parent.col_lookup[index]
+        return self._data[index]
+
+    def __setitem__(self, index, val):
+        if isinstance(index, basestring):
+            index = self.parent.col_lookup[index]
+
+        val = unicode(val)
+        if self._data[index] != val:
+            self._data[index] = val
+            self.parent.model.changed(self)
+
+    def set_color(self, color):
+        if self.color != color:
+            self.color = color
+            self.parent.model.changed(self)
+
+
+class ListModel(object):
+    '''
+    Rows of a list in display order, addressable by key.
+
+    Rows appended without a key are keyed by themselves. layout() compares
+    the rows inside the viewport with the ones it reported last time and
+    tells what to build, drop, move or redraw.
+    '''
+
+    def __init__(self, line_height):
+        self.line_height = line_height
+        self.items  = []     # display order
+        self.lookup = {}     # key -> item
+        self._pos   = None   # key -> index, rebuilt lazily
+        self.dirty  = set()  # keys changed since the last layout
+        self.shown  = {}     # key -> index, as of the last layout
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+    def get(self, key):
+        return self.lookup.get(key)
+
+    def position(self, key):
+        if self._pos is None:
+            self._pos = {item.key: i for i, item in enumerate(self.items)}
+
+        return self._pos.get(key)
+
+    def add(self, item):
+        if item.key is None:
+            item.key = item
+
+        assert item.key not in self.lookup, 'Duplicate key %r' % (item.key,)
+        self.lookup[item.key] = item
+        self.items.append(item)
+        self.dirty.add(item.key)
+        self._pos = None
+        return item
+
+    def remove(self, key):
+        item = self.lookup.pop(key, None)
+        if item:
+            self.items.remove(item)
+            self.dirty.discard(key)
+            self._pos = None
+
+        return item
+
+    def retain(self, keys):
+        '''
+        Remove every row whose key is not in keys
+        '''
+        keys = set(keys)
+        self.items = [i for i in self.items if i.key in keys]
+        for k in [k for k in self.lookup if k not in keys]:
+            del self.lookup[k]
+            self.dirty.discard(k)
+
+        self._pos = None
+
+    def clear(self):
+        self.items = []
+        self.lookup = {}
+        self._pos = None
+        self.dirty.clear()
+
+    def sort(self, key):
+        self.items.sort(key=key)
+        self._pos = None
+
+    def changed(self, item):
+        self.dirty.add(item.key)
+
+    def max_view_y(self, height):
+        return max(len(self.items) * self.line_height - height, 0)
+
+    def visible(self, view_y, height):
+        '''
+        Index range [first, last) of rows intersecting the viewport
+        '''
+        lh = self.line_height
+        first = max(int(view_y // lh), 0)
+        last = min(int((view_y + height) // lh) + 1, len(self.items))
+        return first, max(first, last)
+
+    def layout(self, view_y, height):
+        '''
+        Returns (build, drop, move, redraw):
+            build:  [(index, item), ...] rows entering the viewport
+            drop:   [key, ...]           rows leaving it or removed
+            move:   [(index, item), ...] rows in view at another index
+            redraw: [(index, item), ...] rows in view with changed data
+        '''
+        first, last = self.visible(view_y, height)
+        now = {self.items[i].key: i for i in xrange(first, last)}
+        prev, dirty = self.shown, self.dirty
+
+        drop = [k for k in prev if k not in now]
+        build, move, redraw = [], [], []
+        for k, i in now.iteritems():
+            item = self.lookup[k]
+            if k not in prev:
+                build.append((i, item))
+            elif k in dirty:
+                redraw.append((i, item))
+            elif prev[k] != i:
+                move.append((i, item))
+
+        self.shown = now
+        self.dirty = set()
+        return build, drop, move, redraw
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+from collections import deque
+import bisect
+import re
+
+# -- third party --
+# -- own --
+
+# -- code --
+# TextArea markup:
+#   |cRRGGBBAA  color            |s[12]RRGGBBAA  shadow
+#   |B |b  bold on/off           |I |i  italic on/off
+#   |U |u  underline on/off      |H  hidden (black on black)
+#   |r  back to defaults         ||  a literal |
+#   |R |G |Y |LB |DB |W  color shortcuts
+#   |!R |!G |!O |!B  shadowed text, for thbviewer
+# Anything else starting with | ends the markup, the rest is taken literally.
+
+MARKUP_RE = re.compile(r'([^|]+)|\|(c[A-Fa-f0-9]{8}|s[12][A-Fa-f0-9]{8}|LB|DB|![RGOB]|[BbIiUuHrRGYW|])')
+
+MARKUP_ATTRIBS = {
+    'B':  ('bold', True),
+    'b':  ('bold', False),
+    'I':  ('italic', True),
+    'i':  ('italic', False),
+    'U':  ('underline', (0, 0, 0, 255)),
+    'u':  ('underline', None),
+    'R':  ('color', (0xff, 0x35, 0x35, 0xff)),
+    'G':  ('color', (0x20, 0x80, 0x20, 0xff)),
+    'Y':  ('color', (0xff, 0xff, 0x30, 0xff)),
+    'LB': ('color', (0x90, 0xdc, 0xe8, 0xff)),
+    'DB': ('color', (0x00, 0x00, 0x60, 0xff)),
+    'W':  ('color', (0xff, 0xff, 0xff, 0xff)),
+}
+
+MARKUP_SHADOWED = {
+    '!R': (0xff, 0x35, 0x35, 0xff),
+    '!G': (0x20, 0x80, 0x20, 0xff),
+    '!O': (0xff, 0xcc, 0x77, 0xff),
+    '!B': (0x00, 0x00, 0x60, 0xff),
+}
+
+
+def _rgba(c):
+    return tuple(int(c[i:i+2], 16) for i in (0, 2, 4, 6))
+
+
+def markup_runs(text, attrib, default):
+    '''
+    Yields (offset in text, run of plain text) and keeps attrib updated,
+    attrib holds the style of a run when it is yielded.
+    '''
+    match = MARKUP_RE.match
+    pos, n = 0, len(text)
+    while pos < n:
+        m = match(text, pos)
+        if not m:
+            yield pos, text[pos:]
+            return
+
+        start, pos = pos, m.end()
+        run, code = m.groups()
+        if run is not None:
+            yield start, run
+        elif code == '|':
+            yield start, u'|'
+        elif code == 'r':
+            attrib.update(default)
+        elif code[0] == 'c':
+            attrib['color'] = _rgba(code[1:])
+        elif code[0] == 's':
+            attrib['shadow'] = (int(code[1]), ) + _rgba(code[2:])
+        elif code == 'H':
+            attrib['color'] = (0, 0, 0, 255)
+            attrib['shadow'] = (2, 0, 0, 0, 255)
+        elif code in MARKUP_SHADOWED:
+            attrib['color'] = (255, 255, 255, 255)
+            attrib['shadow'] = (2, ) + MARKUP_SHADOWED[code]
+        else:
+            k, v = MARKUP_ATTRIBS[code]
+            attrib[k] = v
+
+
+class TextLog(object):
+    '''
+    Marked up text appended to a pyglet FormattedDocument, keeping at most
+    max_lines paragraphs: the oldest ones are deleted from the document as
+    new ones come in. Positions are counted from the last reset() and never
+    shift, trimmed text just moves the base.
+    '''
+
+    def __init__(self, document, default_attrib, max_lines=500):
+        self.document       = document
+        self.default_attrib = default_attrib
+        self.max_lines      = max_lines
+        self.reset()
+
+    def reset(self):
+        self.raw       = deque()  # (position in markup, appended markup)
+        self.raw_len   = 0
+        self.doc_len   = 0
+        self.trimmed   = 0        # document characters trimmed
+        self.breaks    = deque()  # document positions of newlines
+        self.pos_table = deque()  # markup position of each run
+        self.loc_table = deque()  # document position of each run
+        self.tail      = {}       # style at the end of the document
+
+    @property
+    def text(self):
+        return u''.join(t for _, t in self.raw)
+
+    def __len__(self):
+        return self.doc_len - self.trimmed
+
+    def append(self, text):
+        attrib = dict(self.default_attrib)
+        doc = self.document
+        pos = self.raw_len
+
+        for off, run in markup_runs(text, attrib, self.default_attrib):
+            run = unicode(run)
+            loc = self.doc_len
+            self.pos_table.append(pos + off)
+            self.loc_table.append(loc)
+            # inserted text takes the style before it, every attribute
+            # set costs a pass over that attribute's style runs
+            tail = self.tail
+            changed = {k: v for k, v in attrib.iteritems() if k not in tail or tail[k] != v}
+            tail.update(changed)
+            doc.insert_text(loc - self.trimmed, run, changed or None)
+            self.doc_len += len(run)
+
+            i = run.find(u'\n')
+            while i >= 0:
+                self.breaks.append(loc + i)
+                i = run.find(u'\n', i + 1)
+
+        self.raw.append((pos, text))
+        self.raw_len += len(text)
+        self._trim()
+
+    def _trim(self):
+        breaks = self.breaks
+        if len(breaks) <= self.max_lines:
+            return
+
+        while len(breaks) > self.max_lines:
+            cut = breaks.popleft() + 1
+
+        self.document.delete_text(0, cut - self.trimmed)
+        self.trimmed = cut
+
+        # keep the run the cut falls in, and the markup it came from
+        pt, lt = self.pos_table, self.loc_table
+        while len(lt) > 1 and lt[1] <= cut:
+            pt.popleft()
+            lt.popleft()
+
+        raw = self.raw
+        while len(raw) > 1 and raw[1][0] <= pt[0]:
+            raw.popleft()
+
+    def text_position(self, loc, left=True):
+        '''
+        Document position -> position in self.text
+        '''
+        if not self.loc_table:
+            return 0
+
+        loc += self.trimmed
+        if left:
+            idx = bisect.bisect_left(self.loc_table, loc) - 1
+        else:
+            idx = bisect.bisect_right(self.loc_table, loc) - 1
+
+        if idx < 0: idx = 0
+
+        loc_diff = loc - self.loc_table[idx]
+
+        return self.pos_table[idx] + loc_diff - self.raw[0][0]
@@ -880,9 +880,6 @@ class LobbyScreen(Screen):
                 from thb import modes
                 current_games = args[0]
                 glist = self.gamelist
-                glist.clear()
-
-                current_games.sort(key=lambda gi: (gi['started'], gi['id']))
 
                 for gi in current_games:
                     gcls = modes.get(gi['type'], None)
@@ -893,7 +890,7 @@ class LobbyScreen(Screen):
                         gname = u'未知游戏类型'
                         n_persons = 0
 
-                    li = glist.append([
+                    li = glist.upsert(gi['id'], [
                         gi['id'],
                         gi['name'],
                         gname,
@@ -904,6 +901,9 @@ class LobbyScreen(Screen):
                     li.gtype = gi['type']
                     li.started = gi['started']
 
+                glist.retain([gi['id'] for gi in current_games])
+                glist.sort(key=lambda li: (li.started, li.game_id))
+
     class OnlineUsers(Frame):
         def __init__(self, parent):
             Frame.__init__(
@@ -912,49 +912,40 @@ class LobbyScreen(Screen):
                 x=750, y=220, width=240, height=420,
                 bot_reserve=10,
             )
-            self.box = TextArea(
+            ul = self.userlist = ListView(
                 parent=self, x=2, y=12, width=240-4, height=420-24-2-10
             )
+            ul.set_columns([
+                (u'玩家',  110),
+                (u'UID',   56),
+                (u'状态',  70),
+            ])
 
         def on_message(self, _type, *args):
             lookup = {
-                'hang':       u'|c0000ffff游戏大厅|r',
-                'ingame':     u'|G游戏中|r',
-                'inroomwait': u'|R在房间中|r',
-                'ready':      u'|c9f5f9fff准备状态|r',
-                'observing':  u'|LB观战中|r',
+                'hang':       (u'游戏大厅', (0x00, 0x00, 0xff, 0xff)),
+                'ingame':     (u'游戏中',   (0x20, 0x80, 0x20, 0xff)),
+                'inroomwait': (u'在房间中', (0xff, 0x35, 0x35, 0xff)),
+                'ready':      (u'准备状态', (0x9f, 0x5f, 0x9f, 0xff)),
+                'observing':  (u'观战中',   (0x90, 0xdc, 0xe8, 0xff)),
             }
             if _type == 'current_users':
                 users = args[0]
-                box = self.box
-                box.text = u'\u200b'
+                ul = self.userlist
 
-                n_users = len(users)
-
-                self.caption = u'当前在线玩家：%d' % n_users
+                self.caption = u'当前在线玩家：%d' % len(users)
                 self.update()
-                rst = []
-
-                if n_users > 130:
-                    users = [u for u in users if u['state'] != 'ingame']
-                    rst.append(u'%s 个|G游戏中|r的玩家' % (n_users - len(users)))
-                    rst.append(u'')
 
+                uids = []
                 for u in users:
-                    u['account'] = Account.parse(u['account'])
-
-                users.sort(key=lambda u: u['account'].userid)
-
-                for u in users:
-                    acc = u['account']
-                    username = acc.username.replace('|', '||')
-                    rst.append(u'%s([|c9100ffff%s|r], %s)' % (
-                        username,
-                        acc.userid,
-                        lookup.get(u['state'], u['state']),
-                    ))
-
-                box.append('\n'.join(rst))
+                    acc = Account.parse(u['account'])
+                    state, color = lookup.get(u['state'], (u['state'], (0, 0, 0, 255)))
+                    li = ul.upsert(acc.userid, [acc.username, acc.userid, state], color=color)
+                    li.userid = acc.userid
+                    uids.append(acc.userid)
+
+                ul.retain(uids)
+                ul.sort(key=lambda li: li.userid)
 
     class NoticeBox(Frame):
         def __init__(self, parent):
@@ -9,7 +9,9 @@ import zlib
 
 # -- third party --
 from gevent import socket
+from gevent.event import Event
 from gevent.lock import RLock
+import gevent
 import msgpack
 
 # -- own --
@@ -34,7 +36,11 @@ class Endpoint(object):
     FMT_BULK_COMPRESSED = 2
     FMT_RAW_JSON        = 3
 
-    def __init__(self, sock, address):
+    # queued endpoints only
+    SENDQ_HIGH_WATERMARK = 4 * 1024 * 1024  # bytes pending before giving up on the peer
+    SENDQ_LINGER         = 5                # seconds to flush pending data on close
+
+    def __init__(self, sock, address, queued=False):
         sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         sock.read       = sock.recv
         sock.write      = sock.sendall
@@ -46,6 +52,14 @@ class Endpoint(object):
         self.link_state = 'connected'  # or disconnected
         self.recv_buf   = deque()
 
+        # Queued endpoints never block the writer, a greenlet
+        # drains the queue with one sendall per batch.
+        self.sendq       = deque() if queued else None
+        self.sendq_bytes = 0  # pending + in flight
+        self.sendq_peak  = 0
+        self.sendq_event = Event()
+        self.writer      = gevent.spawn(self._writer) if queued else None
+
     def __repr__(self):
         return '%s:%s:%s' % (
             self.__class__.__name__,
@@ -55,8 +69,7 @@ class Endpoint(object):
 
     @staticmethod
     def encode(p, format=FMT_PACKED):
-        def default(o):
-            return o.__data__() if hasattr(o, '__data__') else repr(o)
+        default = Endpoint._default
 
         if format == Endpoint.FMT_PACKED:
             return msgpack.packb([Endpoint.FMT_PACKED, p], default=default, use_bin_type=True)
@@ -69,6 +82,49 @@ class Endpoint(object):
         else:
             raise Exception('WTF?!')
 
+    @staticmethod
+    def _default(o):
+        return o.__data__() if hasattr(o, '__data__') else repr(o)
+
+    @staticmethod
+    def pack_data(o):
+        '''
+        msgpack encoded o.__data__(), objects implementing __packed__ may have it cached
+        '''
+        packed = getattr(o, '__packed__', None)
+        if packed:
+            return packed()
+
+        return msgpack.packb(o.__data__(), default=Endpoint._default, use_bin_type=True)
+
+    @staticmethod
+    def encode_spliced(cmd, o):
+        '''
+        Same as encode([cmd, o]), o's packed data is spliced in without re-encoding
+        '''
+        pk = msgpack.Packer(use_bin_type=True)
+        return ''.join([
+            pk.pack_array_header(2),
+            pk.pack(Endpoint.FMT_PACKED),
+            pk.pack_array_header(2),
+            pk.pack(cmd),
+            Endpoint.pack_data(o),
+        ])
+
+    @staticmethod
+    def bulk_encoded(packets):
+        '''
+        Merge FMT_PACKED encoded packets into one FMT_BULK_COMPRESSED frame, without re-encoding
+        '''
+        prefix = msgpack.packb([Endpoint.FMT_PACKED, None])[:-1]  # array header + format
+        pk = msgpack.Packer(use_bin_type=True)
+        l = [pk.pack_array_header(len(packets))]
+        for s in packets:
+            assert s.startswith(prefix)
+            l.append(s[len(prefix):])
+
+        return pk.pack([Endpoint.FMT_BULK_COMPRESSED, zlib.compress(''.join(l))])
+
     @classmethod
     def decode(cls, s):
         return cls.decode_packet(msgpack.unpackb(s, encoding='utf-8'))[1]
@@ -98,6 +154,10 @@ class Endpoint(object):
         if self.link_state == 'connected':
             if Endpoint.ENDPOINT_DEBUG:
                 log.debug("SEND>> %s" % self.decode(s))
+
+            if self.sendq is not None:
+                return self._enqueue(s)
+
             try:
                 with self.writelock:
                     self.sock.sendall(s)
@@ -106,6 +166,47 @@ class Endpoint(object):
         else:
             return False
 
+    def _enqueue(self, s):
+        self.sendq.append(s)
+        self.sendq_bytes += len(s)
+        self.sendq_peak = max(self.sendq_peak, self.sendq_bytes)
+
+        if self.sendq_bytes > self.SENDQ_HIGH_WATERMARK:
+            log.info('%r: %d bytes pending, dropping connection', self, self.sendq_bytes)
+            self.sendq.clear()
+            self.close()
+            self.sock.close()
+            return False
+
+        self.sendq_event.set()
+
+    def _flush(self):
+        q = self.sendq
+        while q:
+            data = ''.join(q)
+            q.clear()
+            with self.writelock:
+                self.sock.sendall(data)
+
+            self.sendq_bytes -= len(data)
+
+    def _writer(self):
+        try:
+            while self.link_state == 'connected':
+                self.sendq_event.wait()
+                self.sendq_event.clear()
+                self._flush()
+
+            self._flush()
+
+        except IOError:
+            pass
+
+        finally:
+            self.link_state = 'disconnected'
+            self.sendq.clear()
+            self.sock.close()
+
     def write(self, p, format=FMT_PACKED):
         '''
         Send json encoded packet
@@ -115,7 +216,12 @@ class Endpoint(object):
     def close(self):
         if not self.link_state == 'disconnected':
             self.link_state = 'disconnected'
-            self.sock.close()
+            if self.writer is not None:
+                # writer flushes what's left then closes the socket
+                self.sendq_event.set()
+                gevent.spawn_later(self.SENDQ_LINGER, self.sock.close)
+            else:
+                self.sock.close()
 
     def read(self):
         if self.link_state != 'connected':
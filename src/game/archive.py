@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+import gzip
+import json
+import logging
+import struct
+import zlib
+
+# -- third party --
+import msgpack
+
+# -- own --
+from endpoint import Endpoint
+
+# -- code --
+log = logging.getLogger('game.archive')
+
+# File layout:
+#   MAGIC
+#   frame('H', msgpack(header))
+#   frame('C', zlib(record, record, ...))  # repeated
+#   frame('F', msgpack(footer))
+#   struct('>Q', offset of footer frame) + MAGIC_END
+#
+# frame = type(1 byte) + struct('>I', len(payload)) + payload
+# record = struct('>I', len(msgpack(rec))) + msgpack(rec)
+#
+# Chunks are self delimited, an archive cut off by a crash is readable
+# up to the last complete chunk.
+
+MAGIC     = 'THBARC1\n'
+MAGIC_END = 'THBAEND\n'
+
+REC_GAMEDATA      = 'gamedata'       # ['gamedata', player index, encoded packet sent to that player]
+REC_USER_GAMEDATA = 'user_gamedata'  # ['user_gamedata', player index, tag, data]
+
+_frame_hdr = struct.Struct('>cI')
+_rec_hdr = struct.Struct('>I')
+_trailer = struct.Struct('>Q')
+
+
+def _pack(o):
+    return msgpack.packb(o, use_bin_type=True)
+
+
+def _unpack(s):
+    return msgpack.unpackb(s, encoding='utf-8')
+
+
+class ArchiveWriter(object):
+    '''
+    Append only game archive, records are buffered and
+    compressed in chunks of about chunk_size bytes.
+    '''
+
+    def __init__(self, f, header, chunk_size=64 * 1024):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = []
+        self.buf_size = 0
+        self.chunks = []  # [offset, n records]
+        self.nrecords = 0
+        self.closed = False
+
+        f.write(MAGIC)
+        self._write_frame('H', _pack(header))
+        f.flush()
+
+    def _write_frame(self, kind, payload):
+        offset = self.f.tell()
+        self.f.write(_frame_hdr.pack(kind, len(payload)))
+        self.f.write(payload)
+        return offset
+
+    def append(self, rec):
+        assert not self.closed
+        s = _pack(rec)
+        self.buf.append(_rec_hdr.pack(len(s)) + s)
+        self.buf_size += len(s)
+        self.nrecords += 1
+
+        if self.buf_size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buf:
+            return
+
+        offset = self._write_frame('C', zlib.compress(''.join(self.buf)))
+        self.chunks.append([offset, len(self.buf)])
+        self.buf = []
+        self.buf_size = 0
+        self.f.flush()
+
+    def pending(self):
+        '''
+        Records not flushed to file yet
+        '''
+        return [_unpack(s[_rec_hdr.size:]) for s in self.buf]
+
+    def close(self, footer=None):
+        if self.closed:
+            return
+
+        self.flush()
+        footer = dict(footer or {})
+        footer['chunks'] = self.chunks
+        footer['records'] = self.nrecords
+        offset = self._write_frame('F', _pack(footer))
+        self.f.write(_trailer.pack(offset) + MAGIC_END)
+        self.f.close()
+        self.closed = True
+
+
+class ArchiveReader(object):
+    '''
+    Lazy reader of ArchiveWriter output.
+    Iterating yields records, decompressing one chunk at a time.
+    '''
+
+    def __init__(self, f):
+        self.f = f
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('Not a game archive')
+
+        kind, payload = self._read_frame()
+        assert kind == 'H'
+        self.header = _unpack(payload)
+        self.data_offset = f.tell()
+        self._footer = False
+
+    def _read_frame(self):
+        hdr = self.f.read(_frame_hdr.size)
+        if len(hdr) < _frame_hdr.size:
+            return None, None
+
+        kind, size = _frame_hdr.unpack(hdr)
+        payload = self.f.read(size)
+        if len(payload) < size:
+            log.warning('Truncated archive')
+            return None, None
+
+        return kind, payload
+
+    def close(self):
+        self.f.close()
+
+    @property
+    def footer(self):
+        '''
+        None if the archive is not closed properly (or still being written)
+        '''
+        if self._footer is False:
+            f = self.f
+            f.seek(0, 2)
+            self._footer = None
+            if f.tell() >= self.data_offset + _trailer.size + len(MAGIC_END):
+                f.seek(-(_trailer.size + len(MAGIC_END)), 2)
+                tail = f.read()
+                if tail.endswith(MAGIC_END):
+                    f.seek(_trailer.unpack(tail[:_trailer.size])[0])
+                    kind, payload = self._read_frame()
+                    self._footer = _unpack(payload) if kind == 'F' else None
+
+        return self._footer
+
+    def __iter__(self):
+        offset = self.data_offset
+        while True:
+            self.f.seek(offset)
+            kind, payload = self._read_frame()
+            if kind != 'C':
+                return
+
+            offset = self.f.tell()
+            data = zlib.decompress(payload)
+            i, n = 0, len(data)
+            while i < n:
+                size, = _rec_hdr.unpack_from(data, i)
+                i += _rec_hdr.size
+                yield _unpack(data[i:i + size])
+                i += size
+
+
+class LegacyArchiveReader(object):
+    '''
+    Reads the old gzipped json archives with the ArchiveReader interface.
+    '''
+
+    def __init__(self, f):
+        self.f = f
+        data = f.read().decode('utf-8').split('\n')
+        names = data.pop(0)[2:].split(', ')
+        version = data.pop(0).split(': ', 1)[-1]
+        gameid = int(data.pop(0).split()[-1])
+        data.pop(0)  # Time
+
+        mode, params, items, rndseed, usergdhist, gdhist = data
+        self.header = {
+            'names': names,
+            'version': version,
+            'gameid': gameid,
+            'mode': mode,
+            'params': json.loads(params),
+            'items': json.loads(items),
+            'rndseed': long(rndseed),
+        }
+        self.footer = None
+        self.usergdhist = usergdhist
+        self.gdhist = gdhist
+
+    def close(self):
+        self.f.close()
+
+    def __iter__(self):
+        for i, gd in enumerate(json.loads(self.gdhist)):
+            for tag, data in gd:
+                yield [REC_GAMEDATA, i, Endpoint.encode(['gamedata', [tag, data]])]
+
+        for i, tag, data in json.loads(self.usergdhist):
+            yield [REC_USER_GAMEDATA, i, tag, data]
+
+
+def open_archive(path):
+    f = open(path, 'rb')
+    if f.read(len(MAGIC)) == MAGIC:
+        f.seek(0)
+        return ArchiveReader(f)
+
+    f.close()
+    if path.endswith('.gz'):
+        f = gzip.open(path, 'rb')
+    else:
+        f = open(path, 'rb')
+
+    return LegacyArchiveReader(f)
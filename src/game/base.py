@@ -14,6 +14,7 @@ import gevent
 
 # -- own --
 from endpoint import EndpointDied
+from game import trace
 from utils import Packet, exceptions, instantiate
 
 
@@ -25,6 +26,12 @@ intern('action_before')
 intern('action_apply')
 intern('action_after')
 
+# events whose data is the Action being processed,
+# EventHandler.interested_actions filters on these
+ACTION_EVENTS = frozenset([
+    'action_shootdown', 'action_before', 'action_apply', 'action_after', 'action_done',
+])
+
 all_gameobjects = set()
 game_objects_hierarchy = set()
 
@@ -114,6 +121,12 @@ class EventHandler(GameObject):
     group = None
     interested = None
 
+    # Action classes this handler cares about in ACTION_EVENTS.
+    # None means every action, otherwise the handler must return
+    # non-matching actions untouched, and will not see them at all
+    # when the game is dispatching in compiled mode.
+    interested_actions = None
+
     def handle(self, evt_type, data):
         raise GameError('Override handle function to implement EventHandler logics!')
 
@@ -124,58 +137,9 @@ class EventHandler(GameObject):
 
     @staticmethod
     def make_list(eh_classes, fold_group=True):
-        table = {}
-        eh_classes = set(eh_classes)
-        groups = defaultdict(list)
-
-        for cls in eh_classes:
-            assert not issubclass(cls, EventHandlerGroup), 'Should not pass group in make_list, %r' % cls
-            grp = cls.group if fold_group else None
-            if grp is not None:
-                groups[grp].append(cls)
-                cls = grp
-
-            table[cls.__name__] = cls()
-
-        for grp, lst in groups.iteritems():
-            eh = table[grp.__name__]
-            eh.set_handlers(EventHandler.make_list(lst, fold_group=False))
-
-        allnames = frozenset(table)
-
-        for eh in table.itervalues():
-            eh.execute_before = set(eh.execute_before) & allnames  # make it instance var
-            eh.execute_after = set(eh.execute_after) & allnames
-
-        for clsname, eh in table.iteritems():
-            for before in eh.execute_before:
-                table[before].execute_after.add(clsname)
-
-            for after in eh.execute_after:
-                table[after].execute_before.add(clsname)
-
-        l = table.values()
-        l.sort(key=lambda v: v.__class__.__name__)  # must sync between server and client
-
-        toposorted = []
-        while l:
-            deferred = []
-            commit = []
-            for eh in l:
-                if not eh.execute_after:
-                    for b in eh.execute_before:
-                        table[b].execute_after.remove(eh.__class__.__name__)
-                    commit.append(eh)
-                else:
-                    deferred.append(eh)
-
-            if not commit:
-                raise GameError("Can't resolve dependencies! Check for circular reference!")
-
-            toposorted.extend(commit)
-            l = deferred
-
-        return toposorted
+        graph = EventHandlerGraph(fold_group)
+        graph.add(eh_classes)
+        return graph.handlers
 
     @staticmethod
     def _dump_eh_dependency_graph():
@@ -206,6 +170,126 @@ class EventHandlerGroup(EventHandler):
         self.handlers = handlers[:]
 
 
+class EventHandlerGraph(object):
+    '''
+    Dependency graph behind EventHandler.make_list.
+    Handler classes can be added incrementally, instances of handlers
+    already in the graph are kept, and the order is always the same as
+    a fresh make_list over every class added so far.
+    '''
+
+    def __init__(self, fold_group=True):
+        self.fold_group = fold_group
+        self.classes    = set()
+        self.table      = {}                # name -> handler instance
+        self.preds      = defaultdict(set)  # name -> names must run before it
+        self.succs      = defaultdict(set)  # name -> names must run after it
+        self.refs       = defaultdict(set)  # name -> names of handlers mentioning it
+        self.groups     = {}                # group name -> EventHandlerGraph
+        self.rank       = {}
+        self.handlers   = []
+
+    def add(self, eh_classes):
+        new = set(eh_classes) - self.classes
+        if not new:
+            return
+
+        self.classes |= new
+        table = self.table
+        added = set()
+        grouped = defaultdict(list)
+
+        for cls in new:
+            assert not issubclass(cls, EventHandlerGroup), 'Should not pass group in make_list, %r' % cls
+            grp = cls.group if self.fold_group else None
+            if grp is not None:
+                grouped[grp].append(cls)
+                cls = grp
+
+            name = cls.__name__
+            if name not in table:
+                table[name] = cls()
+                added.add(name)
+
+        for grp, lst in grouped.iteritems():
+            sub = self.groups.get(grp.__name__)
+            if sub is None:
+                sub = self.groups[grp.__name__] = EventHandlerGraph(fold_group=False)
+
+            sub.add(lst)
+            table[grp.__name__].set_handlers(sub.handlers)
+
+        if not added:
+            return
+
+        for name in added:
+            eh = table[name]
+            for ref in eh.execute_before + eh.execute_after:
+                self.refs[ref].add(name)
+
+        for name in added:
+            eh = table[name]
+            for before in eh.execute_before:
+                if before in table:
+                    self._link(name, before)
+
+            for after in eh.execute_after:
+                if after in table:
+                    self._link(after, name)
+
+            for other in self.refs.get(name, ()):
+                eh = table[other]
+                if name in eh.execute_before:
+                    self._link(other, name)
+
+                if name in eh.execute_after:
+                    self._link(name, other)
+
+        # ranks can only change downstream of the new handlers
+        dirty = set()
+        stack = list(added)
+        while stack:
+            name = stack.pop()
+            if name not in dirty:
+                dirty.add(name)
+                stack.extend(self.succs[name])
+
+        for name in dirty:
+            self.rank.pop(name, None)
+
+        for name in dirty:
+            self._calc_rank(name, set())
+
+        rank = self.rank
+        l = sorted(table)  # must sync between server and client
+        l.sort(key=rank.__getitem__)
+        self.handlers = [table[name] for name in l]
+
+    def _link(self, before, after):
+        self.succs[before].add(after)
+        self.preds[after].add(before)
+
+    def _calc_rank(self, name, visiting):
+        # Same as the round make_list's toposort used to commit a handler in:
+        # handlers are scanned in name order each round, so a dependency sorting
+        # before this handler can be committed in the same round.
+        rank = self.rank.get(name)
+        if rank is not None:
+            return rank
+
+        if name in visiting:
+            raise GameError("Can't resolve dependencies! Check for circular reference!")
+
+        visiting.add(name)
+        rank = 0
+        for p in self.preds[name]:
+            rank = max(rank, self._calc_rank(p, visiting) + (p > name))
+
+        visiting.discard(name)
+        self.rank[name] = rank
+        return rank
+
+
 class Action(GameObject):
     cancelled = False
     done = False
@@ -306,26 +390,62 @@ class Game(GameObject):
     '''
     # event_handlers = []
     IS_DEBUG = False
+    COMPILED_DISPATCH = True
     params_def = {}
     npc_players = []
 
     def __init__(self):
-        self.event_handlers = []
-        self.adhoc_ehs      = []
-        self.ehs_cache      = {}
-        self.action_stack   = []
-        self.hybrid_stack   = []
-        self.action_types   = {}
-        self.ended          = False
-        self._action_hooks  = []
-        self.winners        = []
-        self.turn_count     = 0
-        self.event_observer = None
+        self.event_handlers  = []
+        self.adhoc_ehs       = []
+        self.ehs_cache       = {}
+        self.dispatch_tables = {}
+        self.dispatch_cache  = {}
+        self.dispatch_order  = {}
+        self.action_stack    = []
+        self.hybrid_stack    = []
+        self.action_types    = {}
+        self.ended           = False
+        self._action_hooks   = []
+        self.winners         = []
+        self.turn_count      = 0
+        self.event_observer  = None
+        self.eh_graph        = None
+        self.tracebuf        = trace.new_buffer()
 
     def set_event_handlers(self, ehs):
         self.event_handlers = ehs[:]
         self.ehs_cache = {}
         self.adhoc_ehs = []
+        self.compile_dispatch()
+
+    def set_event_handler_classes(self, eh_classes):
+        '''
+        Like set_event_handlers(EventHandler.make_list(eh_classes)),
+        but only sorts in the new classes and keeps existing handler instances.
+        '''
+        eh_classes = set(eh_classes)
+        graph = self.eh_graph
+        if graph is None or not graph.classes <= eh_classes:
+            graph = self.eh_graph = EventHandlerGraph()
+
+        graph.add(eh_classes)
+        self.set_event_handlers(graph.handlers)
+
+    def compile_dispatch(self):
+        '''
+        Build per event tuples of (handler, bound handle method),
+        in event_handlers order.
+        '''
+        tables = defaultdict(list)
+        order = {}
+        for i, eh in enumerate(self.event_handlers):
+            order[eh] = i
+            for tag in eh.get_interested():
+                tables[tag].append((eh, eh.handle))
+
+        self.dispatch_tables = {tag: tuple(l) for tag, l in tables.iteritems()}
+        self.dispatch_order = order
+        self.dispatch_cache = {}
 
     def add_adhoc_event_handler(self, eh):
         self.adhoc_ehs.insert(0, eh)
@@ -357,7 +477,7 @@ class Game(GameObject):
             winner = None
 
         log.info(u'>> Winner: %s', winner)
-        gevent.sleep(2)
+        self.pause(2)
 
         raise GameEnded
 
@@ -374,17 +494,28 @@ class Game(GameObject):
 
         return ehs
 
+    def _get_action_dispatch(self, tag, cls):
+        key = (tag, cls)
+        ehs = self.dispatch_cache.get(key)
+        if ehs is not None:
+            return ehs
+
+        ehs = tuple(
+            (eh, handle) for eh, handle in self.dispatch_tables.get(tag, ())
+            if eh.interested_actions is None or issubclass(cls, eh.interested_actions)
+        )
+        self.dispatch_cache[key] = ehs
+
+        return ehs
+
     def emit_event(self, evt_type, data):
         '''
         Fire an event, all relevant event handlers will see this,
         data can be modified.
         '''
         random.random() < 0.01 and gevent.sleep(0.00001)  # prevent buggy logic code blocking scheduling
-        if isinstance(data, (list, tuple, str, unicode)):
-            s = data
-        else:
-            s = data.__class__.__name__
-        log.debug('emit_event: %s %s' % (evt_type, s))
+        tb = self.tracebuf
+        tb and tb.record(evt_type, data.__class__.__name__, getattr(self, 'synctag', 0))
 
         if evt_type in ('action_before', 'action_apply', 'action_after'):
             action_event = True
@@ -396,6 +527,9 @@ class Game(GameObject):
         if ob:
             data = ob.handle(evt_type, data)
 
+        if self.COMPILED_DISPATCH:
+            return self._emit_event_compiled(evt_type, data, action_event)
+
         adhoc = self.adhoc_ehs
         ehs = self._get_relevant_eh(evt_type)
 
@@ -407,6 +541,47 @@ class Game(GameObject):
 
         return data
 
+    def _emit_event_compiled(self, evt_type, data, action_event):
+        for eh in self.adhoc_ehs:
+            data = self.handle_single_event(eh, evt_type, data)
+            if action_event and data.cancelled:
+                break
+
+        if evt_type in ACTION_EVENTS:
+            cls = data.__class__
+            ehs = self._get_action_dispatch(evt_type, cls)
+        else:
+            cls = None
+            ehs = self.dispatch_tables.get(evt_type, ())
+
+        stack = self.hybrid_stack
+        i, n = 0, len(ehs)
+        while i < n:
+            eh, handle = ehs[i]
+            i += 1
+
+            stack.append(eh)
+            try:
+                data = handle(evt_type, data)
+            finally:
+                assert eh is stack.pop()
+
+            if data is None:
+                log.debug('EventHandler %s returned None', eh.__class__.__name__)
+
+            elif cls is not None and data.__class__ is not cls:
+                # action replaced, the rest should be filtered against the new one
+                cls = data.__class__
+                order = self.dispatch_order
+                pos = order[eh]
+                ehs = [v for v in self._get_action_dispatch(evt_type, cls) if order[v[0]] > pos]
+                i, n = 0, len(ehs)
+
+            if action_event and data.cancelled:
+                break
+
+        return data
+
     def handle_single_event(self, eh, *a, **k):
         try:
             self.hybrid_stack.append(eh)
@@ -415,7 +590,7 @@ class Game(GameObject):
             assert eh is self.hybrid_stack.pop()
 
         if data is None:
-            log.debug('EventHandler %s returned None' % eh.__class__.__name__)
+            log.debug('EventHandler %s returned None', eh.__class__.__name__)
 
         return data
 
@@ -432,14 +607,14 @@ class Game(GameObject):
             return False
 
         if action.done:
-            log.debug('action already done %s' % action.__class__.__name__)
+            log.debug('action already done %s', action.__class__.__name__)
             return action.succeeded
         elif action.cancelled or action.invalid:
-            log.debug('action cancelled/invalid %s' % action.__class__.__name__)
+            log.debug('action cancelled/invalid %s', action.__class__.__name__)
             return False
 
         if not action.can_fire():
-            log.debug('action invalid %s' % action.__class__.__name__)
+            log.debug('action invalid %s', action.__class__.__name__)
             return False
 
         try:
@@ -449,16 +624,16 @@ class Game(GameObject):
 
         action = self.emit_event('action_before', action)
         if action.done:
-            log.debug('action already done %s' % action.__class__.__name__)
+            log.debug('action already done %s', action.__class__.__name__)
             rst = action.succeeded
         elif action.cancelled:
-            log.debug('action cancelled, not firing: %s' % action.__class__.__name__)
+            log.debug('action cancelled, not firing: %s', action.__class__.__name__)
             rst = False
         elif not action.can_fire():
-            log.debug('action invalid, not firing: %s' % action.__class__.__name__)
+            log.debug('action invalid, not firing: %s', action.__class__.__name__)
             action.invalid = True
         else:
-            log.debug('applying action %s' % action.__class__.__name__)
+            log.debug('applying action %s', action.__class__.__name__)
             action = self.emit_event('action_apply', action)
             assert not action.cancelled
             try:
@@ -672,27 +847,137 @@ class Gamedata(object):
         def __repr__(self):
             return 'NODATA'
 
-    def __init__(self, recording=False):
-        self.gdqueue = deque(maxlen=100000)
+    def __init__(self, recording=False, evict_stale=False, maxlen=100000):
+        self.gdqueue = deque()            # packets in arrival order, consumed ones removed lazily
+        self.gdlive = set()               # packets not consumed yet
+        self.gdtags = {}                  # tag -> deque of packets
+        self.gdprefixes = {}              # glob prefix -> deque of packets
+        self.gdseq = 0
+        self.gddied = None                # EndpointDied from gbreak, shadows packets fed after it
         self.gdevent = Event()
         self.gdempty = Event()
         self.recording = recording
+        self.evict_stale = evict_stale
+        self.maxlen = maxlen
         self.history = []
+        self.misses = 0
+        self.evictions = 0
         self._in_gexpect = False
         self.gdempty.set()
 
+    def __len__(self):
+        return len(self.gdlive)
+
     def feed(self, data):
         p = Packet(data)
+        if not p or not isinstance(p[0], basestring):
+            log.warning('Malformed gamedata: %r', data)
+            return
+
+        p.seq = self.gdseq
+        self.gdseq += 1
+        tag = p[0]
         self.gdqueue.append(p)
+        self.gdlive.add(p)
+
+        q = self.gdtags.get(tag)
+        if q is None:
+            q = self.gdtags[tag] = deque()
+
+        q.append(p)
+
+        for prefix, q in self.gdprefixes.iteritems():
+            if tag.startswith(prefix):
+                q.append(p)
+
+        if len(self.gdlive) > self.maxlen:
+            self._evict_oldest()
+
         self.gdevent.set()
         self.gdempty.clear()
 
+    def _evict_oldest(self):
+        l, live = self.gdqueue, self.gdlive
+        while l:
+            p = l.popleft()
+            if p in live:
+                self._consume(p)
+                self.evictions += 1
+                log.debug('GAME_DATA_EVICT: %r', p)
+                return
+
+    def _evict_stale(self, synctag):
+        # Packets arrive roughly in synctag order, only trim the head of queue.
+        # Packets without a synctag are never stale, keep them and look past.
+        l, live = self.gdqueue, self.gdlive
+        kept = []
+        while l:
+            p = l[0]
+            if p in live:
+                st = p[0].rsplit(':', 1)[-1]
+                if not st.isdigit():
+                    kept.append(l.popleft())
+                    continue
+
+                if int(st) >= synctag:
+                    break
+
+                self._consume(p)
+                self.evictions += 1
+                log.debug('GAME_DATA_STALE: %r', p)
+
+            l.popleft()
+
+        l.extendleft(reversed(kept))
+
+    def _compact(self):
+        live = self.gdlive
+        if len(self.gdqueue) > 2 * len(live) + 64:
+            self.gdqueue = deque(p for p in self.gdqueue if p in live)
+
+        for prefix, q in self.gdprefixes.items():
+            if len(q) > 2 * len(live) + 64:
+                self.gdprefixes[prefix] = deque(p for p in q if p in live)
+
+    def _peek(self, tag, glob):
+        live = self.gdlive
+
+        if glob:
+            q = self.gdprefixes.get(tag)
+            if q is None:
+                q = self.gdprefixes[tag] = deque(p for p in self.gdqueue if p in live and p[0].startswith(tag))
+
+        else:
+            q = self.gdtags.get(tag)
+            if q is None:
+                return None
+
+        while q and q[0] not in live:
+            q.popleft()
+
+        if not q:
+            if not glob:
+                del self.gdtags[tag]
+
+            return None
+
+        return q[0]
+
+    def _consume(self, p):
+        self.gdlive.discard(p)
+        tag = p[0]
+        q = self.gdtags[tag]
+        while q and q[0] not in self.gdlive:
+            q.popleft()
+
+        if not q:
+            del self.gdtags[tag]
+
     def gexpect(self, tag, blocking=True):
         try:
             assert not self._in_gexpect, 'NOT REENTRANT'
             self._in_gexpect = True
-            blocking and log.debug('GAME_EXPECT: %s', repr(tag))
-            l = self.gdqueue
+            blocking and log.debug('GAME_EXPECT: %r', tag)
             e = self.gdevent
             ee = self.gdempty
             e.clear()
@@ -702,24 +987,29 @@ class Gamedata(object):
                 tag = tag[:-1]
                 glob = True
 
+            if self.evict_stale and not glob:
+                st = tag.rsplit(':', 1)[-1]
+                st.isdigit() and self._evict_stale(int(st))
+
             while True:
-                for i, packet in enumerate(l):
-                    if isinstance(packet, EndpointDied):
-                        raise packet
+                packet = self._peek(tag, glob)
+                died = self.gddied
+                if died and (not packet or died.seq <= packet.seq):
+                    raise died
 
-                    if packet[0] == tag or (glob and packet[0].startswith(tag)):
-                        log.debug('GAME_READ: %s', repr(packet))
-                        del l[i]
-                        self.recording and self.history.append(packet)
-                        return packet
+                if packet:
+                    self._consume(packet)
+                    log.debug('GAME_READ: %r', packet)
+                    self.recording and self.history.append(packet)
+                    self._compact()
+                    return packet
 
-                    else:
-                        log.debug('GAME_DATA_MISS: %s', repr(packet))
-                        log.debug('EXPECTS: %s, GAME: %s', tag, getcurrent())
+                self.misses += 1
+                log.debug('GAME_DATA_MISS: %s, GAME: %s', tag, getcurrent())
 
                 ee.set()
                 if blocking:
-                    e.wait(timeout=5)
+                    e.wait()
                     e.clear()
                 else:
                     e.clear()
@@ -737,7 +1027,10 @@ class Gamedata(object):
         # Well, when sb. exit game in input state,
         # the others must wait until his timeout exceeded.
         # called by lobby.exit_game to break such condition.
-        self.gdqueue.append(EndpointDied())
+        if not self.gddied:
+            self.gddied = EndpointDied()
+            self.gddied.seq = self.gdseq
+
         self.gdevent.set()
 
 
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+from collections import defaultdict
+from weakref import WeakKeyDictionary
+import time
+
+# -- third party --
+from gevent import getcurrent
+import greenlet
+
+# -- own --
+
+# -- code --
+# Opt-in profiler for Game.process_action and Game.handle_single_event,
+# aggregated over every game on the node.
+#
+# start() wraps both methods on game.base.Game, stop() puts the originals
+# back, nothing is paid while stopped. Time is counted per greenlet and
+# stops while the greenlet is switched out, so an action waiting for user
+# input is not charged for the wait. Compiled dispatch calls handlers
+# directly, it is turned off while profiling so handlers are seen.
+#
+# Stats are keyed by 'Action:<class name>' and 'EH:<class name>':
+#   calls, cumulative time (outermost occurrence only), self time.
+# collapsed() gives self time per call path in the format flamegraph.pl eats.
+
+
+class Frame(object):
+    __slots__ = ('key', 'path', 'start', 'children')
+
+    def __init__(self, key, path, start):
+        self.key      = key
+        self.path     = path
+        self.start    = start
+        self.children = 0.0
+
+
+class Profiler(object):
+
+    def __init__(self):
+        self.running = False
+        self.reset()
+
+    def reset(self):
+        self.calls     = defaultdict(int)
+        self.cumtime   = defaultdict(float)
+        self.selftime  = defaultdict(float)
+        self.stacks    = defaultdict(float)  # collapsed path -> self time
+        self.gr_stacks = WeakKeyDictionary()  # greenlet -> [Frame, ...]
+        self.gr_time   = WeakKeyDictionary()  # greenlet -> on cpu time before last switch in
+        self.switched  = time.time()
+        self.started   = time.time()
+
+    # ----- greenlet clock -----
+    def _trace(self, event, args):
+        if event in ('switch', 'throw'):
+            origin, target = args
+            now = time.time()
+            try:
+                self.gr_time[origin] = self.gr_time.get(origin, 0.0) + now - self.switched
+            except TypeError:
+                pass  # not weakref-able, the hub for example
+
+            self.switched = now
+
+        self.prev_trace and self.prev_trace(event, args)
+
+    def clock(self, gr):
+        return self.gr_time.get(gr, 0.0) + time.time() - self.switched
+
+    # ----- control -----
+    def start(self):
+        if self.running:
+            return
+
+        from game.base import Game
+        self.reset()
+        self.running = True
+        self.prev_trace = greenlet.settrace(self._trace)
+
+        orig_process_action = self.orig_process_action = Game.process_action
+        orig_handle_single_event = self.orig_handle_single_event = Game.handle_single_event
+        enter, leave = self.enter, self.leave
+
+        def process_action(g, action):
+            frame = enter('Action:' + action.__class__.__name__)
+            try:
+                return orig_process_action(g, action)
+            finally:
+                leave(frame)
+
+        def handle_single_event(g, eh, *a, **k):
+            frame = enter('EH:' + eh.__class__.__name__)
+            try:
+                return orig_handle_single_event(g, eh, *a, **k)
+            finally:
+                leave(frame)
+
+        Game.process_action = process_action
+        Game.handle_single_event = handle_single_event
+        self.orig_compiled_dispatch = Game.COMPILED_DISPATCH
+        Game.COMPILED_DISPATCH = False
+
+    def stop(self):
+        if not self.running:
+            return
+
+        from game.base import Game
+        self.running = False
+        greenlet.settrace(self.prev_trace)
+        Game.process_action = self.orig_process_action
+        Game.handle_single_event = self.orig_handle_single_event
+        Game.COMPILED_DISPATCH = self.orig_compiled_dispatch
+
+    # ----- recording -----
+    def enter(self, key):
+        gr = getcurrent()
+        stack = self.gr_stacks.get(gr)
+        if stack is None:
+            stack = self.gr_stacks[gr] = []
+
+        path = stack[-1].path + ';' + key if stack else key
+        frame = Frame(key, path, self.clock(gr))
+        stack.append(frame)
+        self.calls[key] += 1
+        return frame
+
+    def leave(self, frame):
+        gr = getcurrent()
+        stack = self.gr_stacks.get(gr)
+        if not stack or stack[-1] is not frame:
+            return  # entered before a reset
+
+        stack.pop()
+
+        elapsed = self.clock(gr) - frame.start
+        own = elapsed - frame.children
+        self.selftime[frame.key] += own
+        self.stacks[frame.path] += own
+        if stack:
+            stack[-1].children += elapsed
+
+        if all(f.key != frame.key for f in stack):
+            self.cumtime[frame.key] += elapsed
+
+    # ----- reporting -----
+    def top(self, n=10):
+        '''
+        [(key, calls, cumulative, self), ...] sorted by self time
+        '''
+        l = sorted(self.selftime.items(), key=lambda i: -i[1])[:n]
+        return [(k, self.calls[k], self.cumtime[k], t) for k, t in l]
+
+    def collapsed(self):
+        '''
+        Collapsed stacks, one 'A;B;C <microseconds>' line per call path
+        '''
+        return ''.join(
+            '%s %d\n' % (path, t * 1e6)
+            for path, t in sorted(self.stacks.items())
+            if t >= 1e-6
+        )
+
+
+profiler = Profiler()
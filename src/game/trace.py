@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+import logging
+import struct
+import time
+
+# -- third party --
+# -- own --
+
+# -- code --
+log = logging.getLogger('game.trace')
+
+# Per game ring buffer of fixed size binary records:
+#   struct('<HHId', event id, subject id, synctag, timestamp)
+#
+# event is an event type ('action_apply') or a pseudo event ('gwrite', 'gexpect'),
+# subject is the data class name or gamedata tag prefix.
+# Names are interned to ids process wide.
+#
+# Disabled by default, new_buffer() returns None then and call sites
+# check for that before doing anything:
+#
+#   tb = g.tracebuf
+#   tb and tb.record('action_apply', act.__class__.__name__, g.synctag)
+
+RECORD = struct.Struct('<HHId')
+
+_names = []
+_ids = {}
+_size = 0
+
+
+def configure(size):
+    '''
+    Ring buffer entries for games created from now on, 0 disables tracing.
+    '''
+    global _size
+    _size = size
+
+
+def new_buffer():
+    return TraceBuffer(_size) if _size else None
+
+
+def name_id(name):
+    i = _ids.get(name)
+    if i is None:
+        i = _ids[name] = len(_names)
+        _names.append(name)
+
+    return i
+
+
+class TraceBuffer(object):
+
+    def __init__(self, size):
+        self.size = size
+        self.buf = bytearray(RECORD.size * size)
+        self.count = 0  # records ever written
+
+    def record(self, event, subject, synctag):
+        i = self.count % self.size
+        self.count += 1
+        RECORD.pack_into(self.buf, i * RECORD.size, name_id(event), name_id(subject), synctag or 0, time.time())
+
+    def __iter__(self):
+        '''
+        Yields (event, subject, synctag, timestamp), oldest first
+        '''
+        n = min(self.count, self.size)
+        start = self.count - n
+        for i in xrange(start, self.count):
+            ev, subj, st, ts = RECORD.unpack_from(self.buf, (i % self.size) * RECORD.size)
+            yield _names[ev], _names[subj], st, ts
+
+    def dump(self):
+        lines = ['%.6f %6d %-16s %s' % (ts, st, ev, subj) for ev, subj, st, ts in self]
+        dropped = self.count - len(lines)
+        dropped and lines.insert(0, '... %d earlier records overwritten' % dropped)
+        return '\n'.join(lines)
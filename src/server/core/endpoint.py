@@ -7,8 +7,9 @@ from weakref import WeakSet
 import logging
 
 # -- third party --
-from gevent import Timeout, getcurrent
+from gevent import getcurrent
 from gevent.queue import Queue
+import msgpack
 
 # -- own --
 from account import Account
@@ -17,16 +18,17 @@ from game.base import Gamedata
 from options import options
 from server.subsystem import Subsystem
 from utils import BatchList, log_failure
+from utils.gevent_ext import IdleWheel
 
 
 # -- code --
 log = logging.getLogger('server.core.endpoint')
 
 
-def _record_gamedata(client, tag, data):
+def _record_gamedata(client, encoded):
     from server.core.game_manager import GameManager
     manager = GameManager.get_by_user(client)
-    manager.record_gamedata(client, tag, data)
+    manager.record_gamedata(client, encoded)
 
 
 def _record_user_gamedata(client, tag, data):
@@ -35,14 +37,28 @@ def _record_user_gamedata(client, tag, data):
     manager.record_user_gamedata(client, tag, data)
 
 
+def _trace(event, tag):
+    g = getattr(getcurrent(), 'game', None)
+    tb = g and g.tracebuf
+    tb and tb.record(event, tag.rsplit(':', 1)[0], g.synctag)
+
+
+_PACKED_ACCOUNT_HEAD = msgpack.Packer().pack_map_header(2) + msgpack.packb('account', use_bin_type=True)
+_PACKED_STATE_KEY = msgpack.packb('state', use_bin_type=True)
+
+
 class Client(Endpoint):
+    # client should send heartbeat periodically
+    idle_wheel = IdleWheel(90, lambda c: c.idle_timeout())
+
     def __init__(self, sock, addr, greenlet):
-        Endpoint.__init__(self, sock, addr)
+        Endpoint.__init__(self, sock, addr, queued=True)
         self.observers = BatchList()
-        self.gamedata = Gamedata()
+        self.gamedata = Gamedata(evict_stale=True)
         self.cmd_listeners = defaultdict(WeakSet)
         self.current_game = None
         self.greenlet = greenlet
+        self.lobby_version = None
 
         self.account = None
 
@@ -61,18 +77,13 @@ class Client(Endpoint):
         # ------------------
 
         self.state = 'connected'
+        wheel = self.idle_wheel
+        wheel.add(self)
         while True:
             try:
-                hasdata = False
-                with Timeout(90, False):
-                    cmd, data = self.read()
-                    hasdata = True
-
-                if not hasdata:
-                    self.close()
-                    # client should send heartbeat periodically
-                    raise EndpointDied
-
+                self.idle_since = wheel.now
+                cmd, data = self.read()
+                self.idle_since = None
                 self.handle_command(cmd, data)
 
             except EndpointDied:
@@ -83,8 +94,15 @@ class Client(Endpoint):
                 log.exception("Error occurred when handling client command")
 
         # client died, do clean ups
+        wheel.discard(self)
         self.handle_drop()
 
+    def idle_timeout(self):
+        log.info('%r idle for too long, dropping', self)
+        Endpoint.close(self)
+        gr = self.greenlet
+        gr and gr.kill(EndpointDied, block=False)
+
     def close(self):
         Endpoint.close(self)
         gr = self.greenlet
@@ -102,12 +120,23 @@ class Client(Endpoint):
             acc.username.encode('utf-8'),
         )
 
+    data_state = property(lambda self: self.state)
+
     def __data__(self):
         return dict(
             account=self.account,
-            state=self.state,
+            state=self.data_state,
         )
 
+    def __packed__(self):
+        # account part is cached by the account, state changes all the time
+        return ''.join([
+            _PACKED_ACCOUNT_HEAD,
+            self.account.__packed__(),
+            _PACKED_STATE_KEY,
+            msgpack.packb(self.data_state, use_bin_type=True),
+        ])
+
     def __eq__(self, other):
         return self.account is other.account
 
@@ -158,22 +187,33 @@ class Client(Endpoint):
     def gexpect(self, tag, blocking=True):
         tag, data = self.gamedata.gexpect(tag, blocking)
         tag and _record_user_gamedata(self, tag, data)
+        tag and _trace('gexpect', tag)
         return tag, data
 
     def gwrite(self, tag, data):
-        log.debug('GAME_WRITE: %s -> %s', self.account.username, repr([tag, data]))
-
-        _record_gamedata(self, tag, data)
+        log.debug('GAME_WRITE: %s -> %r', self.account.username, [tag, data])
+        _trace('gwrite', tag)
+        self.gwrite_encoded(self.encode(['gamedata', [tag, data]]))
 
-        encoded = self.encode(['gamedata', [tag, data]])
+    def gwrite_encoded(self, encoded):
+        _record_gamedata(self, encoded)
         self.raw_write(encoded)
         self.observers and self.observers.raw_write(encoded)
 
+    @staticmethod
+    def gbroadcast(clients, tag, data):
+        '''
+        gwrite the same gamedata to all clients, encodes only once.
+        '''
+        log.debug('GAME_BROADCAST: %r', [tag, data])
+        _trace('gbroadcast', tag)
+        clients.gwrite_encoded(Client.encode(['gamedata', [tag, data]]))
+
     def gbreak(self):
         return self.gamedata.gbreak()
 
     def gclear(self):
-        self.gamedata = Gamedata()
+        self.gamedata = Gamedata(evict_stale=True)
 
     # --------- Handlers ---------
     def command_auth(self, login, password):
@@ -210,17 +250,13 @@ class Client(Endpoint):
 class DroppedClient(Client):
     read = write = raw_write = gclear = lambda *a, **k: None
 
+    data_state = 'left'
+
     def __init__(self, client=None):
         client and self.__dict__.update(client.__dict__)
 
-    def __data__(self):
-        return dict(
-            account=self.account,
-            state='left',
-        )
-
-    def gwrite(self, tag, data):
-        _record_gamedata(self, tag, data)
+    def gwrite_encoded(self, encoded):
+        _record_gamedata(self, encoded)
 
     def gexpect(self, tag, blocking=True):
         raise EndpointDied
@@ -237,19 +273,17 @@ class DroppedClient(Client):
 class NPCClient(Client):
     read = write = raw_write = gclear = lambda *a, **k: None
     state = property(lambda: 'ingame')
+    data_state = 'ingame'
 
     def __init__(self, name):
         acc = Account.build_npc_account(name)
         self.account = acc
 
-    def __data__(self):
-        return dict(
-            account=self.account,
-            state='ingame',
-        )
-
     def gwrite(self, tag, data):
         pass
 
+    def gwrite_encoded(self, encoded):
+        pass
+
     def gexpect(self, tag, blocking=True):
         raise Exception('Should not be called!')
@@ -2,10 +2,8 @@
 from __future__ import absolute_import
 
 # -- stdlib --
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from weakref import WeakSet
-import gzip
-import json
 import logging
 import os
 import random
@@ -14,8 +12,10 @@ import sys
 
 # -- third party --
 import gevent
+import msgpack
 
 # -- own --
+from game.archive import ArchiveReader, ArchiveWriter, REC_GAMEDATA, REC_USER_GAMEDATA
 from game.base import GameItem
 from options import options
 from server import item
@@ -41,6 +41,50 @@ class ClientPlaceHolder(object):
         return (None, None, 'left')
 
 
+class MatchIndex(object):
+    '''
+    Rooms waiting for players, by game mode and free slot count:
+        rooms[mode][free] -> OrderedDict(gid -> manager), oldest first
+    Started and full rooms are not indexed.
+    '''
+
+    def __init__(self):
+        self.rooms = defaultdict(lambda: defaultdict(OrderedDict))
+        self.where = {}  # gid -> (mode, free)
+
+    def discard(self, manager):
+        key = self.where.pop(manager.gameid, None)
+        if key:
+            mode, free = key
+            del self.rooms[mode][free][manager.gameid]
+
+    def update(self, manager):
+        self.discard(manager)
+        free = manager.users.count(ClientPlaceHolder)
+        if manager.game_started or not free:
+            return
+
+        mode = manager.gamecls.__name__
+        self.where[manager.gameid] = (mode, free)
+        self.rooms[mode][free][manager.gameid] = manager
+
+    def candidates(self, mode=None):
+        '''
+        Joinable rooms, fullest first, then oldest first.
+        '''
+        modes = [mode] if mode else self.rooms.keys()
+        buckets = [
+            (free, l)
+            for m in modes
+            for free, l in self.rooms.get(m, {}).items()
+            if l
+        ]
+        buckets.sort(key=lambda i: i[0])
+        for free, l in buckets:
+            for manager in l.values():
+                yield manager
+
+
 class GameManager(object):
 
     def __init__(self, gid, gamecls, name, invite_only):
@@ -61,6 +105,10 @@ class GameManager(object):
         self.invite_only  = invite_only
         self.invite_list  = set()
         self.muted        = False
+        self.match_index  = None
+        self.packed       = None  # (key, packed __data__)
+
+        self.archive_writer = None
 
         g.gameid    = gid
         g._manager  = self
@@ -79,6 +127,14 @@ class GameManager(object):
             'params':   self.game_params,
         }
 
+    def __packed__(self):
+        # game_params is changed in place, set/update_game_param drop the cache then
+        key = (self.game_started, len(self.get_online_users()))
+        if self.packed is None or self.packed[0] != key:
+            self.packed = (key, msgpack.packb(self.__data__(), use_bin_type=True))
+
+        return self.packed[1]
+
     @classmethod
     def get_by_user(cls, user):
         '''
@@ -129,34 +185,37 @@ class GameManager(object):
         except ValueError:
             return None
 
-    def archive(self):
+    def open_archive(self):
         g = self.game
         if not options.archive_path:
             return
 
-        data = []
+        self.archive_path = os.path.join(options.archive_path, '%s-%s.thbarc' % (options.node, str(self.gameid)))
+        self.archive_writer = ArchiveWriter(open(self.archive_path, 'wb'), {
+            'names': list(self.users.account.username),
+            'version': VERSION,
+            'gameid': self.gameid,
+            'start_time': int(self.start_time),
+            'mode': self.gamecls.__name__,
+            'params': self.game_params,
+            'items': {k: list(v) for k, v in self.game_items.items()},
+            'rndseed': g.rndseed,
+        })
 
-        data.append('# ' + ', '.join([
-            p.account.username.encode('utf-8')
-            for p in self.users
-        ]))
+    def archive(self):
+        footer = {'end_time': int(time.time())}
 
-        data.append('# Ver: ' + VERSION)
-        data.append('# GameId: ' + str(self.gameid))
-        s, e = int(self.start_time), int(time.time())
-        data.append('# Time: start = %d, end = %d, elapsed = %d' % (s, e, e - s))
+        deck = getattr(self.game, 'deck', None)
+        if deck:
+            footer['sync_ids'] = stats = deck.sync_id_stats()
+            log.info('Game %s sync ids: %r', self.gameid, stats)
 
-        data.append(self.gamecls.__name__)
-        data.append(json.dumps(self.game_params))
-        game_items = {k: list(v) for k, v in self.game_items.items()}
-        data.append(json.dumps(game_items))
-        data.append(str(g.rndseed))
-        data.append(json.dumps(self.usergdhistory))
-        data.append(json.dumps(self.gdhistory))
+        w = self.archive_writer
+        if not w:
+            return
 
-        f = gzip.open(os.path.join(options.archive_path, '%s-%s.gz' % (options.node, str(self.gameid))), 'wb')
-        f.write('\n'.join(data))
-        f.close()
+        self.archive_writer = None
+        w.close(footer)
 
     def get_ready(self, user):
         if user.state not in ('inroomwait',):
@@ -210,6 +269,7 @@ class GameManager(object):
 
         self.game_params[key] = value
         self.game_items = defaultdict(set)
+        self.packed = None
 
         for u in self.users:
             if u.state == 'ready':
@@ -222,6 +282,7 @@ class GameManager(object):
 
     def update_game_param(self, params):
         self.game_params.update(params)
+        self.packed = None
         self.users.write(['game_params', self.game_params])
         self.notify_playerchange()
 
@@ -324,6 +385,7 @@ class GameManager(object):
                 obl and obl.write(['observer_enter', info])
 
         if g.started:
+            user.write(['catchup', g.synctag])
             user.write(['observe_started', [
                 self.game_params,
                 self.consumed_game_items,
@@ -362,6 +424,7 @@ class GameManager(object):
             return
 
         self.users[slot] = user
+        self.match_index and self.match_index.update(self)
 
         if observing:
             origin = self.get_by_user(user)
@@ -393,13 +456,14 @@ class GameManager(object):
             ))
 
         self.game_started = True
+        self.match_index and self.match_index.discard(self)
 
         g.players = self.build_initial_players()
 
-        self.usergdhistory = []
-        self.gdhistory     = [list() for p in self.users]
-
+        self.gdhistory  = [list() for p in self.users]
         self.start_time = time.time()
+        self.open_archive()
+
         for u in self.users:
             u.write(["game_started", [self.game_params, self.consumed_game_items, g.players]])
             u.gclear()
@@ -447,18 +511,46 @@ class GameManager(object):
 
         return pl
 
-    def record_gamedata(self, user, tag, data):
+    def record_gamedata(self, user, encoded):
+        # encoded ['gamedata', [tag, data]] packets, as sent to the user
         idx = self.users.index(user)
-        self.gdhistory[idx].append((tag, Client.decode(Client.encode(data))))
+        w = self.archive_writer
+        if w:
+            w.append([REC_GAMEDATA, idx, encoded])
+        else:
+            self.gdhistory[idx].append(encoded)
 
     def record_user_gamedata(self, user, tag, data):
-        idx = self.users.index(user)
-        self.usergdhistory.append((idx, tag, Client.decode(Client.encode(data))))
+        # data comes straight from msgpack, no need to normalize
+        w = self.archive_writer
+        w and w.append([REC_USER_GAMEDATA, self.users.index(user), tag, data])
+
+    def gamedata_history(self, idx):
+        w = self.archive_writer
+        if not w:
+            return iter(self.gdhistory[idx])
+
+        def archived():
+            with open(self.archive_path, 'rb') as f:
+                for rec in ArchiveReader(f):
+                    if rec[0] == REC_GAMEDATA and rec[1] == idx:
+                        yield rec[2]
+
+            # no context switch since reaching EOF, nothing can be missed
+            for rec in w.pending():
+                if rec[0] == REC_GAMEDATA and rec[1] == idx:
+                    yield rec[2]
+
+        return archived()
 
     def replay(self, observer, observee):
+        '''
+        Sends observee's gamedata history to observer in one bulk frame.
+        Client fast forwards through it, up to the synctag announced by 'catchup'.
+        '''
         idx = self.users.index(observee)
-        for data in self.gdhistory[idx]:
-            observer.write(['gamedata', data])
+        history = list(self.gamedata_history(idx))
+        history and observer.raw_write(Client.bulk_encoded(history))
 
     def squeeze_out(self, old, new):
         old.write(['others_logged_in', None])
@@ -488,6 +580,7 @@ class GameManager(object):
         self.notify_playerchange()
 
         players = self.build_initial_players()
+        new.write(['catchup', g.synctag])
         new.write(['game_started', [self.game_params, self.consumed_game_items, players]])
 
         self.replay(new, new)
@@ -523,6 +616,7 @@ class GameManager(object):
         else:
             log.info('player leave')
             self.users.replace(user, ClientPlaceHolder)
+            self.match_index and self.match_index.update(self)
             user.write(['game_left', None])
 
         self.notify_playerchange()
@@ -535,6 +629,7 @@ class GameManager(object):
         return rst
 
     def end_game(self):
+        self.match_index and self.match_index.discard(self)
         if self.is_match and not self.game.suicide:
             gevent.spawn(lambda: Subsystem.interconnect.publish(
                 'speaker', [u'文文', u'“%s”结束了！获胜玩家：%s' % (
@@ -558,6 +653,7 @@ class GameManager(object):
             ))
 
         self.game.suicide = True  # game will kill itself in get_synctag()
+        self.match_index and self.match_index.discard(self)
 
     def get_bonus(self):
         assert self.get_online_users()
@@ -606,4 +702,7 @@ class GameManager(object):
             if isinstance(cl, Client):
                 logtraceback(cl)
 
+        if g.tracebuf:
+            log.info('----- TRACE -----\n%s', g.tracebuf.dump())
+
         log.info('===========================')
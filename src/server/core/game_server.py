@@ -14,6 +14,7 @@ import gevent
 # -- own --
 from endpoint import EndpointDied
 from game.base import AbstractPlayer, GameEnded, InputTransaction, TimeLimitExceeded
+from server.core.endpoint import Client
 from server.core.event_hooks import ServerEventHooks
 from server.core.game_manager import GameManager
 from server.subsystem import Subsystem
@@ -44,6 +45,8 @@ def user_input(players, inputlet, timeout=25, type='single', trans=None):
         with InputTransaction(inputlet.tag(), players) as trans:
             return user_input(players, inputlet, timeout, type, trans)
 
+    g.flush_sync()  # clients may be blocking on them before they can answer
+
     t = {'single': '', 'all': '&', 'any': '|'}[type]
     tag = 'I{0}:{1}:'.format(t, inputlet.tag())
 
@@ -91,7 +94,7 @@ def user_input(players, inputlet, timeout=25, type='single', trans=None):
 
         def flush():
             for t, data, trans, my, rst in bottom_halves:
-                g.players.client.gwrite(t, data)
+                Client.gbroadcast(g.players.client, t, data)
                 g.emit_event('user_input_finish', (trans, my, rst))
 
             bottom_halves[:] = []
@@ -147,7 +150,7 @@ def user_input(players, inputlet, timeout=25, type='single', trans=None):
         rst = my.post_process(p, rst)
         results[p] = rst
         g.emit_event('user_input_finish', (trans, my, rst))
-        g.players.client.gwrite('R{}{}'.format(tag, synctags[p]), None)
+        Client.gbroadcast(g.players.client, 'R{}{}'.format(tag, synctags[p]), None)
 
     if type == 'single':
         return results[orig_players[0]]
@@ -175,7 +178,7 @@ class Player(AbstractPlayer):
     def reveal(self, obj_list):
         g = Game.getgame()
         st = g.get_synctag()
-        self.client.gwrite('Sync:%d' % st, obj_list)
+        g.queue_sync(self, st, obj_list)
 
     def set_dropped(self, v=True):
         self.dropped = v
@@ -251,6 +254,7 @@ class Game(Greenlet, game.base.Game):
     def __init__(self):
         Greenlet.__init__(self)
         game.base.Game.__init__(self)
+        self.sync_batches = OrderedDict()  # id(player) -> (player, [[synctag, data], ...])
 
     @log_failure(log)
     def _run(g):
@@ -264,6 +268,7 @@ class Game(Greenlet, game.base.Game):
         except GameEnded:
             pass
         finally:
+            g.flush_sync()
             Subsystem.lobby.end_game(mgr)
 
         assert g.ended
@@ -290,5 +295,29 @@ class Game(Greenlet, game.base.Game):
         self.synctag += 1
         return self.synctag
 
+    def queue_sync(self, p, st, data):
+        '''
+        Reveals are batched per player and sent as one packet:
+            ['Sync:<first synctag>', [[synctag, data], ...]]
+        Flushed whenever the game is about to wait (user input, pause, game end),
+        clients block on the first synctag of the batch.
+        '''
+        b = self.sync_batches.get(id(p))
+        if b:
+            b[1].append([st, data])
+        else:
+            self.sync_batches[id(p)] = (p, [[st, data]])
+
+    def flush_sync(self):
+        batches = self.sync_batches
+        if not batches:
+            return
+
+        for p, l in batches.itervalues():
+            p.client.gwrite('Sync:%d' % l[0][0], l)
+
+        batches.clear()
+
     def pause(self, time):
+        self.flush_sync()
         gevent.sleep(time)
@@ -7,17 +7,19 @@ import logging
 import os
 import shlex
 import time
+import zlib
 
 # -- third party --
 from gevent import Timeout
 from gevent.pool import Pool
 from gevent.queue import Empty as QueueEmpty
 import gevent
+import msgpack
 
 # -- own --
 from options import options
 from server.core.endpoint import Client, DroppedClient
-from server.core.game_manager import GameManager
+from server.core.game_manager import GameManager, MatchIndex
 from server.subsystem import Subsystem
 from utils import BatchList, log_failure
 from utils.misc import throttle
@@ -36,6 +38,75 @@ User state machine:
 '''
 
 
+class LobbyStatus(object):
+    '''
+    Versioned view of lobby games and users.
+
+    update() compares the current objects with what was seen last time
+    and returns the difference as a list of ops:
+        [category, key, data]  # data is None when removed
+    category is 'games' or 'users'. Every non empty update bumps version.
+    '''
+
+    CATEGORIES = ('games', 'users')
+
+    def __init__(self):
+        self.version = 0
+        self.fragments = {c: {} for c in self.CATEGORIES}  # key -> packed data
+        self.snapshot_cache = None
+
+    def update(self, **current):
+        ops = []
+        for cat in self.CATEGORIES:
+            frags = self.fragments[cat]
+            objs = current[cat]
+
+            for k in list(frags):
+                if k not in objs:
+                    del frags[k]
+                    ops.append([cat, k, None])
+
+            for k, o in objs.iteritems():
+                frag = Client.pack_data(o)
+                old = frags.get(k)
+                if old is not frag and old != frag:
+                    frags[k] = frag
+                    ops.append([cat, k, o.__data__()])
+
+        if ops:
+            self.version += 1
+
+        return ops
+
+    def snapshot(self):
+        '''
+        Encoded lobby_snapshot packet of current version:
+            ['lobby_snapshot', [version, [[gid, game], ...], [[uid, user], ...]]]
+        Assembled from the packed fragments, shared by all receivers.
+        '''
+        cache = self.snapshot_cache
+        if cache and cache[0] == self.version:
+            return cache[1]
+
+        pk = msgpack.Packer(use_bin_type=True)
+        l = [
+            pk.pack_array_header(1),
+            pk.pack_array_header(2),
+            pk.pack('lobby_snapshot'),
+            pk.pack_array_header(1 + len(self.CATEGORIES)),
+            pk.pack(self.version),
+        ]
+        for cat in self.CATEGORIES:
+            frags = self.fragments[cat]
+            l.append(pk.pack_array_header(len(frags)))
+            for k, frag in frags.iteritems():
+                l.extend([pk.pack_array_header(2), pk.pack(k), frag])
+
+        d = pk.pack([Client.FMT_BULK_COMPRESSED, zlib.compress(''.join(l))])
+        self.snapshot_cache = (self.version, d)
+        return d
+
+
 class Lobby(object):
     def __init__(self, current_gid=0):
         # should use WeakSet or WeakValueDictionary,
@@ -46,6 +117,8 @@ class Lobby(object):
         self.current_gid = current_gid
         self.admins = [2, 109, 351, 3044, 6573, 6584, 9783]
         self.bigbrothers = []
+        self.status = LobbyStatus()
+        self.match_index = MatchIndex()
 
         self.lobby_command_dispatch = {
             'create_game':      self.create_game_and_join,
@@ -67,9 +140,9 @@ class Lobby(object):
             'speaker':          self.speaker,
         }
 
-    def _command(for_state, argstype):
+    def _command(for_state, argstype, optional=()):
         def decorate(f):
-            f._contract = (for_state, argstype)
+            f._contract = (for_state, argstype, optional)
             return f
 
         return decorate
@@ -84,13 +157,17 @@ class Lobby(object):
             user.write(['invalid_lobby_command', [cmd, args]])
             return
 
-        for_state, argstype = handler._contract
+        for_state, argstype, optional = handler._contract
 
         if for_state and user.state not in for_state:
             log.debug('Command %s is for state %s, called in %s', cmd, for_state, user.state)
             user.write(['invalid_lobby_command', [cmd, args]])
             return
 
+        n = len(args) - len(argstype)
+        if n > 0:
+            argstype = argstype + list(optional[:n])
+
         if not (len(argstype) == len(args) and all(isinstance(v, t) for t, v in zip(argstype, args))):
             log.debug('Command %s with wrong args, expecting %r, actual %r', cmd, argstype, args)
             user.write(['invalid_lobby_command', [cmd, args]])
@@ -104,33 +181,57 @@ class Lobby(object):
 
     @throttle(1.5)
     def refresh_status(self):
+        st = self.status
+        prev = st.version
+        ops = st.update(games=self.games, users=self.users)
+        delta = ops and Client.encode(['lobby_delta', [prev, st.version, ops]])
+
         ul = [u for u in self.users.values() if u.state == 'hang']
-        self.send_lobbyinfo(ul)
-        Subsystem.interconnect.publish('current_users', self.users.values())
-        Subsystem.interconnect.publish('current_games', self.games.values())
+        self.send_lobbyinfo(ul, delta and (prev, delta))
+
+        changed = {op[0] for op in ops}
+        'users' in changed and Subsystem.interconnect.publish('current_users', self.users.values())
+        'games' in changed and Subsystem.interconnect.publish('current_games', self.games.values())
 
     @_command(None, [])
     def get_lobbyinfo(self, user):
+        user.lobby_version = None
         self.send_lobbyinfo([user])
+        self.refresh_status()
+
+    def send_lobbyinfo(self, ul, delta=None):
+        '''
+        Bring users up to date: users at delta's base version get the delta,
+        users missed some versions get a full snapshot.
+        '''
+        st = self.status
+        ver = st.version
+        todo = []
+        for u in ul:
+            if u.lobby_version == ver:
+                continue
+            elif delta and u.lobby_version == delta[0]:
+                todo.append((u, delta[1]))
+            else:
+                todo.append((u, st.snapshot()))
 
-    def send_lobbyinfo(self, ul):
-        d = Client.encode([
-            ['current_games', self.games.values()],
-            ['current_users', self.users.values()],
-        ], Client.FMT_BULK_COMPRESSED)
+            u.lobby_version = ver
+
+        if not todo:
+            return
 
         p = Pool(6)
 
         @p.spawn
         def send():
-            for u in ul:
+            for u, d in todo:
                 @p.spawn
-                def send_single(u=u):
+                def send_single(u=u, d=d):
                     u.raw_write(d)
                     self.send_account_info(u)
 
     def send_account_info(self, user):
-        user.write(['your_account', user.account])
+        user.raw_write(Client.encode_spliced('your_account', user.account))
 
     def user_join(self, user):
         uid = user.account.userid
@@ -161,6 +262,7 @@ class Lobby(object):
                 manager.reconnect(user)
 
         self.users[uid] = user
+        Subsystem.item.user_join(user)
 
         self.refresh_status()
 
@@ -169,14 +271,18 @@ class Lobby(object):
     def user_leave(self, user):
         uid = user.account.userid
         self.users.pop(uid, 0)
+        Subsystem.item.user_leave(user)
         log.info(u'User %s left, online user %d' % (user.account.username, len(self.users)))
         self.refresh_status()
 
     @_command(['hang'], [basestring, unicode, bool])
     def create_game_and_join(self, user, gametype, name, invite_only):
         manager = self.create_game(user, gametype, name, invite_only)
+        if not manager:
+            return
+
         manager.add_invited(user)
-        manager and self.join_game(user, manager.gameid)
+        self.join_game(user, manager.gameid)
 
     def create_game(self, user, gametype, name, invite_only):
         from thb import modes, modes_maoyu
@@ -191,6 +297,8 @@ class Lobby(object):
         gid = self.new_gid()
         gamecls = modes[gametype]
         manager = GameManager(gid, gamecls, name, invite_only)
+        manager.match_index = self.match_index
+        self.match_index.update(manager)
         self.games[gid] = manager
         log.info("Create game")
         self.refresh_status()
@@ -268,16 +376,25 @@ class Lobby(object):
         manager.start_game()
         self.refresh_status()
 
-    @_command(['hang'], [])
-    def quick_start_game(self, user):
+    @_command(['hang'], [], [basestring])
+    def quick_start_game(self, user, mode=None):
         if user.state != 'hang':
             user.write(['message_err', 'cant_join_game'])
             return
 
-        for manager in self.games.values():
-            if manager.next_free_slot() is not None and manager.is_invited(user) and not manager.is_banned(user):
+        from thb import modes_maoyu
+        maoyu = user.account.is_maoyu()
+        for manager in self.match_index.candidates(mode):
+            if maoyu and manager.gamecls.__name__ not in modes_maoyu:
+                continue
+
+            if manager.is_invited(user) and not manager.is_banned(user):
                 self.join_game(user, manager.gameid)
                 return
+
+        if mode:
+            # nothing fits, open a new room for this mode
+            self.create_game_and_join(user, mode, user.account.username + u'的游戏', False)
         else:
             user.write(['message_err', 'cant_join_game'])
 
@@ -615,6 +732,35 @@ class Lobby(object):
             uid, sku = args
             backpack.add(int(uid), sku)
 
+        elif cmd == 'sendq':
+            ul = sorted(self.users.values(), key=lambda u: -u.sendq_bytes)
+            lines = [u'发送队列: 共 %d 字节' % sum(u.sendq_bytes for u in ul)]
+            lines.extend(
+                u'%s: %d 字节 (峰值 %d)' % (u.account.username, u.sendq_bytes, u.sendq_peak)
+                for u in ul[:5]
+            )
+            user.write(['system_msg', [None, u'\n'.join(lines)]])
+
+        elif cmd == 'profile':
+            from game.profiler import profiler
+            op = args[0] if args else 'dump'
+            if op == 'start':
+                profiler.start()
+            elif op == 'stop':
+                profiler.stop()
+            elif op == 'dump':
+                lines = [u'性能统计: %.0f 秒' % (time.time() - profiler.started)]
+                lines.extend(
+                    u'%s: %d 次, 累计 %.1fms, 自身 %.1fms' % (k, n, cum * 1000, own * 1000)
+                    for k, n, cum, own in profiler.top()
+                )
+                user.write(['system_msg', [None, u'\n'.join(lines)]])
+                if len(args) > 1:
+                    with open(args[1], 'w') as f:
+                        f.write(profiler.collapsed())
+            else:
+                return
+
         elif cmd == 'mute':
             manager = GameManager.get_by_user(user)
             if manager:
@@ -731,10 +877,9 @@ Subsystem.lobby = Lobby(last_gid)
 
 @atexit.register
 def _exit_handler():
-    # logout all the accounts
-    # to save the credits
-    for u in Subsystem.lobby.users.values():
-        u.account.add_credit(['credits', 50])
+    # save the credits not written yet
+    from account import Account
+    Account.flush_credits()
 
     # save gameid
     fn = options.gidfile
@@ -11,6 +11,7 @@ from db.models import Item, ItemActivity
 from db.session import transactional, current_session
 from game.base import GameItem
 from server.item import helpers
+from server.item.cache import cache
 from utils import exceptions
 
 
@@ -46,6 +47,7 @@ def use(uid, item_sku_or_id, is_consume=False):
 
     item.status = 'used'
     item.owner_id = None
+    cache.stage(s, uid, item.id, None)
 
 
 def consume(uid, item_sku_or_id):
@@ -60,6 +62,7 @@ def add(uid, item_sku, reason=None):
     item = Item(owner_id=uid, sku=item_sku, status='backpack')
     s.add(item)
     s.flush()
+    cache.stage(s, uid, item.id, item_sku)
 
     s.add(ItemActivity(
         uid=uid, action='get', item_id=item.id,
@@ -70,8 +73,16 @@ def add(uid, item_sku, reason=None):
     return item.id
 
 
-@transactional('new')
 def list(uid):
+    items = cache.get(uid)
+    if items is None:
+        return _list(uid)
+
+    return [{'id': id, 'sku': sku} for id, sku in sorted(items.items(), reverse=True)]
+
+
+@transactional('new')
+def _list(uid):
     s = current_session()
 
     items = s.query(Item) \
@@ -82,8 +93,20 @@ def list(uid):
     return items
 
 
-@transactional('new')
 def should_have(uid, sku):
+    items = cache.get(uid)
+    if items is None:
+        return _should_have(uid, sku)
+
+    n = sum(1 for v in items.itervalues() if v == sku)
+    if not n:
+        raise exceptions.ItemNotFound
+
+    return n
+
+
+@transactional('new')
+def _should_have(uid, sku):
     s = current_session()
 
     n = s.query(Item) \
@@ -113,6 +136,7 @@ def drop(uid, item_id):
 
     item.owner_id = None
     item.status = 'dropped'
+    cache.stage(s, uid, item.id, None)
 
     s.add(ItemActivity(
         uid=uid, action='drop', item_id=item.id,
@@ -120,3 +144,12 @@ def drop(uid, item_id):
     ))
 
     return item.id
+
+
+@transactional('new')
+def cache_user(uid):
+    cache.load(current_session(), uid)
+
+
+def uncache_user(uid):
+    cache.drop(uid)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+from collections import defaultdict
+
+# -- third party --
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# -- own --
+from db.models import Item
+
+
+# -- code --
+class ItemCache(object):
+    '''
+    Items owned by online users, uid -> {item_id: sku}.
+
+    Loaded when the user joins and dropped when the user leaves. Code changing
+    Item.owner_id records the change with stage(session, ...) in the same
+    transaction. Staged changes are applied when the session commits and
+    thrown away on rollback, so the cache never sees uncommitted state.
+    Users not in the cache are answered from the DB as before.
+    '''
+
+    def __init__(self):
+        self.owned = {}
+
+    def load(self, sess, uid):
+        items = sess.query(Item.id, Item.sku).filter(Item.owner_id == uid).all()
+        self.owned[uid] = {id: sku for id, sku in items}
+
+    def drop(self, uid):
+        self.owned.pop(uid, None)
+
+    def get(self, uid):
+        return self.owned.get(uid)
+
+    def stage(self, sess, uid, item_id, sku):
+        '''
+        Record item_id going into (sku given) or out of (sku None) uid's possession
+        '''
+        sess.info.setdefault('item_cache', []).append((uid, item_id, sku))
+
+    def count(self, sess, uid):
+        '''
+        Items owned by uid as seen from sess, None if uid is not cached
+        '''
+        items = self.owned.get(uid)
+        if items is None:
+            return None
+
+        pending = dict(items)
+        for u, item_id, sku in sess.info.get('item_cache', ()):
+            if u != uid:
+                continue
+            elif sku:
+                pending[item_id] = sku
+            else:
+                pending.pop(item_id, None)
+
+        return len(pending)
+
+    def _apply(self, sess):
+        for uid, item_id, sku in sess.info.pop('item_cache', ()):
+            items = self.owned.get(uid)
+            if items is None:
+                continue
+            elif sku:
+                items[item_id] = sku
+            else:
+                items.pop(item_id, None)
+
+    def _discard(self, sess, *a):
+        sess.info.pop('item_cache', None)
+
+    def install(self):
+        event.listen(Session, 'after_commit', self._apply)
+        event.listen(Session, 'after_rollback', self._discard)
+
+    def inconsistencies(self, sess):
+        '''
+        Compare every cached backpack with the DB:
+            [(uid, cached, actual), ...]
+        '''
+        actual = defaultdict(dict)
+        uids = list(self.owned)
+        if uids:
+            rows = sess.query(Item.owner_id, Item.id, Item.sku).filter(Item.owner_id.in_(uids))
+            for uid, id, sku in rows:
+                actual[uid][id] = sku
+
+        return [
+            (uid, items, actual[uid])
+            for uid, items in self.owned.iteritems()
+            if items != actual[uid]
+        ]
+
+
+cache = ItemCache()
+cache.install()
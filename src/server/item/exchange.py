@@ -13,6 +13,7 @@ from db.models import Exchange, Item, ItemActivity
 from db.session import transactional, current_session
 from account import Account
 from server.item import constants, helpers
+from server.item.cache import cache
 from utils import exceptions
 
 
@@ -52,6 +53,7 @@ def buy(uid, entry_id):
 
     item.owner_id = u.id
     item.status = 'backpack'
+    cache.stage(s, u.id, item.id, item.sku)
 
     s.delete(entry)
 
@@ -81,6 +83,7 @@ def sell(uid, item_id, price):
 
     item.status = 'exchange'
     item.owner_id = None
+    cache.stage(s, uid, item.id, None)
 
 
 @transactional('new')
@@ -99,6 +102,7 @@ def cancel_sell(uid, entry_id):
     item = entry.item
     item.owner_id = uid
     item.status = 'backpack'
+    cache.stage(s, uid, item.id, item.sku)
 
     s.add(ItemActivity(
         uid=uid, action='cancel_sell', item_id=entry.item.id,
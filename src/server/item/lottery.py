@@ -12,6 +12,7 @@ from account import Account
 from db.models import Item, ItemActivity
 from db.session import transactional, current_session
 from server.item import constants, helpers
+from server.item.cache import cache
 from utils import exceptions
 
 
@@ -45,6 +46,7 @@ def draw(uid, currency):
     item = Item(owner_id=uid, sku=reward, status='backpack')
     s.add(item)
     s.flush()
+    cache.stage(s, uid, item.id, reward)
     s.add(ItemActivity(
         uid=uid, action='lottery', item_id=item.id,
         extra=json.dumps({'currency': currency, 'amount': amount}),
@@ -63,6 +63,12 @@ class ItemSystem(object):
                      exc_info=sys.exc_info())
             user.write(['message_err', e.snake_case])
 
+    def user_join(self, user):
+        backpack.cache_user(user.account.userid)
+
+    def user_leave(self, user):
+        backpack.uncache_user(user.account.userid)
+
     @_command()
     def backpack(self, user):
         user.write(['backpack', backpack.list(user.account.userid)])
@@ -55,6 +55,8 @@ def start_server():
     parser.add_argument('--redis-url', default='redis://localhost:6379')
     parser.add_argument('--discuz-authkey', default='Proton rocks')
     parser.add_argument('--db', default='sqlite:////dev/shm/thb.sqlite3')
+    parser.add_argument('--stats-log', default='', help='write stats events to this JSONL file instead of LeanCloud')
+    parser.add_argument('--trace', type=int, default=0, help='per game trace ring buffer entries, 0 disables')
     options = parser.parse_args()
 
     import options as opmodule
@@ -65,6 +67,13 @@ def start_server():
 
     autoenv.init('Server')
 
+    from game import trace
+    trace.configure(options.trace)
+
+    if options.stats_log:
+        from utils.stats import JSONLBackend, sink
+        sink.configure(JSONLBackend(options.stats_log))
+
     import settings
 
     utils.logging.init_server(getattr(logging, options.log.upper()), settings.SENTRY_DSN, settings.VERSION, options.logfile)
@@ -735,8 +735,72 @@ class LaunchCard(GenericAction):
 
         return True
 
+    # Compute every distance afresh and compare with the cached one,
+    # mismatches are logged and counted in DISTANCE_CACHE_MISMATCHES
+    DISTANCE_CACHE_CHECK = False
+    DISTANCE_CACHE_MISMATCHES = 0
+
+    # Tags read by calcdistance / post_calcdistance handlers
+    DISTANCE_TAGS = (
+        'wine', 'aya_count', 'scarlet_mist', 'riverside_target',
+        'shikigami_target', 'shikigami_tag', 'turn_count',
+    )
+
+    @classmethod
+    def distance_state(cls, g):
+        # Everything distances depend on besides the card: seats, deaths,
+        # the current turn, skills (equips included, they come with skills)
+        # and the tags above. Tags are read with get(), they are defaultdicts.
+        tags = cls.DISTANCE_TAGS
+        return getattr(g, 'current_player', None), g.turn_count, [
+            (p, p.dead, p.skill_version, map(p.tags.get, tags))
+            for p in g.players
+        ]
+
     @classmethod
     def calc_distance(cls, source, card):
+        # Results are cached per game while distance_state stays the same,
+        # a death, turn change, skill or equip change drops them all.
+        # Calls made from inside a calcdistance handler (Telegnosis) see a
+        # different handler state, never cached.
+        g = Game.getgame()
+        cache = getattr(g, 'distance_cache', None)
+        if cache is None:
+            cache = g.distance_cache = DistanceCache()
+
+        if cache.depth:
+            return cls._calc_distance(source, card)
+
+        state = cls.distance_state(g)
+        if state != cache.state:
+            cache.entries.clear()
+            cache.state = state
+
+        key = (
+            source, card.__class__, getattr(card, 'treat_as', None),
+            card.color, card.category, getattr(card, 'distance', 1000),
+        )
+
+        cache.depth += 1
+        try:
+            dist = cache.entries.get(key)
+            if dist is None:
+                dist = cache.entries[key] = cls._calc_distance(source, card)
+
+            elif cls.DISTANCE_CACHE_CHECK:
+                fresh = cls._calc_distance(source, card)
+                if fresh != dist:
+                    LaunchCard.DISTANCE_CACHE_MISMATCHES += 1
+                    log.error('Stale distance for %r %r: cached %r, fresh %r', source, card, dist, fresh)
+                    dist = cache.entries[key] = fresh
+
+        finally:
+            cache.depth -= 1
+
+        return OrderedDict(dist)
+
+    @classmethod
+    def _calc_distance(cls, source, card):
         dist = cls.calc_base_distance(source)
         g = Game.getgame()
 
@@ -769,6 +833,15 @@ class LaunchCard(GenericAction):
         return dist
 
 
+class DistanceCache(object):
+    __slots__ = ('entries', 'state', 'depth')
+
+    def __init__(self):
+        self.entries = {}    # (source, card key) -> distance OrderedDict
+        self.state   = None  # LaunchCard.distance_state the entries were computed in
+        self.depth   = 0     # calc_distance calls in progress
+
+
 class ActionStageLaunchCard(LaunchCard):
     pass
 
@@ -858,6 +931,7 @@ class ActionStage(BaseActionStage):
 @register_eh
 class ShuffleHandler(EventHandler):
     interested = ('action_after', 'action_before', 'action_stage_action', 'card_migration', 'user_input_start')
+    interested_actions = (ActionStage,)
 
     def handle(self, evt_type, arg):
         if evt_type == 'action_stage_action':
@@ -2,10 +2,12 @@
 from __future__ import absolute_import
 
 # -- stdlib --
-from collections import deque
+from collections import OrderedDict, deque
+from itertools import imap, repeat
 from weakref import WeakValueDictionary
 import itertools
 import logging
+import operator
 
 # -- third party --
 # -- own --
@@ -275,6 +277,7 @@ class CardList(GameObject, deque):
     def __init__(self, owner, type):
         self.owner = owner
         self.type = type
+        self._index = {}  # id(card) -> occurrences, membership is by identity
         deque.__init__(self)
 
     def __eq__(self, rhs):
@@ -282,16 +285,102 @@ class CardList(GameObject, deque):
         # card list never equals to a deque.
         return self is rhs
 
+    def _add(self, c):
+        idx = self._index
+        k = id(c)
+        idx[k] = idx.get(k, 0) + 1
+
+    def _discard(self, c):
+        idx = self._index
+        k = id(c)
+        n = idx[k]
+        if n > 1:
+            idx[k] = n - 1
+        else:
+            del idx[k]
+
+    def __contains__(self, c):
+        return id(c) in self._index
+
+    def append(self, c):
+        deque.append(self, c)
+        self._add(c)
+
+    def appendleft(self, c):
+        deque.appendleft(self, c)
+        self._add(c)
+
+    def extend(self, cl):
+        cl = list(cl)
+        deque.extend(self, cl)
+        for c in cl:
+            self._add(c)
+
+    def extendleft(self, cl):
+        cl = list(cl)
+        deque.extendleft(self, cl)
+        for c in cl:
+            self._add(c)
+
+    def __iadd__(self, cl):
+        self.extend(cl)
+        return self
+
+    def pop(self):
+        c = deque.pop(self)
+        self._discard(c)
+        return c
+
+    def popleft(self):
+        c = deque.popleft(self)
+        self._discard(c)
+        return c
+
+    def remove(self, c):
+        if id(c) not in self._index:
+            raise ValueError('CardList.remove(x): x not in list')
+
+        # cards usually leave from either end, deck top or the last one dropped
+        if self[0] is c:
+            deque.popleft(self)
+        elif self[-1] is c:
+            deque.pop(self)
+        else:
+            del self[list(imap(operator.is_, self, repeat(c))).index(True)]
+            return  # __delitem__ updates index
+
+        self._discard(c)
+
+    def __delitem__(self, i):
+        c = self[i]
+        deque.__delitem__(self, i)
+        self._discard(c)
+
+    def __setitem__(self, i, c):
+        old = self[i]
+        deque.__setitem__(self, i, c)
+        self._discard(old)
+        self._add(c)
+
+    def clear(self):
+        deque.clear(self)
+        self._index.clear()
+
     def __repr__(self):
         return "CardList(owner=%s, type=%s, len == %d)" % (self.owner, self.type, len(self))
 
 
 class Deck(GameObject):
+    # Retired sync ids stay resolvable for a while, packets in flight may still refer to them.
+    RETIRED_GRACE = 256
+
     def __init__(self, card_definition=None):
         from thb.cards import definition
         card_definition = card_definition or definition.card_definition
 
         self.cards_record = {}
+        self.retired_record = OrderedDict()
+        self.retired_total = 0
         self.vcards_record = WeakValueDictionary()
         self.droppedcards = CardList(None, 'droppedcard')
         self.collected_ppoints = CardList(None, 'collected_ppoints')
@@ -316,6 +405,9 @@ class Deck(GameObject):
 
             tmpcl = CardList(None, 'temp')
             l = [c.__class__(c.suit, c.number, cl, c.track_id) for c in dropped[:-10]]
+            for c in dropped[:-10]:
+                self.retire_card(c)
+
             tmpcl.extend(l)
             self.shuffle(tmpcl)
             cl.extend(tmpcl)
@@ -331,8 +423,9 @@ class Deck(GameObject):
         l = []
         cr = self.cards_record
         vcr = self.vcards_record
+        rr = self.retired_record
         for cid in idlist:
-            c = vcr.get(cid, None) or cr.get(cid, None)
+            c = vcr.get(cid, None) or cr.get(cid, None) or rr.get(cid, None)
             c and l.append(c)
 
         return l
@@ -344,6 +437,26 @@ class Deck(GameObject):
         self.cards_record[sid] = card
         return sid
 
+    def retire_card(self, card):
+        sid = card.sync_id
+        if self.cards_record.get(sid) is not card:
+            return
+
+        del self.cards_record[sid]
+        rr = self.retired_record
+        rr[sid] = card
+        self.retired_total += 1
+        if len(rr) > self.RETIRED_GRACE:
+            rr.popitem(last=False)
+
+    def sync_id_stats(self):
+        return {
+            'live': len(self.cards_record),
+            'retired': len(self.retired_record),
+            'retired_total': self.retired_total,
+            'vcards': len(self.vcards_record),
+        }
+
     def register_vcard(self, vc):
         sid = Game.getgame().get_synctag()
         vc.sync_id = sid
@@ -355,6 +468,7 @@ class Deck(GameObject):
         list_shuffle(cl, owner)
 
         for c in cl:
+            self.retire_card(c)
             c.sync_id = 0
             self.register_card(c)
 
@@ -50,6 +50,7 @@ class ReforgeWeapon(Reforge):
 @register_eh
 class WeaponReforgeHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (ActionStageLaunchCard,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, ActionStageLaunchCard):
@@ -260,6 +261,7 @@ class Roukanken(GenericAction):
 @register_eh
 class RoukankenEffectHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (basic.BaseAttack,)
     execute_before = (
         'MomijiShieldHandler',
         'OpticalCloakHandler',
@@ -451,6 +453,7 @@ class RepentanceStick(GenericAction):
 @register_eh
 class RepentanceStickHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (Damage,)
     execute_before = ('WineHandler', )
 
     def handle(self, evt_type, act):
@@ -481,6 +484,7 @@ class IbukiGourdSkill(RedUFOSkill):
 @register_eh
 class IbukiGourdHandler(EventHandler):
     interested = ('action_apply', 'action_after', 'card_migration')
+    interested_actions = (Damage, FinalizeStage)
     execute_after = ('WineHandler', )
 
     def handle(self, evt_type, act):
@@ -537,6 +541,7 @@ class HouraiJewelSkill(WeaponSkill):
 @register_eh
 class HouraiJewelHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (basic.Attack,)
     execute_before = ('RejectHandler', 'WineHandler')  # wine does not affect this.
 
     def handle(self, evt_type, act):
@@ -569,6 +574,7 @@ class UmbrellaEffect(GenericAction):
 class UmbrellaHandler(EventHandler):
     # 紫的阳伞
     interested = ('action_before',)
+    interested_actions = (Damage,)
     execute_before = ('RejectHandler', )
 
     def handle(self, evt_type, act):
@@ -617,6 +623,7 @@ class MaidenCostumeAction(FatetellAction):
 @register_eh
 class MaidenCostumeHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (spellcard.SpellCardAction,)
     execute_before = ('RejectHandler', )
     execute_after = ('HouraiJewelHandler', )
 
@@ -667,6 +674,7 @@ class Hakurouken(GenericAction):
 @register_eh
 class HakuroukenHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (basic.BaseAttack,)
 
     # BUG WITH OUT THIS LINE:
     # src equips [Gourd, Hakurouken], tgt drops Exinwan
@@ -739,6 +747,7 @@ class AyaRoundfanSkill(WeaponSkill):
 @register_eh
 class AyaRoundfanHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (Damage,)
     execute_after = ('DyingHandler',)
     card_usage = 'drop'
 
@@ -843,6 +852,7 @@ class DeathSickle(GenericAction):
 @register_eh
 class DeathSickleHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (Damage,)
     execute_before = ('WineHandler', )
 
     def handle(self, evt_type, act):
@@ -879,6 +889,7 @@ class Keystone(GenericAction):
 @register_eh
 class KeystoneHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (spellcard.Sinsack,)
     execute_before = ('SaigyouBranchHandler', 'RejectHandler')
 
     def handle(self, evt_type, act):
@@ -964,6 +975,7 @@ class SuwakoHatEffect(UserAction):
 @register_eh
 class SuwakoHatHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (DropCardStage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, DropCardStage):
@@ -1128,6 +1140,7 @@ class SinsackHat(ShieldSkill):
 @register_eh
 class SinsackHatHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (FatetellStage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, FatetellStage):
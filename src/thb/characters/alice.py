@@ -117,6 +117,7 @@ class LittleLegionControlAction(UserAction):
 
 class LittleLegionHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (ActionStage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, ActionStage):
@@ -249,6 +250,7 @@ class DollBlastMigrationHandler(DollBlastHandlerCommon, EventHandler):
 
 class DollBlastDropHandler(DollBlastHandlerCommon, EventHandler):
     interested = ('action_before', 'action_after')
+    interested_actions = (DropCards,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, DropCards):
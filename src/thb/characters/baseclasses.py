@@ -15,12 +15,65 @@ from utils.misc import partition
 characters_by_category = defaultdict(set)
 
 
+class SkillList(list):
+    '''
+    list calling on_change() after every mutation
+    '''
+
+    def __init__(self, iterable, on_change):
+        list.__init__(self, iterable)
+        self.on_change = on_change
+
+    def _mutator(name):
+        f = getattr(list, name)
+
+        def mutate(self, *a):
+            rst = f(self, *a)
+            self.on_change()
+            return rst
+
+        mutate.__name__ = name
+        return mutate
+
+    for _m in (
+        'append', 'extend', 'insert', 'remove', 'pop',
+        '__setitem__', '__delitem__', '__setslice__', '__delslice__',
+        '__iadd__', '__imul__',
+    ):
+        locals()[_m] = _mutator(_m)
+
+    del _m, _mutator
+
+
 class Character(GameObject):
     character_classes = {}
 
     def __init__(self, player):
         self.player = player
         self.disabled_skills = defaultdict(set)
+        self.skill_index = None
+        self.skill_version = 0  # bumped on every skill change, see LaunchCard.calc_distance
+
+    def _build_skill_index(self):
+        # every class skills are instances of (MRO expanded), minus
+        # the ones subclassing a disabled skill
+        disabled = set()
+        for l in self.disabled_skills.values():
+            disabled.update(l)
+
+        index = set()
+        for s in self.skills:
+            index.update(s.__mro__)
+
+        if disabled:
+            index = {c for c in index if disabled.isdisjoint(c.__mro__)}
+
+        self.skill_index = index
+        return index
+
+    def invalidate_skill_index(self):
+        self.skill_index = None
+        self.skill_version += 1
 
     def get_skills(self, skill):
         return [s for s in self.skills if issubclass(s, skill)]
@@ -29,16 +82,19 @@ class Character(GameObject):
         if self.dead:
             return False
 
-        if any(issubclass(skill, s) for l in self.disabled_skills.values() for s in l):
-            return False
+        index = self.skill_index
+        if index is None:
+            index = self._build_skill_index()
 
-        return self.get_skills(skill)
+        return skill in index
 
     def disable_skill(self, skill, reason):
         self.disabled_skills[reason].add(skill)
+        self.invalidate_skill_index()
 
     def reenable_skill(self, reason):
         self.disabled_skills.pop(reason, '')
+        self.invalidate_skill_index()
 
     def __repr__(self):
         return '<Char: {}>'.format(self.__class__.__name__)
@@ -47,6 +103,10 @@ class Character(GameObject):
         return getattr(self.player, k)
 
     def __setattr__(self, k, v):
+        if k == 'skills':
+            v = SkillList(v, self.invalidate_skill_index)
+            self.invalidate_skill_index()
+
         GameObject.__setattr__(self, k, v)
         if not k.startswith('__') and k.endswith('__'):
             assert not hasattr(self.player, k)
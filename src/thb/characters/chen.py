@@ -78,6 +78,7 @@ class FlyingSkanda(Skill):
 
 class FlyingSkandaHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (LaunchCard,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, LaunchCard):
@@ -67,6 +67,7 @@ class SupportKOFReturningAction(GenericAction):
 
 class SupportKOFHandler(EventHandler):
     interested = ('character_debut', 'action_apply')
+    interested_actions = (PlayerDeath,)
     execute_after = ('DeathHandler',)
 
     def handle(self, evt_type, arg):
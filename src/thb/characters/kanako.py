@@ -148,6 +148,7 @@ class VirtueAction(UserAction):
 
 class VirtueHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (DrawCardStage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, DrawCardStage):
@@ -188,6 +189,7 @@ class KanakoFaithKOFAction(DrawCards):
 
 class KanakoFaithKOFHandler(EventHandler):
     interested = ('action_before', 'action_apply')
+    interested_actions = (FinalizeStage, Damage)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, FinalizeStage):
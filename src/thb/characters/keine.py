@@ -119,6 +119,7 @@ class KeineGuardAwake(UserAction):
 
 class KeineGuardHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (PrepareStage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, PrepareStage):
@@ -193,6 +194,7 @@ class DevourEffect(GenericAction):
 
 class DevourHandler(EventHandler):
     interested = ('action_before', 'action_after')
+    interested_actions = (ActionStage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, ActionStage):
@@ -52,6 +52,7 @@ class HopeMaskKOFAction(BaseHopeMaskAction):
 
 class BaseHopeMaskHandler(EventHandler):
     interested = ('action_apply',)
+    interested_actions = (ActionStage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, ActionStage):
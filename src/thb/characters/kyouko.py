@@ -31,6 +31,7 @@ class EchoAction(UserAction):
 
 class EchoHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (Damage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, Damage):
@@ -105,6 +106,7 @@ class ResonanceAction(AskForCard):
 
 class ResonanceHandler(EventHandler):
     interested = ('action_done',)
+    interested_actions = (Attack,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_done' and isinstance(act, Attack):
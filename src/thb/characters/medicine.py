@@ -38,6 +38,7 @@ class CiguateraAction(UserAction):
 
 class CiguateraHandler(EventHandler):
     interested = ('action_after', 'action_before')
+    interested_actions = (FatetellStage,)
     card_usage = 'drop'
 
     def handle(self, evt_type, act):
@@ -104,6 +105,7 @@ class MelancholyAction(GenericAction):
 
 class MelancholyHandler(EventHandler):
     interested = ('action_after', 'action_shootdown')
+    interested_actions = (Damage, LaunchCard, UseCard)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, Damage):
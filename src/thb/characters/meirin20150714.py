@@ -64,6 +64,7 @@ class Qiliao(Skill):
 
 class QiliaoDropHandler(EventHandler):
     interested = ('action_apply',)
+    interested_actions = (PlayerTurn,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, PlayerTurn):
@@ -105,6 +106,7 @@ class QiliaoRecoverAction(UserAction):
 
 class QiliaoRecoverHandler(EventHandler):
     interested = ('action_apply',)
+    interested_actions = (PlayerTurn,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, PlayerTurn):
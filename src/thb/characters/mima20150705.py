@@ -100,6 +100,7 @@ class ElingDrawCards(DrawCards):
 
 class ElingHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (Damage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, Damage):
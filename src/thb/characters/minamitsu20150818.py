@@ -107,6 +107,7 @@ class ShipwreckDropCardStage(DropCardStage):
 
 class ShipwreckHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (DropCardStage,)
     execute_before = ('DecayDamageHandler', )
 
     def handle(self, evt_type, act):
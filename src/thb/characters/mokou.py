@@ -51,6 +51,7 @@ class RebornAction(UserAction):
 
 class AshesHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (PlayerTurn,)
     execute_before = ('CiguateraHandler', )
 
     def handle(self, evt_type, act):
@@ -67,6 +68,7 @@ class AshesHandler(EventHandler):
 
 class RebornHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (FatetellStage,)
     execute_before = ('CiguateraHandler', )
     card_usage = 'drop'
 
@@ -37,6 +37,7 @@ class TreasureHunt(Skill):
 
 class TreasureHuntHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (FatetellStage,)
     execute_before = ('CiguateraHandler', )
 
     def handle(self, evt_type, act):
@@ -53,6 +53,7 @@ class ProphetAction(GenericAction):
 
 class ProphetHandler(EventHandler):
     interested = ('action_apply',)
+    interested_actions = (PlayerTurn,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, PlayerTurn):
@@ -114,6 +115,7 @@ class ExtremeIntelligenceAction(GenericAction):
 
 class ExtremeIntelligenceHandler(EventHandler):
     interested = ('action_after', 'game_begin')
+    interested_actions = (InstantSpellCardAction,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, InstantSpellCardAction):
@@ -174,6 +176,7 @@ class ExtremeIntelligenceKOF(TreatAs, Skill):
 
 class ExtremeIntelligenceKOFHandler(EventHandler):
     interested = ('action_apply', 'action_shootdown')
+    interested_actions = (ActionStageLaunchCard,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, ActionStageLaunchCard):
@@ -216,6 +219,7 @@ class NakedFoxAction(GenericAction):
 
 class NakedFoxHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (Damage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, Damage):
@@ -95,6 +95,7 @@ class Tribute(Skill):
 
 class TributeHandler(EventHandler):
     interested = ('action_after', 'game_begin', 'switch_character')
+    interested_actions = (PlayerRevive,)
 
     def handle(self, evt_type, arg):
         if evt_type == 'game_begin':
@@ -160,6 +161,7 @@ class ReimuExterminateAction(AskForCard):
 
 class ReimuExterminateHandler(EventHandler):
     interested = ('action_apply', 'action_after')
+    interested_actions = (Damage, FinalizeStage)
     execute_after = ('DyingHandler', 'CheatingHandler', 'IbukiGourdHandler')
 
     def handle(self, evt_type, act):
@@ -227,6 +229,7 @@ class ReimuClearAction(UserAction):
 
 class ReimuClearHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (Damage,)
     execute_before = (
         'MasochistHandler',
         'DecayDamageHandler',
@@ -40,6 +40,7 @@ class LunaticAction(UserAction):
 
 class LunaticHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (Damage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, Damage):
@@ -77,6 +78,7 @@ class DiscarderDistanceLimit(ActionShootdown):
 
 class DiscarderHandler(EventHandler):
     interested = ('action_after', 'action_shootdown')
+    interested_actions = (ActionStageLaunchCard, PlayerTurn)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_shootdown' and isinstance(act, ActionStageLaunchCard):
@@ -117,6 +119,7 @@ class MahjongDrugAction(UserAction):
 
 class MahjongDrugHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (Heal,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, Heal):
@@ -31,6 +31,7 @@ class SpearTheGungnirAction(GenericAction):
 
 class SpearTheGungnirHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (Attack,)
     execute_before = ('ScarletRhapsodySwordHandler', )
     execute_after = (
         'HakuroukenEffectHandler',
@@ -71,6 +72,7 @@ class VampireKissAction(GenericAction):
 
 class VampireKissHandler(EventHandler):
     interested = ('action_apply', 'calcdistance')
+    interested_actions = (Damage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, Damage):
@@ -108,6 +110,7 @@ class ScarletMistHandler(EventHandler):
         'action_shootdown',
         'post_calcdistance',
     )
+    interested_actions = (LaunchCard, Damage, PrepareStage)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_shootdown' and isinstance(act, LaunchCard):
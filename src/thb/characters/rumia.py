@@ -93,6 +93,7 @@ class DarknessKOFLimit(ActionShootdown):
 
 class DarknessKOFHandler(EventHandler):
     interested = ('character_debut', 'action_shootdown')
+    interested_actions = (LaunchCard,)
 
     def handle(self, evt_type, arg):
         if evt_type == 'character_debut':
@@ -139,6 +140,7 @@ class CheatingDrawCards(DrawCards):
 
 class CheatingHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (PlayerTurn,)
     execute_before = ('CiguateraHandler', )
 
     def handle(self, evt_type, act):
@@ -53,6 +53,7 @@ class LunaDial(Skill):
 
 class LunaDialHandler(EventHandler):
     interested = ('action_after',)
+    interested_actions = (PrepareStage,)
     execute_after = ('CiguateraHandler', )
 
     def handle(self, evt_type, act):
@@ -43,6 +43,7 @@ class MindReadLimit(ActionShootdown):
 
 class MindReadHandler(EventHandler):
     interested = ('action_shootdown', )
+    interested_actions = (LaunchCard,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_shootdown' and isinstance(act, LaunchCard):
@@ -82,6 +83,7 @@ class Rosa(Skill):
 
 class RosaHandler(EventHandler):
     interested = ('action_after', )
+    interested_actions = (Damage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, Damage):
@@ -149,6 +149,7 @@ class SummonAction(UserAction):
 
 class SummonHandler(EventHandler):
     interested = ('action_before', )
+    interested_actions = (PlayerDeath,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, PlayerDeath):
@@ -228,6 +229,7 @@ class SummonKOFCollect(UserAction):
 
 class SummonKOFHandler(EventHandler):
     interested = ('action_apply',)
+    interested_actions = (PlayerDeath,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, PlayerDeath):
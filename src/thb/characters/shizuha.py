@@ -55,6 +55,7 @@ class AutumnWindAction(UserAction):
 
 class AutumnWindHandler(EventHandler):
     interested = ('action_after', )
+    interested_actions = (DropCardStage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_after' and isinstance(act, DropCardStage):
@@ -153,6 +154,7 @@ class DecayEffect(UserAction):
 
 class DecayDamageHandler(EventHandler):
     interested = ('action_after', 'action_before')
+    interested_actions = (Damage, DropCardStage)
     execute_after = ('SuwakoHatHandler', )
 
     def handle(self, evt_type, act):
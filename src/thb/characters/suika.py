@@ -58,6 +58,7 @@ class HeavyDrinker(Skill):
 
 class HeavyDrinkerHandler(EventHandler):
     interested = ('action_apply', )
+    interested_actions = (ActionStage,)
     execute_before = ('WineHandler', )
 
     def handle(self, evt_type, act):
@@ -79,6 +80,7 @@ class DrunkenDreamDrawCards(DrawCards):
 
 class DrunkenDreamHandler(EventHandler):
     interested = ('action_apply', 'calcdistance')
+    interested_actions = (PlayerTurn,)
     execute_before = ('WineHandler', )
 
     def handle(self, evt_type, act):
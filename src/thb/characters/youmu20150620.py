@@ -66,6 +66,7 @@ class JiongyanjianMixin(object):
 
 class JiongyanjianHandler(EventHandler):
     interested = ('action_before', 'action_after')
+    interested_actions = (UseGraze, LaunchGraze, Attack)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, (UseGraze, LaunchGraze)):
@@ -112,6 +113,7 @@ class XianshizhanAction(UserAction):
 
 class XianshizhanHandler(EventHandler):
     interested = ('action_apply', )
+    interested_actions = (FinalizeStage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, FinalizeStage):
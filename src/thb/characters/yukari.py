@@ -69,6 +69,7 @@ class SpiritingAway(Skill):
 
 class SpiritingAwayHandler(EventHandler):
     interested = ('action_after', 'action_apply')
+    interested_actions = (PlayerTurn,)
 
     def handle(self, evt_type, arg):
         if evt_type == 'action_apply' and isinstance(arg, PlayerTurn):
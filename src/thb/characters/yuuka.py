@@ -53,6 +53,7 @@ class SadistKOFDamageAction(UserAction):
 
 class SadistKOFHandler(EventHandler):
     interested = ('action_after', 'character_debut')
+    interested_actions = (PlayerDeath,)
     execute_after = ('DeathHandler', )
 
     def handle(self, evt_type, arg):
@@ -140,6 +141,7 @@ class SadistAction(UserAction):
 
 class SadistHandler(EventHandler):
     interested = ('action_after', 'action_before')
+    interested_actions = (PlayerDeath, Damage)
     card_usage = 'drop'
     execute_before = ('WineHandler', )
     execute_after = ('DeathHandler', )
@@ -40,6 +40,7 @@ class GuidedDeathEffect(GenericAction):
 
 class GuidedDeathHandler(EventHandler):
     interested = ('action_apply',)
+    interested_actions = (FinalizeStage,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, FinalizeStage):
@@ -89,6 +90,7 @@ class SoulDrainEffect(GenericAction):
 
 class SoulDrainHandler(EventHandler):
     interested = ('action_before',)
+    interested_actions = (TryRevive,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_before' and isinstance(act, TryRevive):
@@ -114,6 +116,7 @@ class SoulDrainHandler(EventHandler):
 
 class PerfectCherryBlossomHandler(EventHandler):
     interested = ('action_apply',)
+    interested_actions = (PlayerDeath,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, PlayerDeath):
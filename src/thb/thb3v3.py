@@ -205,7 +205,7 @@ class THBattle(Game):
     def update_event_handlers(g):
         ehclasses = list(action_eventhandlers) + g.game_ehs.values()
         ehclasses += g.ehclasses
-        g.set_event_handlers(EventHandler.make_list(ehclasses))
+        g.set_event_handler_classes(ehclasses)
 
     def decorate(g, p):
         from .cards import CardList
@@ -54,6 +54,7 @@ class DebugDecMaxLife(Skill):
 
 class DebugHandler(EventHandler):
     interested = ('action_after', 'game_begin', 'switch_character')
+    interested_actions = (PlayerRevive,)
     '''
     Add this handler to game_eh to active debug skills
     '''
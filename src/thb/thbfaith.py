@@ -33,6 +33,7 @@ def game_eh(cls):
 @game_eh
 class DeathHandler(EventHandler):
     interested = ('action_after', 'action_apply')
+    interested_actions = (PlayerDeath,)
 
     def handle(self, evt_type, act):
         if evt_type == 'action_apply' and isinstance(act, PlayerDeath):
@@ -225,7 +226,7 @@ class THBattleFaith(Game):
     def update_event_handlers(g):
         ehclasses = list(action_eventhandlers) + g.game_ehs.values()
         ehclasses += g.ehclasses
-        g.set_event_handlers(EventHandler.make_list(ehclasses))
+        g.set_event_handler_classes(ehclasses)
 
     def switch_character(g, p, choice):
         choice.akari = False
@@ -227,7 +227,7 @@ class THBattleKOF(Game):
     def update_event_handlers(g):
         ehclasses = list(action_eventhandlers) + g.game_ehs.values()
         ehclasses += g.ehclasses
-        g.set_event_handlers(EventHandler.make_list(ehclasses))
+        g.set_event_handler_classes(ehclasses)
 
     def next_character(g, p, choice):
         g.players.reveal(choice)
@@ -607,7 +607,7 @@ class THBattleNewbie(Game):
         ehclasses = list(action_eventhandlers) + g.game_ehs.values()
         ehclasses += g.ehclasses
         ehclasses.remove(ShuffleHandler)  # disable shuffling
-        g.set_event_handlers(EventHandler.make_list(ehclasses))
+        g.set_event_handler_classes(ehclasses)
 
     def set_character(g, p, cls):
         new, old_cls = mixin_character(p, cls)
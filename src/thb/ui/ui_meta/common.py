@@ -8,6 +8,29 @@ from collections import OrderedDict
 
 metadata = OrderedDict()
 
+# (cls, name) -> ui_meta value, MISSING if no base defines it.
+# Filled on first access, dropped when metadata changes.
+resolved = {}
+MISSING = object()
+
+
+def resolve(cls, name):
+    if hasattr(cls, '_is_mixedclass'):
+        l = list(cls.__bases__)
+    else:
+        l = [cls]
+
+    while l:
+        c = l.pop(0)
+        try:
+            return metadata[c][name]
+        except KeyError:
+            pass
+        b = c.__base__
+        if b is not object: l.append(b)
+
+    return MISSING
+
 
 class UIMetaAccesser(object):
     def __init__(self, obj, cls):
@@ -16,26 +39,19 @@ class UIMetaAccesser(object):
 
     def __getattr__(self, name):
         cls = self.cls
-        if hasattr(cls, '_is_mixedclass'):
-            l = list(cls.__bases__)
-        else:
-            l = [cls]
-
-        while l:
-            c = l.pop(0)
-            try:
-                val = metadata[c][name]
+        key = (cls, name)
+        try:
+            val = resolved[key]
+        except KeyError:
+            val = resolved[key] = resolve(cls, name)
 
-                if isinstance(val, FunctionType) and getattr(val, '_is_property', False):
-                    val = val(self.obj or self.cls)
+        if val is MISSING:
+            raise AttributeError('%s.%s' % (cls.__name__, name))
 
-                return val
+        if isinstance(val, FunctionType) and getattr(val, '_is_property', False):
+            val = val(self.obj or cls)
 
-            except KeyError:
-                pass
-            b = c.__base__
-            if b is not object: l.append(b)
-        raise AttributeError('%s.%s' % (self.cls.__name__, name))
+        return val
 
 
 class UIMetaDescriptor(object):
@@ -51,6 +67,7 @@ def gen_metafunc(_for):
             raise Exception('%s ui_meta redefinition!' % meta_for)
 
         metadata[meta_for] = _dict
+        resolved.clear()
 
         return _dict
 
@@ -6,6 +6,7 @@ import traceback
 
 # -- third party --
 from gevent.hub import Waiter, _NONE, get_hub
+import gevent
 
 # -- own --
 # -- code --
@@ -57,3 +58,63 @@ def iwait(objects, timeout=None):
                     unlink(switch)
                 except:
                     traceback.print_exc()
+
+
+class IdleWheel(object):
+    """Coarse timer wheel expiring objects that stay idle for too long.
+
+    Tracked objects mark activity by storing `wheel.now` to their `idle_since`
+    attribute, or None while busy. No timer is touched on that path: the wheel
+    ticks every `granularity` seconds, looks at one slot only, expires what
+    is overdue and moves the rest to the slot of their new deadline.
+    """
+
+    def __init__(self, timeout, on_expire, granularity=1):
+        self.ticks = n = int(timeout / granularity)
+        self.granularity = granularity
+        self.on_expire = on_expire
+        self.slots = [set() for i in xrange(n + 1)]
+        self.now = 0
+        self.ticker = None
+
+    def add(self, o):
+        o.idle_since = self.now
+        o.idle_slot = slot = self.slots[(self.now + self.ticks) % len(self.slots)]
+        slot.add(o)
+        self.ticker = self.ticker or gevent.spawn(self._ticker)
+
+    def discard(self, o):
+        slot = getattr(o, 'idle_slot', None)
+        slot is not None and slot.discard(o)
+        o.idle_slot = None
+
+    def __len__(self):
+        return sum(len(s) for s in self.slots)
+
+    def tick(self):
+        self.now = now = self.now + 1
+        slots, ticks = self.slots, self.ticks
+        slot = slots[now % len(slots)]
+        expired = []
+        for o in list(slot):
+            since = o.idle_since
+            deadline = (now if since is None else since) + ticks
+            if deadline <= now:
+                expired.append(o)
+                continue
+
+            slot.remove(o)
+            o.idle_slot = dst = slots[deadline % len(slots)]
+            dst.add(o)
+
+        for o in expired:
+            self.discard(o)
+            self.on_expire(o)
+
+    def _ticker(self):
+        while True:
+            gevent.sleep(self.granularity)
+            try:
+                self.tick()
+            except Exception:
+                traceback.print_exc()
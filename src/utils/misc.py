@@ -23,7 +23,7 @@ dbgvals = {}
 
 
 class Packet(list):  # compare by identity list
-    __slots__ = ('scan_count')
+    __slots__ = ('seq',)
 
     def __hash__(self):
         return id(self)
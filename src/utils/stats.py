@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
+from __future__ import absolute_import
 
 # -- stdlib --
+from collections import deque
+import atexit
 import json
+import logging
 import sys
+import time
 import uuid
 
 # -- third party --
+from gevent.event import Event
 import gevent
 import requests
 
@@ -15,6 +21,7 @@ from user_settings import UserSettings
 
 
 # -- code --
+log = logging.getLogger('stats')
 SESSION = str(uuid.uuid4())
 
 
@@ -22,39 +29,142 @@ SESSION = str(uuid.uuid4())
 # {'event': 'buy-item', 'attributes': {'item-category': 'book'}, 'metrics': {'amount': 9.99}},
 # {'event': '_session.close', 'duration': 10000}
 
-def _stats(events):
-    if not events: return
 
-    for i in xrange(3):
-        try:
-            requests.post(
-                'https://api.leancloud.cn/1.1/stats/open/collect',
-                headers={
-                    'Content-Type': 'application/json',
-                    'X-AVOSCloud-Application-Id': LEANCLOUD_APPID,
-                    'X-AVOSCloud-Application-Key': LEANCLOUD_APPKEY,
+class HTTPBackend(object):
+    URL = 'https://api.leancloud.cn/1.1/stats/open/collect'
+    TIMEOUT = 10
+
+    def send(self, events):
+        resp = requests.post(
+            self.URL,
+            headers={
+                'Content-Type': 'application/json',
+                'X-AVOSCloud-Application-Id': LEANCLOUD_APPID,
+                'X-AVOSCloud-Application-Key': LEANCLOUD_APPKEY,
+            },
+            data=json.dumps({
+                'client': {
+                    'id': UserSettings.client_id,
+                    'platform': sys.platform,
+                    'app_version': VERSION,
+                    'app_channel': 'thbattle.net',
+                },
+                'session': {
+                    'id': SESSION,
                 },
-                data=json.dumps({
-                    'client': {
-                        'id': UserSettings.client_id,
-                        'platform': sys.platform,
-                        'app_version': VERSION,
-                        'app_channel': 'thbattle.net',
-                    },
-                    'session': {
-                        'id': SESSION,
-                    },
-                    'events': events,
-                })
-            )
-            break
+                'events': events,
+            }),
+            timeout=self.TIMEOUT,
+        )
+        # client errors won't get better by retrying
+        resp.status_code >= 500 and resp.raise_for_status()
+
+
+class JSONLBackend(object):
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, events):
+        with open(self.path, 'a') as f:
+            f.write(''.join(json.dumps(e) + '\n' for e in events))
+
+
+class StubBackend(object):
+    def __init__(self):
+        self.batches = []
+
+    def send(self, events):
+        self.batches.append(events)
+
+
+class StatsSink(object):
+    '''
+    Bounded in-process queue of stats events, drained in batches by a
+    single greenlet. Events are sent when BATCH_SIZE of them are pending or
+    FLUSH_INTERVAL seconds passed. A failing backend is retried with backoff
+    by the same greenlet, new events are dropped (and counted) once the queue
+    is full, so an outage costs memory bounded by QUEUE_SIZE and nothing else.
+    '''
+
+    QUEUE_SIZE     = 10000
+    BATCH_SIZE     = 100
+    FLUSH_INTERVAL = 10
+    MAX_BACKOFF    = 300
 
+    def __init__(self, backend):
+        self.backend = backend
+        self.queue   = deque()
+        self.event   = Event()
+        self.worker  = None
+        self.sent    = 0
+        self.dropped = 0
+        self.failed  = 0  # backend errors
+
+    def configure(self, backend):
+        self.backend = backend
+
+    def add(self, events):
+        q = self.queue
+        n = min(len(events), self.QUEUE_SIZE - len(q))
+        q.extend(events[:n])
+        self.dropped += len(events) - n
+
+        len(q) >= self.BATCH_SIZE and self.event.set()
+        if not self.worker:
+            self.worker = gevent.spawn(self._worker)
+
+    def _send_batch(self):
+        q = self.queue
+        batch = [q.popleft() for i in xrange(min(len(q), self.BATCH_SIZE))]
+        try:
+            self.backend.send(batch)
+            self.sent += len(batch)
         except Exception:
-            import traceback
-            traceback.print_exc()
-            gevent.sleep(1)
-            continue
+            # put them back, dropping the newest if they don't fit anymore
+            self.failed += 1
+            q.extendleft(reversed(batch))
+            while len(q) > self.QUEUE_SIZE:
+                q.pop()
+                self.dropped += 1
+
+            raise
+
+    def _worker(self):
+        backoff = 0
+        while True:
+            self.event.wait(self.FLUSH_INTERVAL)
+            self.event.clear()
+            while self.queue:
+                try:
+                    self._send_batch()
+                    backoff = 0
+                except Exception:
+                    log.exception('Error sending stats, %d pending', len(self.queue))
+                    backoff = min(max(backoff * 2, 1), self.MAX_BACKOFF)
+                    gevent.sleep(backoff)
+
+    def flush(self, timeout=5):
+        '''
+        Send everything pending synchronously, gives up after timeout seconds.
+        '''
+        deadline = time.time() + timeout
+        while self.queue and time.time() < deadline:
+            try:
+                self._send_batch()
+            except Exception:
+                log.exception('Error flushing stats, %d pending', len(self.queue))
+                break
+
+    def __repr__(self):
+        return '%s:%s:sent=%d:dropped=%d:failed=%d:pending=%d' % (
+            self.__class__.__name__, self.backend.__class__.__name__,
+            self.sent, self.dropped, self.failed, len(self.queue),
+        )
+
+
+sink = StatsSink(HTTPBackend())
+atexit.register(sink.flush)
 
 
 def stats(*events):
-    gevent.spawn(_stats, events)
+    sink.add(events)
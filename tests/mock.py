@@ -56,6 +56,10 @@ class MockConnection(object):
         encoded = Endpoint.encode(data)
         self.gdhistory.append([tag, Endpoint.decode(encoded)])
 
+    def gwrite_encoded(self, encoded):
+        log.debug('GAME_WRITE_ENCODED: %s', repr(encoded))
+        self.gdhistory.append(Endpoint.decode(encoded)[1])
+
     def gclear(self):
         assert self.exhausted
 
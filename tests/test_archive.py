@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+import gzip
+import json
+import os
+import tempfile
+
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+from endpoint import Endpoint
+from game.archive import ArchiveWriter, REC_GAMEDATA, REC_USER_GAMEDATA, open_archive
+
+
+# -- code --
+class TestArchive(object):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def testRoundTrip(self):
+        hdr = {'names': [u'a', u'b'], 'mode': 'THBattle', 'gameid': 1, 'params': {}, 'items': {}, 'rndseed': 1}
+        w = ArchiveWriter(open(self.path, 'wb'), hdr, chunk_size=64)
+        recs = []
+        for i in xrange(50):
+            recs.append([REC_GAMEDATA, i % 2, Endpoint.encode(['gamedata', ['Sync:%d' % i, [i]]])])
+            recs.append([REC_USER_GAMEDATA, i % 2, 'I:ChooseOption:%d' % i, True])
+
+        for r in recs:
+            w.append(r)
+
+        # readable while being written
+        r = open_archive(self.path)
+        eq_(r.footer, None)
+        eq_(list(r) + w.pending(), recs)
+
+        w.close({'end_time': 2})
+
+        r = open_archive(self.path)
+        eq_(r.header, hdr)
+        eq_(r.footer['records'], 100)
+        eq_(r.footer['end_time'], 2)
+        eq_(list(r), recs)
+        eq_(list(r), recs)  # every pass starts over
+        r.close()
+        assert r.f.closed
+
+    def testTruncated(self):
+        w = ArchiveWriter(open(self.path, 'wb'), {}, chunk_size=64)
+        for i in xrange(50):
+            w.append([REC_USER_GAMEDATA, 0, 'I:ChooseOption:%d' % i, True])
+
+        w.close()
+        data = open(self.path, 'rb').read()
+        with open(self.path, 'wb') as f:
+            f.write(data[:len(data) // 2])
+
+        r = open_archive(self.path)
+        eq_(r.footer, None)
+        l = list(r)
+        assert 0 < len(l) < 50
+        eq_(l, [[REC_USER_GAMEDATA, 0, 'I:ChooseOption:%d' % i, True] for i in xrange(len(l))])
+
+    def testLegacy(self):
+        os.unlink(self.path)
+        self.path += '.gz'
+        f = gzip.open(self.path, 'wb')
+        f.write('\n'.join([
+            '# a, b', '# Ver: 1', '# GameId: 3', '# Time: start = 0, end = 1, elapsed = 1',
+            'THBattle', '{}', '{}', '123',
+            json.dumps([[0, 'I:ChooseOption:1', True]]),
+            json.dumps([[['Sync:1', [1]]], []]),
+        ]))
+        f.close()
+
+        r = open_archive(self.path)
+        eq_(r.header['gameid'], 3)
+        eq_(r.header['names'], ['a', 'b'])
+        gd, ugd = list(r)
+        eq_(gd[:2], [REC_GAMEDATA, 0])
+        eq_(Endpoint.decode(gd[2]), ['gamedata', ['Sync:1', [1]]])
+        eq_(ugd, [REC_USER_GAMEDATA, 0, 'I:ChooseOption:1', True])
+        r.close()
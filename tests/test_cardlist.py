@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+import random
+
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+
+
+# -- code --
+class TestCardList(object):
+
+    def testIndex(self):
+        from game import autoenv
+        autoenv.init('Server')
+        from thb.cards import AttackCard, CardList
+
+        cl = CardList(None, 'cards')
+        other = CardList(None, 'droppedcard')
+        cards = [AttackCard(0, 0, cl) for i in xrange(20)]
+        cl.extend(cards[:10])
+        cl.extendleft(cards[10:15])
+        for c in cards[15:]:
+            cl.appendleft(c)
+
+        rnd = random.Random(1)
+        rnd.shuffle(cl)
+        eq_(sorted(map(id, cl)), sorted(map(id, cards)))
+
+        for c in rnd.sample(cards, 10):
+            assert not c.detached
+            c.move_to(other)
+            assert c in other and c not in cl
+
+        cl.rotate(3)
+        cl.popleft()
+        cl.pop()
+        del cl[2]
+        cl[0] = cards[0]
+        eq_(len(cl), 7)
+        eq_(sum(cl._index.values()), len(cl))
+        for c in cards:
+            eq_(c in cl, any(x is c for x in list(cl)))
+
+        cl.clear()
+        assert all(c not in cl for c in cards)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+from collections import defaultdict
+
+# -- third party --
+from nose.tools import eq_
+from sqlalchemy import event
+
+# -- own --
+
+
+# -- code --
+class TestCreditLedger(object):
+
+    @classmethod
+    def setUpClass(cls):
+        import db.session
+        db.session.init('sqlite://')
+
+    def setUp(self):
+        from db.session import Session, DBState
+        from db.models import User, DiscuzMember, DiscuzMemberCount
+        from db.base import Model
+        Model.metadata.drop_all(DBState.engine)
+        Model.metadata.create_all(DBState.engine)
+        s = Session()
+        for i in xrange(1, 5):
+            s.add(User(id=i, username=str(i), jiecao=100, title='', email='%d@test.com' % i))
+            s.add(DiscuzMember(uid=i, username=str(i)))
+            s.add(DiscuzMemberCount(uid=i, jiecao=100, games=10))
+
+        s.commit()
+
+    def testFlush(self):
+        from account.forum_integration import Account, CreditLedger
+        from db.models import DiscuzMemberCount, User
+        from db.session import DBState, Session
+
+        accounts = []
+        for i in xrange(1, 5):
+            acc = Account()
+            acc.userid = i
+            acc.other = defaultdict(lambda: None, title=u'', credits=100, games=10, drops=0)
+            accounts.append(acc)
+
+        ledger = CreditLedger()
+        for acc in accounts:
+            ledger.add(acc, [('jiecao', 5 if acc.userid < 3 else 10), ('games', 1)])
+
+        ledger.add(accounts[0], [('jiecao', 5), ('drops', 1)])
+        ledger.flusher.kill()
+
+        updates = []
+
+        def count(conn, cursor, statement, *a):
+            statement.startswith('UPDATE') and updates.append(statement)
+
+        event.listen(DBState.engine, 'before_cursor_execute', count)
+        try:
+            ledger.flush()
+        finally:
+            event.remove(DBState.engine, 'before_cursor_execute', count)
+
+        # jiecao +10 (users 1, 3, 4), jiecao +5, games +1, drops +1, on both tables
+        eq_(len(updates), 8)
+        eq_(ledger.pending, {})
+
+        s = Session()
+        eq_(
+            s.query(DiscuzMemberCount.jiecao, DiscuzMemberCount.games).order_by(DiscuzMemberCount.uid).all(),
+            [(110, 11), (105, 11), (110, 11), (110, 11)],
+        )
+        eq_(s.query(User.drops).filter(User.id == 1).scalar(), 1)
+        eq_([a.other['credits'] for a in accounts], [110, 105, 110, 110])
+        eq_(accounts[0].other['drops'], 1)
+
+    def testRetry(self):
+        from account.forum_integration import Account, CreditLedger
+
+        acc = Account()
+        acc.userid = 1
+        acc.other = defaultdict(lambda: None)
+
+        ledger = CreditLedger()
+        ledger._write = lambda pending: 1 / 0
+        ledger.add(acc, [('jiecao', 5)])
+        ledger.flusher.kill()
+        ledger.flush()
+        ledger.flusher.kill()
+        eq_(dict(ledger.pending[1][1]), {'jiecao': 5})
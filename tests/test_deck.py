@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+import random
+
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+from .mock import hook_game
+
+
+# -- code --
+class TestDeck(object):
+
+    def makeDeck(self, n):
+        from game import autoenv
+        autoenv.init('Server')
+        from thb.cards import AttackCard, Card, Deck
+        from thb.thb3v3 import THBattle
+
+        g = THBattle()
+        g.random = random.Random(1)
+        hook_game(g)
+        return Deck([(AttackCard, Card.SPADE, i + 1) for i in xrange(n)])
+
+    def testShuffleRetires(self):
+        deck = self.makeDeck(10)
+        cards = list(deck.cards)
+        old = [c.sync_id for c in cards]
+        eq_(sorted(deck.cards_record), sorted(old))
+
+        deck.shuffle(deck.cards)
+        new = [c.sync_id for c in cards]
+        assert not set(old) & set(new)
+        assert not set(old) & set(deck.cards_record)
+        eq_(sorted(deck.cards_record), sorted(new))
+
+        # old ids still resolve, to the same cards
+        eq_(deck.lookupcards(old), cards)
+        eq_(deck.lookupcards(new), cards)
+
+        eq_(deck.sync_id_stats(), {'live': 10, 'retired': 10, 'retired_total': 10, 'vcards': 0})
+
+    def testRetiredGrace(self):
+        from thb.cards import AttackCard, Card
+
+        deck = self.makeDeck(10)
+        grace = deck.RETIRED_GRACE
+        deck.shuffle(deck.cards)
+        first = deck.retired_record.keys()[0]
+        card = deck.retired_record[first]
+
+        def retire_one():
+            c = deck.inject(AttackCard, Card.SPADE, 1)
+            deck.retire_card(c)
+
+        # 9 ids retired after it in the same shuffle
+        for i in xrange(grace - 10):
+            retire_one()
+
+        eq_(len(deck.retired_record), grace)
+        eq_(deck.lookupcards([first]), [card])
+
+        retire_one()
+        assert first not in deck.retired_record
+        live = deck.cards[-1]
+        eq_(deck.lookupcards([first, live.sync_id]), [live])
+
+        eq_(deck.sync_id_stats(), {'live': 10, 'retired': grace, 'retired_total': grace + 1, 'vcards': 0})
+
+    def testReshuffleDropped(self):
+        deck = self.makeDeck(20)
+        dropped = list(deck.cards)[:15]
+        for c in dropped:
+            c.move_to(deck.droppedcards)
+
+        replaced = dropped[:-10]
+        old = [c.sync_id for c in replaced]
+        kept = [c.sync_id for c in dropped[-10:]]
+
+        eq_(len(deck.getcards(10)), 10)
+        eq_(len(deck.cards), 10)
+        eq_(list(deck.droppedcards), dropped[-10:])
+
+        # replaced card objects are retired, their copies got new ids
+        assert not set(old) & set(deck.cards_record)
+        eq_(deck.lookupcards(old), replaced)
+        assert not set(deck.cards) & set(replaced)
+        for c in deck.cards:
+            assert deck.cards_record[c.sync_id] is c
+
+        eq_(deck.lookupcards(kept), dropped[-10:])
+
+        eq_(deck.sync_id_stats(), {'live': 20, 'retired': 5, 'retired_total': 5, 'vcards': 0})
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+from collections import defaultdict
+from weakref import WeakSet
+
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+from .mock import create_mock_player, hook_game
+
+
+# -- code --
+class TestDistanceCache(object):
+
+    def makeGame(self):
+        from game import autoenv
+        autoenv.init('Server')
+        from thb.cards import CardList
+        from thb.cards.basic import AttackCardRangeHandler
+        from thb.cards.equipment import EquipmentTransferHandler, UFODistanceHandler
+        from thb.characters.baseclasses import Character
+        from thb.thb3v3 import THBattle
+        from utils import BatchList
+
+        class Dummy(Character):
+            skills = []
+
+        g = THBattle()
+        hook_game(g)
+        g.action_stack = [autoenv.Action(None, None)]
+        g.gr_groups = WeakSet()
+        g.set_event_handler_classes([AttackCardRangeHandler, EquipmentTransferHandler, UFODistanceHandler])
+
+        pl = []
+        for i in xrange(4):
+            p = Dummy(create_mock_player([]))
+            p.skills = []
+            p.dead = False
+            p.tags = defaultdict(int)
+            p.cards = CardList(p, 'cards')
+            p.equips = CardList(p, 'equips')
+            pl.append(p)
+
+        g.players = BatchList(pl)
+        g.current_player = pl[0]
+        return g
+
+    def testInvalidation(self):
+        from thb.actions import LaunchCard, migrate_cards
+        from thb.cards import AttackCard, RedUFOCard
+        from thb.cards.equipment import RedUFOSkill
+
+        g = self.makeGame()
+        a, b, c, d = g.players
+        calc = LaunchCard.calc_distance
+
+        eq_(calc(a, AttackCard()).values(), [-1, 0, 1, 0])
+        cache = g.distance_cache
+        eq_(len(cache.entries), 1)
+        eq_(calc(a, AttackCard()).values(), [-1, 0, 1, 0])
+        eq_(len(cache.entries), 1)
+
+        # equip migration
+        ufo = RedUFOCard(RedUFOCard.SPADE, 1, a.cards)
+        a.cards.append(ufo)
+        migrate_cards([ufo], a.equips)
+        assert a.has_skill(RedUFOSkill)
+        eq_(calc(a, AttackCard()).values(), [-2, -1, 0, -1])
+        eq_(len(cache.entries), 1)
+
+        # skill change
+        calc(a, AttackCard())
+        a.skills.remove(RedUFOSkill)
+        eq_(calc(a, AttackCard()).values(), [-1, 0, 1, 0])
+
+        a.disable_skill(RedUFOSkill, 'test')
+        a.skills.append(RedUFOSkill)
+        eq_(calc(a, AttackCard()).values(), [-1, 0, 1, 0])
+        a.reenable_skill('test')
+        eq_(calc(a, AttackCard()).values(), [-2, -1, 0, -1])
+
+        # death
+        c.dead = True
+        eq_(calc(a, AttackCard()).items(), [(a, -2), (b, -1), (d, -1)])
+
+        # cached results are copies
+        calc(a, AttackCard())[b] = 100
+        eq_(calc(a, AttackCard())[b], -1)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from gevent import socket
+from nose.tools import eq_
+import gevent
+
+# -- own --
+from endpoint import Endpoint
+
+
+# -- code --
+class TestQueuedEndpoint(object):
+
+    def setUp(self):
+        lsock = socket.socket()
+        lsock.bind(('127.0.0.1', 0))
+        lsock.listen(1)
+        c = socket.create_connection(lsock.getsockname())
+        s, addr = lsock.accept()
+        lsock.close()
+
+        self.server = Endpoint(s, addr, queued=True)
+        self.client = Endpoint(c, c.getsockname())
+
+    def tearDown(self):
+        self.server.close()
+        self.client.close()
+
+    def testBatching(self):
+        sent = []
+        sendall = self.server.sock.sendall
+
+        def counted_sendall(data):
+            sent.append(data)
+            return sendall(data)
+
+        self.server.sock.sendall = counted_sendall
+        for i in xrange(100):
+            self.server.write(['msg', i])
+
+        eq_(self.server.sendq_bytes > 0, True)
+        eq_([self.client.read() for i in xrange(100)], [['msg', i] for i in xrange(100)])
+        eq_(len(sent), 1)
+        eq_(self.server.sendq_bytes, 0)
+
+    def testCloseFlushes(self):
+        self.server.write(['bye', None])
+        self.server.close()
+        eq_(self.server.raw_write('dropped'), False)
+        eq_(self.client.read(), ['bye', None])
+
+    def testHighWatermark(self):
+        self.server.SENDQ_HIGH_WATERMARK = 64 * 1024
+        blob = 'x' * 4096
+        for i in xrange(1000):
+            self.server.write(['blob', blob])
+            if self.server.link_state != 'connected':
+                break
+
+            gevent.sleep(0)
+
+        eq_(self.server.link_state, 'disconnected')
+        assert self.server.sendq_peak > self.server.SENDQ_HIGH_WATERMARK
+
+
+class TestBulkEncoded(object):
+
+    def testMerge(self):
+        packets = [['gamedata', ['Sync:%d' % i, {'a': [i, u'测试']}]] for i in xrange(10)]
+        d = Endpoint.bulk_encoded([Endpoint.encode(p) for p in packets])
+        eq_(d, Endpoint.encode(packets, Endpoint.FMT_BULK_COMPRESSED))
+        eq_(Endpoint.decode(d), packets)
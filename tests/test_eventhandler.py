@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+import random
+
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+from game.base import EventHandler, EventHandlerGraph, EventHandlerGroup, GameError
+
+
+# -- code --
+class GroupHandler(EventHandlerGroup):
+    interested = ('evt',)
+
+
+class AHandler(EventHandler):
+    interested = ('evt',)
+    execute_after = ('DHandler', 'MissingHandler')
+
+
+class BHandler(EventHandler):
+    interested = ('evt',)
+    execute_before = ('AHandler',)
+
+
+class CHandler(EventHandler):
+    interested = ('evt',)
+    execute_after = ('BHandler',)
+
+
+class DHandler(EventHandler):
+    interested = ('evt',)
+
+
+class EHandler(EventHandler):
+    interested = ('evt',)
+    execute_before = ('DHandler',)
+    group = GroupHandler
+
+
+class FHandler(EventHandler):
+    interested = ('evt',)
+    group = GroupHandler
+
+
+class GHandler(EventHandler):
+    interested = ('evt',)
+    execute_after = ('FHandler',)
+    group = GroupHandler
+
+
+class XHandler(EventHandler):
+    interested = ('evt',)
+    execute_after = ('YHandler',)
+
+
+class YHandler(EventHandler):
+    interested = ('evt',)
+    execute_after = ('XHandler',)
+
+
+ALL = [AHandler, BHandler, CHandler, DHandler, EHandler, FHandler, GHandler]
+
+
+def names(l):
+    return [
+        (eh.__class__.__name__, names(eh.handlers)) if isinstance(eh, EventHandlerGroup) else eh.__class__.__name__
+        for eh in l
+    ]
+
+
+class TestEventHandlerGraph(object):
+
+    def testMakeList(self):
+        eq_(names(EventHandler.make_list(ALL)), [
+            'BHandler', 'CHandler', 'DHandler', ('GroupHandler', ['EHandler', 'FHandler', 'GHandler']), 'AHandler',
+        ])
+
+    def testIncremental(self):
+        rnd = random.Random(1)
+        for _ in xrange(50):
+            l = ALL[:]
+            rnd.shuffle(l)
+            expected = names(EventHandler.make_list(l))
+            g = EventHandlerGraph()
+            for cls in l:
+                g.add([cls])
+
+            eq_(names(g.handlers), expected)
+
+    def testKeepInstances(self):
+        g = EventHandlerGraph()
+        g.add([AHandler, FHandler])
+        a, grp = g.handlers
+        g.add([BHandler, GHandler])
+        assert a in g.handlers
+        assert grp in g.handlers
+        eq_(names(grp.handlers), ['FHandler', 'GHandler'])
+
+    def testCircular(self):
+        try:
+            EventHandler.make_list([XHandler, YHandler])
+        except GameError:
+            pass
+        else:
+            assert False, 'Should raise'
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from nose.tools import eq_, raises
+
+# -- own --
+from endpoint import EndpointDied
+from game.base import Gamedata
+
+
+# -- code --
+class TestGamedata(object):
+
+    def testExpect(self):
+        gd = Gamedata()
+        gd.feed(['I:ChooseOption:1', 1])
+        gd.feed(['RI:ChooseOption:2', 2])
+        gd.feed(['RI:ChooseOption:3', 3])
+        gd.feed(['Sync:4', 4])
+
+        eq_(list(gd.gexpect('Sync:4')), ['Sync:4', 4])
+        eq_(list(gd.gexpect('RI:ChooseOption:*')), ['RI:ChooseOption:2', 2])
+        gd.feed(['RI:ChooseOption:5', 5])
+        eq_(list(gd.gexpect('RI:ChooseOption:*')), ['RI:ChooseOption:3', 3])
+        eq_(list(gd.gexpect('RI:ChooseOption:*')), ['RI:ChooseOption:5', 5])
+        eq_(gd.gexpect('RI:ChooseOption:*', blocking=False), (None, Gamedata.NODATA))
+        eq_(list(gd.gexpect('I:ChooseOption:1')), ['I:ChooseOption:1', 1])
+        eq_(len(gd), 0)
+        eq_(gd.misses, 1)
+
+    def testEviction(self):
+        gd = Gamedata(evict_stale=True, maxlen=3)
+        for i in xrange(5):
+            gd.feed(['I:ChooseOption:%s' % i, i])
+
+        eq_(len(gd), 3)
+        eq_(gd.evictions, 2)
+        eq_(list(gd.gexpect('I:ChooseOption:4')), ['I:ChooseOption:4', 4])
+        eq_(len(gd), 0)
+        eq_(gd.evictions, 4)
+
+    def testEvictionSkipsUntagged(self):
+        gd = Gamedata(evict_stale=True)
+        gd.feed(['I:ChooseOption:1', 1])
+        gd.feed(['Notice', 'hello'])
+        gd.feed(['I:ChooseOption:2', 2])
+        gd.feed(['I:ChooseOption:3', 3])
+        gd.feed(['I:ChooseOption:4', 4])
+
+        eq_(list(gd.gexpect('I:ChooseOption:3')), ['I:ChooseOption:3', 3])
+        eq_(gd.evictions, 2)
+        eq_(len(gd), 2)
+        eq_(list(gd.gdqueue)[0][0], 'Notice')
+        eq_(list(gd.gexpect('Notice')), ['Notice', 'hello'])
+        eq_(list(gd.gexpect('I:ChooseOption:4')), ['I:ChooseOption:4', 4])
+        eq_(len(gd), 0)
+
+    @raises(EndpointDied)
+    def testBreak(self):
+        gd = Gamedata()
+        gd.feed(['I:ChooseOption:1', 1])
+        gd.gbreak()
+        gd.feed(['I:ChooseOption:2', 2])
+        eq_(list(gd.gexpect('I:ChooseOption:1')), ['I:ChooseOption:1', 1])
+        gd.gexpect('I:ChooseOption:2')
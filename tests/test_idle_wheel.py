@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+from utils.gevent_ext import IdleWheel
+
+
+# -- code --
+class Conn(object):
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+class TestIdleWheel(object):
+
+    def testExpire(self):
+        expired = []
+        wheel = IdleWheel(5, expired.append)
+        wheel.ticker = True  # drive it by hand
+
+        a, b, c = Conn('a'), Conn('b'), Conn('c')
+        for o in a, b, c:
+            wheel.add(o)
+
+        for i in xrange(3):
+            wheel.tick()
+
+        b.idle_since = wheel.now  # b sent something
+        c.idle_since = None       # c is busy handling a command
+
+        wheel.tick()
+        wheel.tick()
+        eq_(expired, [a])
+        eq_(len(wheel), 2)
+
+        for i in xrange(3):
+            wheel.tick()
+
+        eq_(expired, [a, b])
+
+        c.idle_since = wheel.now
+        wheel.discard(c)
+        for i in xrange(10):
+            wheel.tick()
+
+        eq_(expired, [a, b])
+        eq_(len(wheel), 0)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+
+
+# -- code --
+class TestListModel(object):
+
+    def view(self):
+        from client.ui.listmodel import ListItem, ListModel
+
+        class View(object):
+            columns = [('name', 100), ('state', 50)]
+            col_lookup = {'name': 0, 'state': 1}
+            model = ListModel(10)
+
+            def upsert(self, key, val):
+                li = self.model.get(key)
+                if li is None:
+                    li = self.model.add(ListItem(self, key))
+
+                li.data = val
+                return li
+
+        return View()
+
+    def keys(self, l):
+        return sorted(li.key for i, li in l)
+
+    def testLayout(self):
+        v = self.view()
+        m = v.model
+        for i in xrange(100):
+            v.upsert(i, ['user%d' % i, 'hang'])
+
+        eq_(m.visible(0, 45), (0, 5))
+        eq_(m.visible(995, 45), (99, 100))
+        eq_(m.max_view_y(45), 955)
+
+        build, drop, move, redraw = m.layout(0, 45)
+        eq_(self.keys(build), range(5))
+        eq_((drop, move, redraw), ([], [], []))
+
+        # nothing changed, nothing to do
+        eq_(m.layout(0, 45), ([], [], [], []))
+
+        # same data is not a change
+        v.upsert(1, ['user1', 'hang'])
+        eq_(m.layout(0, 45), ([], [], [], []))
+
+        v.upsert(1, ['user1', 'ingame'])
+        v.upsert(50, ['user50', 'ingame'])  # out of view
+        v.model.get(2)['state'] = 'ready'
+        build, drop, move, redraw = m.layout(0, 45)
+        eq_((build, drop, move), ([], [], []))
+        eq_(self.keys(redraw), [1, 2])
+        eq_(v.model.get(2).data, [u'user2', u'ready'])
+
+        # scroll by two rows
+        build, drop, move, redraw = m.layout(20, 45)
+        eq_(self.keys(build), [5, 6])
+        eq_(sorted(drop), [0, 1])
+        eq_((move, redraw), ([], []))
+
+        # removal shifts rows up
+        m.retain(range(3, 100))
+        build, drop, move, redraw = m.layout(20, 45)
+        eq_(self.keys(build), [7, 8, 9])
+        eq_(sorted(drop), [2, 3, 4])
+        eq_(self.keys(move), [5, 6])
+        eq_(m.position(5), 2)
+
+        m.remove(5)
+        eq_(m.position(5), None)
+        eq_(m.position(6), 2)
+
+    def testSort(self):
+        v = self.view()
+        m = v.model
+        for i in (3, 1, 2):
+            v.upsert(i, [str(i)])
+
+        m.layout(0, 100)
+        m.sort(key=lambda li: li.key)
+        eq_([li.key for li in m], [1, 2, 3])
+        build, drop, move, redraw = m.layout(0, 100)
+        eq_(sorted((i, li.key) for i, li in move), [(0, 1), (1, 2), (2, 3)])
+        eq_(m[0].data, [u'1', u''])
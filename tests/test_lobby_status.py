@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+from endpoint import Endpoint
+from server.core.lobby import LobbyStatus
+
+
+# -- code --
+class Obj(object):
+    def __init__(self, **kw):
+        self.d = kw
+
+    def __data__(self):
+        return self.d
+
+
+class TestLobbyStatus(object):
+
+    def testDelta(self):
+        st = LobbyStatus()
+        games = {1: Obj(id=1, nplayers=0)}
+        users = {10: Obj(state='hang'), 11: Obj(state='hang')}
+
+        ops = st.update(games=games, users=users)
+        eq_(st.version, 1)
+        eq_(len(ops), 3)
+
+        eq_(st.update(games=games, users=users), [])
+        eq_(st.version, 1)
+
+        games[1].d['nplayers'] = 1
+        users[10].d['state'] = 'inroomwait'
+        del users[11]
+        games[2] = Obj(id=2, nplayers=0)
+        ops = st.update(games=games, users=users)
+        eq_(st.version, 2)
+        eq_(sorted(ops), sorted([
+            ['games', 1, {'id': 1, 'nplayers': 1}],
+            ['games', 2, {'id': 2, 'nplayers': 0}],
+            ['users', 10, {'state': 'inroomwait'}],
+            ['users', 11, None],
+        ]))
+
+    def testSnapshot(self):
+        st = LobbyStatus()
+        games = {1: Obj(id=1, name=u'测试')}
+        users = {10: Obj(state='hang')}
+        st.update(games=games, users=users)
+
+        d = st.snapshot()
+        assert st.snapshot() is d
+
+        eq_(Endpoint.decode(d), [['lobby_snapshot', [1, [[1, {'id': 1, 'name': u'测试'}]], [[10, {'state': 'hang'}]]]]])
+
+        # snapshot reflects the versioned state, not unseen changes
+        games[1].d['name'] = u'changed'
+        eq_(Endpoint.decode(st.snapshot())[0][1][1], [[1, {'id': 1, 'name': u'测试'}]])
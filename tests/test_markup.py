@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+import random
+
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+
+
+# -- code --
+DEFAULT = {'color': (0, 0, 0, 255), 'shadow': (0, 0, 0, 0, 0), 'bold': False}
+
+
+class Document(object):
+    def __init__(self):
+        self.text = u''
+        self.styles = []
+        self.last = {}
+
+    def insert_text(self, start, text, attrib):
+        # like pyglet, inserted text takes the style before it
+        style = dict(self.styles[start - 1] if start else self.last)
+        style.update(attrib or {})
+        self.last = style
+        self.text = self.text[:start] + text + self.text[start:]
+        self.styles[start:start] = [style] * len(text)
+
+    def delete_text(self, start, end):
+        self.text = self.text[:start] + self.text[end:]
+        del self.styles[start:end]
+
+
+class TestMarkup(object):
+
+    def testRuns(self):
+        from client.ui.markup import markup_runs
+
+        def runs(text):
+            attrib = dict(DEFAULT)
+            return [(off, run, dict(attrib)) for off, run in markup_runs(text, attrib, DEFAULT)]
+
+        red = (0xff, 0x35, 0x35, 0xff)
+        eq_(runs(u'|Rred|r plain'), [
+            (2, u'red', dict(DEFAULT, color=red)),
+            (7, u' plain', DEFAULT),
+        ])
+        eq_(runs(u'a||b'), [(0, u'a', DEFAULT), (1, u'|', DEFAULT), (3, u'b', DEFAULT)])
+        eq_(runs(u'|c01020304|s2050607ff|Bx'), [
+            (23, u'x', dict(DEFAULT, color=(1, 2, 3, 4), shadow=(2, 5, 6, 7, 255), bold=True)),
+        ])
+        eq_(runs(u'|!Rx'), [(3, u'x', dict(DEFAULT, color=(255, 255, 255, 255), shadow=(2, 255, 0x35, 0x35, 255)))])
+        eq_(runs(u'|LBx|Hy')[1][2], dict(DEFAULT, color=(0, 0, 0, 255), shadow=(2, 0, 0, 0, 255)))
+
+        # unknown markup ends parsing, the rest is literal
+        eq_(runs(u'a|Zb|Rc'), [(0, u'a', DEFAULT), (1, u'|Zb|Rc', DEFAULT)])
+        eq_(runs(u'|c12'), [(0, u'|c12', DEFAULT)])
+
+    def testTrim(self):
+        from client.ui.markup import TextLog
+
+        doc = Document()
+        log = TextLog(doc, DEFAULT, max_lines=3)
+        log.append(u'|Rzero|r\n')
+        log.append(u'one\ntwo')
+        log.append(u' two||\n|Gthree|r\n')
+        eq_(doc.text, u'one\ntwo two|\nthree\n')
+
+        log.append(u'four\n')
+        eq_(doc.text, u'two two|\nthree\nfour\n')
+        eq_(len(log), len(doc.text))
+        eq_(doc.styles[doc.text.index(u'three')]['color'], (0x20, 0x80, 0x20, 0xff))
+
+        # document positions still map to the markup they came from
+        text = log.text
+        for loc, ch in enumerate(doc.text):
+            eq_(text[log.text_position(loc, left=False)], ch)
+
+        log.reset()
+        doc.text = u''
+        log.append(u'x')
+        eq_(log.text, u'x')
+        eq_(log.text_position(0), 0)
+
+    def testMany(self):
+        from client.ui.markup import TextLog
+
+        rnd = random.Random(1)
+        doc = Document()
+        log = TextLog(doc, DEFAULT, max_lines=50)
+        lines = []
+        for i in xrange(500):
+            line = u'|R%d|r says |B%s|b||\n' % (i, u'x' * rnd.randint(0, 5))
+            lines.append(line)
+            log.append(line)
+
+        eq_(doc.text.count(u'\n'), 50)
+        eq_(doc.text, u''.join(l.replace(u'|R', u'').replace(u'|r', u'').replace(u'|B', u'').replace(u'|b', u'').replace(u'||', u'|') for l in lines[-50:]))
+        assert len(log.raw) <= 51 and len(log.loc_table) <= 51 * 5
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+
+
+# -- code --
+class TestMatchIndex(object):
+
+    def testCandidates(self):
+        from game import autoenv
+        autoenv.init('Server')
+        from server.core.game_manager import ClientPlaceHolder, GameManager, MatchIndex
+        from thb import modes
+
+        idx = MatchIndex()
+
+        def room(gid, mode, taken):
+            m = GameManager(gid, modes[mode], u'room', False)
+            m.match_index = idx
+            m.users[:taken] = [object() for i in xrange(taken)]
+            idx.update(m)
+            return m
+
+        kof1 = room(1, 'THBattleKOF', 0)
+        id1 = room(2, 'THBattleIdentity', 7)
+        id2 = room(3, 'THBattleIdentity', 3)
+        kof2 = room(4, 'THBattleKOF', 1)
+        full = room(5, 'THBattleKOF', 2)
+        id3 = room(6, 'THBattleIdentity', 7)
+
+        eq_([m.gameid for m in idx.candidates()], [2, 6, 4, 1, 3])
+        eq_(list(idx.candidates('THBattleKOF')), [kof2, kof1])
+        eq_(list(idx.candidates('THBattleNewbie')), [])
+
+        id1.users[7] = object()
+        idx.update(id1)
+        id3.game_started = True
+        idx.discard(id3)
+        full.users[0] = ClientPlaceHolder
+        idx.update(full)
+        eq_(list(idx.candidates()), [kof2, full, kof1, id2])
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from nose.tools import eq_
+import gevent
+import msgpack
+
+# -- own --
+from endpoint import Endpoint
+
+
+# -- code --
+def unpack(s):
+    return msgpack.unpackb(s, encoding='utf-8')
+
+
+class TestPackedData(object):
+
+    def testClientAccount(self):
+        from game import autoenv
+        autoenv.init('Server')
+        from account import Account
+        from server.core.endpoint import DroppedClient
+
+        acc = Account.build_npc_account(u'测试')
+        cl = DroppedClient()
+        cl.account = acc
+        eq_(unpack(Endpoint.pack_data(cl)), unpack(Endpoint.encode(cl))[1])
+        eq_(unpack(Endpoint.pack_data(cl))['state'], 'left')
+
+        p = acc.__packed__()
+        assert acc.__packed__() is p
+        acc.other = dict(acc.other, title=u'新称号')
+        eq_(unpack(Endpoint.pack_data(cl))['account'][3]['title'], u'新称号')
+
+        eq_(
+            Endpoint.decode(Endpoint.encode_spliced('your_account', acc)),
+            ['your_account', Endpoint.decode(Endpoint.encode(acc))],
+        )
+
+    def testGameManager(self):
+        from game import autoenv
+        autoenv.init('Server')
+        from account import Account
+        from server.core.game_manager import GameManager
+        from thb import modes
+        from utils import BatchList
+
+        m = GameManager(1, modes['THBattleKOF'], u'房间', False)
+        p = m.__packed__()
+        assert m.__packed__() is p
+        eq_(unpack(p), unpack(Endpoint.encode(m))[1])
+
+        m.update_game_param({'meh': 1})
+        eq_(unpack(m.__packed__())['params']['meh'], 1)
+
+        # update_game_param notifies players in a throttled greenlet,
+        # let it finish here instead of in whatever test runs next
+        gevent.sleep(0.2)
+
+        m = GameManager(2, modes['THBattleKOF'], u'房间', False)
+        eq_(unpack(m.__packed__())['nplayers'], 0)
+
+        class User(object):
+            state     = 'inroomwait'
+            account   = Account.build_npc_account(u'测试')
+            observers = BatchList()
+            raw_write = write = lambda *a: None
+
+        m.users[0] = User()
+        eq_(unpack(m.__packed__())['nplayers'], 1)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+import time
+
+# -- third party --
+from nose.tools import eq_
+import gevent
+
+# -- own --
+from game.base import Action, EventHandler, Game
+from game.profiler import Profiler
+
+
+# -- code --
+class Busy(EventHandler):
+    interested = ('action_apply', 'action_before')
+
+    def handle(self, evt_type, act):
+        if evt_type == 'action_apply' and isinstance(act, Outer):
+            time.sleep(0.02)
+
+        return act
+
+
+class Inner(Action):
+    def apply_action(self):
+        gevent.sleep(0.05)  # switched out, not counted
+        return True
+
+
+class Outer(Action):
+    def apply_action(self):
+        time.sleep(0.02)
+        return Game.getgame().process_action(Inner(None, None))
+
+
+class TestProfiler(object):
+
+    def testProfile(self):
+        g = Game()
+        g.set_event_handlers([Busy()])
+        getgame = Game.__dict__['getgame']
+        Game.getgame = staticmethod(lambda: g)
+
+        p = Profiler()
+        orig = Game.process_action
+        p.start()
+        try:
+            g.process_action(Outer(None, None))
+        finally:
+            p.stop()
+            Game.getgame = getgame
+
+        eq_(Game.process_action, orig)
+
+        top = {k: (n, cum, own) for k, n, cum, own in p.top()}
+        eq_(top['Action:Outer'][0], 1)
+        eq_(top['EH:Busy'][0], 4)
+        assert 0.04 < top['Action:Outer'][1] < 0.07, top
+        assert 0.015 < top['Action:Outer'][2] < 0.03, top
+        assert top['Action:Inner'][1] < 0.01, top
+
+        lines = p.collapsed().splitlines()
+        assert 'Action:Outer;EH:Busy' in [l.split()[0] for l in lines]
@@ -51,6 +51,17 @@ class TestExchange(object):
         ]]
         s.commit()
 
+        # user 1 is online and served from the item cache, user 2 from the db
+        from server.item import backpack
+        from server.item.cache import cache
+        cache.owned.clear()
+        backpack.cache_user(1)
+
+    def tearDown(self):
+        from db.session import Session
+        from server.item.cache import cache
+        eq_(cache.inconsistencies(Session()), [])
+
     @transactional('new', isolation_level='READ_COMMITTED')
     def testExchange(self):
         from db.models import Exchange, User, Item
@@ -185,3 +196,40 @@ class TestExchange(object):
 
         with assert_raises(exceptions.InsufficientFunds):
             lottery.draw(1, 'jiecao')
+
+    def testItemCache(self):
+        from db.models import Item
+        from db.session import Session
+        from server.item import backpack
+        from server.item.cache import cache
+
+        eq_(cache.get(1), {1: 'foo'})
+        eq_(cache.get(2), None)
+
+        id = backpack.add(1, 'bar')
+        eq_(backpack.should_have(1, 'bar'), 1)
+        eq_(backpack.list(1), [{'id': id, 'sku': 'bar'}, {'id': 1, 'sku': 'foo'}])
+
+        @transactional('new')
+        def add_then_fail():
+            s = current_session()
+            item = Item(owner_id=1, sku='foo', status='backpack')
+            s.add(item)
+            s.flush()
+            cache.stage(s, 1, item.id, 'foo')
+            eq_(cache.count(s, 1), 3)
+            raise exceptions.BackpackFull
+
+        with assert_raises(exceptions.BackpackFull):
+            add_then_fail()
+
+        eq_(len(cache.get(1)), 2)
+
+        # the checker does notice
+        cache.get(1)[999] = 'foo'
+        eq_(len(cache.inconsistencies(Session())), 1)
+        del cache.get(1)[999]
+
+        backpack.uncache_user(1)
+        eq_(cache.get(1), None)
+        eq_(backpack.should_have(1, 'bar'), 1)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+
+
+# -- code --
+class TestSkillIndex(object):
+
+    def testHasSkill(self):
+        from game import autoenv
+        autoenv.init('Server')
+        from thb.cards import Skill, TreatAs
+        from thb.characters.baseclasses import Character
+
+        class Base(Skill):
+            pass
+
+        class Derived(Base):
+            pass
+
+        class Other(Skill):
+            pass
+
+        class Dummy(Character):
+            skills = [Derived]
+
+        def old_has_skill(c, skill):
+            if c.dead:
+                return False
+
+            if any(issubclass(skill, s) for l in c.disabled_skills.values() for s in l):
+                return False
+
+            return bool(c.get_skills(skill))
+
+        c = Dummy(object())
+        c.dead = False
+        c.skills = list(Dummy.skills)
+
+        def check():
+            for s in (Skill, TreatAs, Base, Derived, Other):
+                eq_(bool(c.has_skill(s)), old_has_skill(c, s), s)
+
+        check()
+        assert c.has_skill(Base) and not c.has_skill(Other)
+
+        c.skills.append(Other)
+        check()
+        assert c.has_skill(Other)
+
+        c.skills.remove(Other)
+        check()
+        assert not c.has_skill(Other)
+
+        c.skills.extend([Other])
+        c.disable_skill(Base, 'test')
+        check()
+        assert not c.has_skill(Derived) and c.has_skill(Other)
+
+        c.reenable_skill('test')
+        c.disable_skill(Derived, 'test')
+        check()
+        assert c.has_skill(Base) and not c.has_skill(Derived)
+
+        c.reenable_skill('test')
+        c.skills[:] = []
+        check()
+        assert not c.has_skill(Skill)
+
+        c.skills = [Derived]
+        check()
+        assert c.has_skill(Base)
+        c.skills += [Other]
+        check()
+        assert c.has_skill(Other)
+
+        c.dead = True
+        check()
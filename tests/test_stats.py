@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from nose.tools import eq_
+import gevent
+
+# -- own --
+from utils.stats import StatsSink, StubBackend
+
+
+# -- code --
+class FlakyBackend(StubBackend):
+    down = True
+
+    def send(self, events):
+        if self.down:
+            raise IOError('network down')
+
+        StubBackend.send(self, events)
+
+
+class TestStatsSink(object):
+
+    def testBatching(self):
+        sink = StatsSink(StubBackend())
+        sink.BATCH_SIZE = 10
+        sink.FLUSH_INTERVAL = 0.05
+
+        sink.add([{'event': i} for i in xrange(25)])
+        gevent.sleep(0.01)
+        eq_([len(b) for b in sink.backend.batches], [10, 10, 5])
+
+        sink.add([{'event': 'late'}])
+        gevent.sleep(0.01)
+        eq_(len(sink.backend.batches), 3)
+        gevent.sleep(0.1)
+        eq_(sink.backend.batches[-1], [{'event': 'late'}])
+        sink.worker.kill()
+
+    def testOutage(self):
+        sink = StatsSink(FlakyBackend())
+        sink.QUEUE_SIZE = 20
+        sink.BATCH_SIZE = 5
+        sink.MAX_BACKOFF = 0.01
+
+        for i in xrange(30):
+            sink.add([{'event': i}])
+            gevent.sleep(0)
+
+        gevent.sleep(0.05)
+        eq_(sink.dropped, 10)
+        eq_(len(sink.queue), 20)
+        assert sink.failed > 0
+        sink.worker.kill()
+
+        sink.backend.down = False
+        sink.flush()
+        eq_(sink.sent, 20)
+        eq_([e['event'] for b in sink.backend.batches for e in b], range(20))
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+from game.base import SyncPrimitive
+from .mock import MockConnection, hook_game
+
+
+# -- code --
+class TestSyncBatch(object):
+
+    def testRoundTrip(self):
+        from game import autoenv
+        autoenv.init('Server')
+        from server.core.game_server import Game, Player
+
+        g = Game()
+        hook_game(g)
+        conns = [MockConnection([]) for i in xrange(2)]
+        p1, p2 = [Player(c) for c in conns]
+
+        p1.reveal(1)
+        p2.reveal(2)
+        p1.reveal([3, 4])
+        p2.reveal(5)
+        eq_(conns[0].gdhistory, [])
+        g.flush_sync()
+        p1.reveal(6)
+        g.flush_sync()
+
+        eq_(conns[0].gdhistory, [['Sync:1', [[1, 1], [3, [3, 4]]]], ['Sync:5', [[5, 6]]]])
+        eq_(conns[1].gdhistory, [['Sync:2', [[2, 2], [4, 5]]]])
+
+        # client consumes batches, blocking on the first synctag of each
+        autoenv.init('Client')
+        from client.core.game_client import Game, PeerPlayer, TheChosenOne
+
+        g = Game()
+        hook_game(g)
+        me = TheChosenOne(MockConnection(conns[0].gdhistory[:]))
+        other = PeerPlayer()
+
+        l = [SyncPrimitive(0) for i in xrange(2)]
+        v1, v2, v5, v6 = [SyncPrimitive(0) for i in xrange(4)]
+        me.reveal(v1)
+        other.reveal(v2)
+        me.reveal(l)
+        other.reveal(v5)
+        eq_(len(me.server.gdlist), 1)
+        me.reveal(v6)
+        eq_(me.server.gdlist, [])
+        eq_([v1.value, l[0].value, l[1].value, v6.value], [1, 3, 4, 6])
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+from game import trace
+
+
+# -- code --
+class TestTraceBuffer(object):
+
+    def testWrapAround(self):
+        tb = trace.TraceBuffer(4)
+        eq_(list(tb), [])
+
+        for i in xrange(10):
+            tb.record('action_apply', 'Act%d' % i, i)
+
+        eq_([(ev, subj, st) for ev, subj, st, ts in tb], [
+            ('action_apply', 'Act%d' % i, i) for i in xrange(6, 10)
+        ])
+
+        lines = tb.dump().split('\n')
+        eq_(len(lines), 5)
+        eq_(lines[0], '... 6 earlier records overwritten')
+        assert lines[-1].endswith('action_apply     Act9')
+
+    def testDisabled(self):
+        trace.configure(0)
+        eq_(trace.new_buffer(), None)
+        trace.configure(16)
+        try:
+            eq_(trace.new_buffer().size, 16)
+        finally:
+            trace.configure(0)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+# -- stdlib --
+from types import FunctionType
+
+# -- third party --
+from nose.tools import eq_
+
+# -- own --
+
+
+# -- code --
+class TestUIMetaCache(object):
+
+    def testResolve(self):
+        from game import autoenv
+        autoenv.init('Server')
+        from thb.ui.ui_meta import common
+        import thb.ui.ui_meta  # noqa
+
+        for cls, d in common.metadata.items():
+            for name in [k for k in d if not k.startswith('__')] + ['no_such_attribute']:
+                expected = common.resolve(cls, name)
+                if isinstance(expected, FunctionType) and getattr(expected, '_is_property', False):
+                    continue  # evaluated on access
+
+                for i in xrange(2):
+                    if expected is common.MISSING:
+                        assert not hasattr(cls.ui_meta, name)
+                    else:
+                        eq_(getattr(cls.ui_meta, name), expected)
+
+    def testInvalidate(self):
+        from game import autoenv
+        autoenv.init('Server')
+        from thb.ui.ui_meta import common
+
+        class Base(object):
+            pass
+
+        class Derived(Base):
+            pass
+
+        module = type('module', (object,), {'Base': Base, 'Derived': Derived})
+        metafunc = common.gen_metafunc(module)
+        metafunc('Base', (), {'name': 'base'})
+
+        eq_(Derived.ui_meta.name, 'base')
+        metafunc('Derived', (), {'name': 'derived'})
+        eq_(Derived.ui_meta.name, 'derived')
+        eq_(Base.ui_meta.name, 'base')
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+# -- prioritized --
+import sys
+sys.path.append('../src')
+
+# -- stdlib --
+from argparse import ArgumentParser
+from collections import defaultdict, deque
+import time
+
+# -- third party --
+# -- own --
+from selfplay import create_game, run_game
+from thb.actions import DeadDropCards, DrawCards, DropCards, DropCardStage
+from thb.cards import AttackCard, CardList
+
+
+# -- code --
+parser = ArgumentParser(description='CardList membership: linear scan vs identity index')
+parser.add_argument('--mode', type=str, default='THBattleIdentity')
+parser.add_argument('--games', type=int, default=5)
+parser.add_argument('--seed', type=int, default=1)
+options = parser.parse_args()
+
+WATCHED = (DeadDropCards, DropCardStage, DropCards, DrawCards)
+
+indexed = {k: CardList.__dict__[k] for k in ('__contains__', 'remove')}
+
+
+def scan_contains(self, c):
+    return c in list(self)
+
+
+def scan_remove(self, c):
+    deque.remove(self, c)
+    self._discard(c)
+
+
+def use(name):
+    if name == 'scan':
+        # what CardList did before the index: equality scans over the deque
+        CardList.__contains__ = scan_contains
+        CardList.remove = scan_remove
+    else:
+        for k, v in indexed.items():
+            setattr(CardList, k, v)
+
+
+def micro(n=160, rounds=200):
+    cl = CardList(None, 'deckcard')
+    cards = [AttackCard(0, 0, cl) for i in xrange(n)]
+    for i, c in enumerate(cards):
+        c.sync_id = i + 1
+
+    begin = time.time()
+    for i in xrange(rounds):
+        cl.extend(cards)
+        [c.detached for c in cards]
+        for c in cards[::-1]:
+            c.detach()
+
+    return time.time() - begin
+
+
+def games():
+    stats = defaultdict(lambda: [0, 0.0])
+    for i in xrange(options.games):
+        g = create_game(options.mode, options.seed + i)
+        process_action = g.process_action
+
+        def timed_process_action(act, process_action=process_action):
+            if not isinstance(act, WATCHED):
+                return process_action(act)
+
+            begin = time.time()
+            try:
+                return process_action(act)
+            finally:
+                s = stats[act.__class__.__name__]
+                s[0] += 1
+                s[1] += time.time() - begin
+
+        g.process_action = timed_process_action
+        run_game(g)
+
+    return stats
+
+
+for name in ('scan', 'indexed'):
+    use(name)
+    print '%s: detach/detached on a %d card list: %.3fs' % (name, 160, micro())
+    for act, (n, t) in sorted(games().items()):
+        print '    %-20s n=%-6d avg=%.1fus' % (act, n, t / n * 1e6)
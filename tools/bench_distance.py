@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+# -- prioritized --
+import sys
+sys.path.append('../src')
+
+# -- stdlib --
+from argparse import ArgumentParser
+import time
+
+# -- third party --
+# -- own --
+from selfplay import create_game, run_game
+from thb.actions import LaunchCard
+
+
+# -- code --
+parser = ArgumentParser(description='LaunchCard.calc_distance: fresh vs cached')
+parser.add_argument('--mode', type=str, default='THBattleIdentity')
+parser.add_argument('--games', type=int, default=5)
+parser.add_argument('--seed', type=int, default=1)
+parser.add_argument('--check', action='store_true', help='cross check cached distances, report mismatches')
+parser.add_argument('--repeat', type=int, default=1, help='ask every distance this many times in a row, like the UI does on selection changes')
+options = parser.parse_args()
+
+cached = LaunchCard.__dict__['calc_distance']
+
+
+def use(name):
+    LaunchCard.calc_distance = LaunchCard._calc_distance if name == 'fresh' else cached
+
+
+def games():
+    calls = [0, 0.0]
+    calc_distance = LaunchCard.__dict__['calc_distance']
+
+    @classmethod
+    def timed_calc_distance(cls, source, card):
+        f = calc_distance.__get__(None, cls)
+        begin = time.time()
+        try:
+            for i in xrange(options.repeat - 1):
+                f(source, card)
+
+            return f(source, card)
+        finally:
+            calls[0] += options.repeat
+            calls[1] += time.time() - begin
+
+    LaunchCard.calc_distance = timed_calc_distance
+    begin = time.time()
+    try:
+        for i in xrange(options.games):
+            run_game(create_game(options.mode, options.seed + i))
+    finally:
+        LaunchCard.calc_distance = calc_distance
+
+    return calls[0], calls[1], time.time() - begin
+
+
+LaunchCard.DISTANCE_CACHE_CHECK = options.check
+for name in ('fresh', 'cached'):
+    use(name)
+    n, t, total = games()
+    print '%s: calc_distance n=%d avg=%.1fus total=%.3fs, games %.3fs' % (name, n, t / max(n, 1) * 1e6, t, total)
+
+options.check and sys.stdout.write('mismatches: %d\n' % LaunchCard.DISTANCE_CACHE_MISMATCHES)
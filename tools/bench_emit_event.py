@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# -- prioritized --
+import sys
+sys.path.append('../src')
+import options as opmodule
+opmodule.options.freeplay = True
+from game import autoenv
+autoenv.init('Server')
+
+# -- stdlib --
+from argparse import ArgumentParser
+from collections import defaultdict
+import logging
+import time
+
+# -- third party --
+# -- own --
+from selfplay import create_game, run_game
+from thb import modes
+
+# -- code --
+parser = ArgumentParser(description='Replay a self played game with both event dispatch paths')
+parser.add_argument('--mode', type=str, default='THBattleIdentity')
+parser.add_argument('--seed', type=int, default=7)
+parser.add_argument('--rounds', type=int, default=3)
+options = parser.parse_args()
+
+logging.basicConfig(level=logging.ERROR)
+
+
+def run(mode, seed, compiled, count):
+    modes[mode].COMPILED_DISPATCH = compiled
+    stats = defaultdict(int)
+    g = create_game(mode, seed)
+
+    def counted(handle):
+        def wrapper(evt_type, data):
+            stats['calls'] += 1
+            return handle(evt_type, data)
+        return wrapper
+
+    set_event_handlers = g.set_event_handlers
+
+    def set_event_handlers_counted(ehs):
+        for eh in ehs:
+            if 'handle' not in eh.__dict__:
+                eh.handle = counted(eh.handle)
+
+        set_event_handlers(ehs)
+
+    emit_event = g.emit_event
+
+    def emit_event_counted(evt_type, data):
+        stats['events'] += 1
+        return emit_event(evt_type, data)
+
+    if count:
+        g.set_event_handlers = set_event_handlers_counted
+        g.emit_event = emit_event_counted
+
+    game_end = g.game_end
+
+    def game_end_timed():
+        stats['end'] = time.time()
+        game_end()
+
+    g.game_end = game_end_timed
+
+    begin = time.time()
+    run_game(g)
+
+    return stats['events'], stats['calls'], stats.get('end', time.time()) - begin
+
+
+def report(name, compiled):
+    # counting wrappers skew timing, so count once and time separately
+    events, calls, _ = run(options.mode, options.seed, compiled, True)
+    elapsed = min(run(options.mode, options.seed, compiled, False)[2] for _ in xrange(options.rounds))
+    print '%-10s events=%-7d handler calls=%-8d calls/event=%.2f  events/sec=%.0f' % (
+        name, events, calls, float(calls) / events, events / elapsed,
+    )
+
+
+report('dynamic', False)
+report('compiled', True)
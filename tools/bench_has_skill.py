@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+# -- prioritized --
+import sys
+sys.path.append('../src')
+
+# -- stdlib --
+from argparse import ArgumentParser
+import time
+
+# -- third party --
+# -- own --
+from selfplay import create_game, run_game
+from thb.characters.baseclasses import Character
+
+
+# -- code --
+parser = ArgumentParser(description='Character.has_skill: linear scan vs skill index')
+parser.add_argument('--mode', type=str, default='THBattleIdentity')
+parser.add_argument('--games', type=int, default=5)
+parser.add_argument('--seed', type=int, default=1)
+options = parser.parse_args()
+
+indexed = Character.__dict__['has_skill']
+
+
+def scan_has_skill(self, skill):
+    # what has_skill did before the index
+    if self.dead:
+        return False
+
+    if any(issubclass(skill, s) for l in self.disabled_skills.values() for s in l):
+        return False
+
+    return self.get_skills(skill)
+
+
+def use(name):
+    Character.has_skill = scan_has_skill if name == 'scan' else indexed
+
+
+def games():
+    calls = [0, 0.0]
+    has_skill = Character.has_skill
+
+    def timed_has_skill(self, skill):
+        begin = time.time()
+        try:
+            return has_skill(self, skill)
+        finally:
+            calls[0] += 1
+            calls[1] += time.time() - begin
+
+    Character.has_skill = timed_has_skill
+    begin = time.time()
+    try:
+        for i in xrange(options.games):
+            run_game(create_game(options.mode, options.seed + i))
+    finally:
+        Character.has_skill = has_skill
+
+    return calls[0], calls[1], time.time() - begin
+
+
+for name in ('scan', 'indexed'):
+    use(name)
+    n, t, total = games()
+    print '%s: has_skill n=%d avg=%.2fus total=%.3fs, games %.3fs' % (name, n, t / n * 1e6, t, total)
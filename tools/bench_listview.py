@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+# -- prioritized --
+import sys
+sys.path.append('../src')
+
+# -- stdlib --
+from argparse import ArgumentParser
+import random
+import time
+
+# -- third party --
+# -- own --
+from client.ui.listmodel import ListItem, ListModel
+
+
+# -- code --
+parser = ArgumentParser(description='Lobby user list updates: rebuild vs keyed virtualized rows (headless)')
+parser.add_argument('--users', type=int, default=3000)
+parser.add_argument('--updates', type=int, default=100)
+parser.add_argument('--churn', type=float, default=0.03, help='fraction of users changing per update')
+parser.add_argument('--seed', type=int, default=1)
+options = parser.parse_args()
+
+STATES = ['hang', 'ingame', 'inroomwait', 'ready', 'observing']
+VIEW_HEIGHT = 420 - 24 - 2 - 10 - 25
+LINE_HEIGHT = 17
+
+
+class View(object):
+    # what ListView does, minus the pyglet labels
+    columns = [(u'玩家', 110), (u'UID', 56), (u'状态', 70)]
+    col_lookup = {}
+
+    def __init__(self):
+        self.model = ListModel(LINE_HEIGHT)
+
+    def upsert(self, key, val):
+        li = self.model.get(key)
+        if li is None:
+            li = self.model.add(ListItem(self, key))
+
+        li.data = val
+        return li
+
+
+def snapshots():
+    rnd = random.Random(options.seed)
+    users = {uid: rnd.choice(STATES) for uid in xrange(options.users)}
+    next_uid = options.users
+    for i in xrange(options.updates):
+        for uid in rnd.sample(users.keys(), int(len(users) * options.churn)):
+            r = rnd.random()
+            if r < 0.2:
+                del users[uid]
+                users[next_uid] = 'hang'
+                next_uid += 1
+            else:
+                users[uid] = rnd.choice(STATES)
+
+        yield [{'userid': uid, 'username': u'user%d' % uid, 'state': s} for uid, s in users.iteritems()]
+
+
+def rebuild():
+    # old ListView: clear() then append() every row, labels for all of them
+    labels = 0
+    begin = time.time()
+    for users in snapshots():
+        v = View()
+        users.sort(key=lambda u: u['userid'])
+        for u in users:
+            v.upsert(u['userid'], [u['username'], u['userid'], u['state']])
+
+        labels += len(v.model) * len(View.columns)
+
+    return labels, time.time() - begin
+
+
+def keyed():
+    v = View()
+    labels = 0
+    begin = time.time()
+    for users in snapshots():
+        for u in users:
+            v.upsert(u['userid'], [u['username'], u['userid'], u['state']])
+
+        v.model.retain([u['userid'] for u in users])
+        v.model.sort(key=lambda li: li.key)
+        build, drop, move, redraw = v.model.layout(0, VIEW_HEIGHT)
+        labels += (len(build) + len(redraw)) * len(View.columns)
+
+    return labels, time.time() - begin
+
+
+for name, f in (('rebuild', rebuild), ('keyed', keyed)):
+    labels, t = f()
+    print '%s: %d users, %d updates, %.1f labels/update, model %.2fms/update' % (
+        name, options.users, options.updates, float(labels) / options.updates, t / options.updates * 1e3,
+    )
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# -- prioritized --
+import sys
+sys.path.append('../src')
+import selfplay  # noqa, sets up server environment
+
+# -- stdlib --
+from argparse import ArgumentParser
+import random
+import time
+
+# -- third party --
+import gevent
+
+# -- own --
+from account import Account
+from server.core.endpoint import Client
+from server.core.game_manager import GameManager
+from server.core.lobby import Lobby
+from thb import modes
+from utils import BatchList
+
+
+# -- code --
+parser = ArgumentParser(description='Lobby refresh cost: __data__ re-encoding vs cached fragments')
+parser.add_argument('--users', type=int, default=5000)
+parser.add_argument('--games', type=int, default=300)
+parser.add_argument('--rounds', type=int, default=20)
+parser.add_argument('--churn', type=int, default=50, help='users changed per round')
+options = parser.parse_args()
+
+
+class BenchClient(Client):
+    def __init__(self, acc):
+        self.account = acc
+        self.state = 'hang'
+        self.lobby_version = None
+        self.sent = 0
+        self.observers = BatchList()
+
+    def raw_write(self, d):
+        self.sent += len(d)
+
+
+cached = {cls: cls.__dict__['__packed__'] for cls in (Account.__mro__[1], Client, GameManager)}
+send_account_info = Lobby.send_account_info
+
+
+def use(name):
+    if name == 'uncached':
+        # what the lobby did before: __data__ and a full encode per object and user
+        for cls in cached:
+            cls.__packed__ = None
+
+        Lobby.send_account_info = lambda self, user: user.write(['your_account', user.account])
+    else:
+        for cls, f in cached.items():
+            cls.__packed__ = f
+
+        Lobby.send_account_info = send_account_info
+
+
+GameManager.notify_playerchange = lambda self: None
+
+
+def build(rnd):
+    lobby = Lobby()
+    for i in xrange(options.users):
+        acc = Account.build_npc_account(u'玩家%d' % i)
+        acc.userid = i + 1
+        lobby.users[acc.userid] = BenchClient(acc)
+
+    names = sorted(modes)
+    for i in xrange(options.games):
+        m = GameManager(i + 1, modes[rnd.choice(names)], u'房间%d' % i, False)
+        m.users[0] = rnd.choice(lobby.users.values())
+        lobby.games[m.gameid] = m
+
+    return lobby
+
+
+def refresh(lobby, ul):
+    # Lobby.refresh_status without the throttle and interconnect,
+    # returns time spent diffing the lobby status
+    st = lobby.status
+    prev = st.version
+    begin = time.time()
+    ops = st.update(games=lobby.games, users=lobby.users)
+    t = time.time() - begin
+    delta = ops and Client.encode(['lobby_delta', [prev, st.version, ops]])
+    lobby.send_lobbyinfo(ul, delta and (prev, delta))
+    gevent.wait()  # let the send pool drain
+    return t
+
+
+def run(name):
+    use(name)
+    rnd = random.Random(1)
+    lobby = build(rnd)
+    ul = lobby.users.values()
+
+    begin = time.time()
+    refresh(lobby, ul)
+    initial = time.time() - begin
+
+    t = diff = 0.0
+    for i in xrange(options.rounds):
+        for u in rnd.sample(ul, options.churn):
+            u.state = rnd.choice(['hang', 'inroomwait'])
+
+        for m in rnd.sample(lobby.games.values(), 3):
+            m.update_game_param({})
+
+        begin = time.time()
+        diff += refresh(lobby, [u for u in ul if u.state == 'hang'])
+        t += time.time() - begin
+
+    n = options.rounds
+    print '%-9s initial: %.3fs  refresh: %.1fms avg, of which status diff %.1fms  sent: %dKB' % (
+        name, initial, t / n * 1000, diff / n * 1000, sum(u.sent for u in ul) / 1024,
+    )
+
+
+for name in ('uncached', 'cached'):
+    run(name)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+# -- prioritized --
+import sys
+sys.path.append('../src')
+import pyglet
+pyglet.options['shadow_window'] = False  # documents only, no GL needed
+
+# -- stdlib --
+from argparse import ArgumentParser
+import re
+import time
+
+# -- third party --
+from pyglet.text.document import FormattedDocument
+
+# -- own --
+from client.ui.markup import TextLog
+
+
+# -- code --
+parser = ArgumentParser(description='TextArea appends: scanner per call and unbounded text vs TextLog')
+parser.add_argument('--lines', type=int, default=4000)
+parser.add_argument('--every', type=int, default=1000)
+options = parser.parse_args()
+
+DEFAULT = dict(
+    font_size=9, font_name=u'AncientPix', bold=False, italic=False,
+    underline=None, color=(0, 0, 0, 255), shadow=(0, 0, 0, 0, 0),
+)
+
+
+class OldLog(object):
+    # what TextArea.append did before TextLog, minus the layout
+    def __init__(self, document):
+        self.document = document
+        self._text = u''
+        self.pos_table = []
+        self.loc_table = []
+
+    def append(self, text):
+        attrib = dict(DEFAULT)
+        doc = self.document
+        pos = len(self._text)
+
+        def set_attrib(entry, val):
+            def scanner_cb(s, tok):
+                attrib[entry] = val
+            return scanner_cb
+
+        def restore(s, tok):
+            attrib.update(DEFAULT)
+
+        def instext(s, tok):
+            tok = unicode(tok)
+            if s:
+                self.pos_table.append(pos + s.match.start())
+            else:
+                self.pos_table.append(pos + len(text) - len(tok))
+            self.loc_table.append(len(doc.text))
+            doc.insert_text(len(doc.text), tok, attrib)
+
+        def insert_pipe(s, tok):
+            instext(s, '|')
+
+        scanner = re.Scanner([
+            (r'[^|]+', instext),
+            (r'\|B', set_attrib('bold', True)),
+            (r'\|b', set_attrib('bold', False)),
+            (r'\|\|', insert_pipe),
+            (r'\|r', restore),
+            (r'\|R', set_attrib('color', (0xff, 0x35, 0x35, 0xff))),
+            (r'\|G', set_attrib('color', (0x20, 0x80, 0x20, 0xff))),
+            (r'\|LB', set_attrib('color', (0x90, 0xdc, 0xe8, 0xff))),
+        ])
+        toks, reminder = scanner.scan(text)
+        if reminder:
+            instext(None, reminder)
+
+        self._text += text
+
+
+for name, cls in (('old', OldLog), ('textlog', lambda doc: TextLog(doc, DEFAULT))):
+    log = cls(FormattedDocument(u''))
+    begin = time.time()
+    for i in xrange(1, options.lines + 1):
+        log.append(u'|LB[player%d]|r：|G消息|r 第%d行 ||ok\n' % (i % 8, i))
+        if i % options.every == 0:
+            t = time.time() - begin
+            print '%s: %6d lines, %.1fus/append over the last %d' % (name, i, t / options.every * 1e6, options.every)
+            sys.stdout.flush()
+            begin = time.time()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+# -- prioritized --
+import sys
+sys.path.append('../src')
+from game import autoenv
+autoenv.init('Client')
+
+# -- stdlib --
+from argparse import ArgumentParser
+import random
+import time
+
+# -- third party --
+# -- own --
+from thb.cards import AttackCard, Card
+from thb.characters.baseclasses import get_characters
+from thb.ui.ui_meta import common
+import thb.ui.ui_meta  # noqa
+
+
+# -- code --
+parser = ArgumentParser(description='ui_meta attribute access: base walk vs memoized')
+parser.add_argument('--frames', type=int, default=2000)
+parser.add_argument('--seed', type=int, default=1)
+options = parser.parse_args()
+
+memoized = common.UIMetaAccesser.__dict__['__getattr__']
+
+
+def walk_getattr(self, name):
+    # what UIMetaAccesser did before the memo
+    cls = self.cls
+    val = common.resolve(cls, name)
+    if val is common.MISSING:
+        raise AttributeError('%s.%s' % (cls.__name__, name))
+
+    if isinstance(val, common.FunctionType) and getattr(val, '_is_property', False):
+        val = val(self.obj or cls)
+
+    return val
+
+
+def use(name):
+    common.UIMetaAccesser.__getattr__ = walk_getattr if name == 'walk' else memoized
+
+
+def frame(chars, cards):
+    # roughly what an idle 8 player game reads every frame:
+    # portraits, skill buttons, hand cards, and optional attributes that miss
+    for c in chars:
+        m = c.ui_meta
+        m.name, m.port_image, getattr(m, 'figure_image_alter', None)
+        for s in c.skills:
+            s.ui_meta.name, getattr(s.ui_meta, 'clickable', None)
+
+    for c in cards:
+        m = c.ui_meta
+        m.name, m.image, getattr(m, 'sound_effect', None)
+
+
+rnd = random.Random(options.seed)
+chars = rnd.sample(get_characters('common', 'id8'), 8)
+cards = rnd.sample([c for c in Card.card_classes.values() if hasattr(c, 'ui_meta')], 10) + [AttackCard] * 5
+
+for name in ('walk', 'memoized'):
+    use(name)
+    begin = time.time()
+    for i in xrange(options.frames):
+        frame(chars, cards)
+
+    t = time.time() - begin
+    print '%s: %d frames %.3fs, %.1fus/frame' % (name, options.frames, t, t / options.frames * 1e6)
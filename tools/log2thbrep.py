@@ -7,13 +7,13 @@ sys.path.append('../src')
 # -- stdlib --
 from urlparse import urljoin
 import argparse
-import gzip
-import json
 
 # -- third party --
 # -- own --
 from client.core.replay import Replay
+from endpoint import Endpoint
 from game import autoenv
+from game.archive import REC_GAMEDATA, open_archive
 from settings import ACCOUNT_FORUMURL
 
 
@@ -34,47 +34,47 @@ def gen_fake_account(name, is_freeplay):
     return {'account': acc, 'state': 'ingame'}
 
 
-def main():
-    autoenv.init('Client')
-
-    parser = argparse.ArgumentParser('log2thbrep')
-    parser.add_argument('replay_file', help='Server side replay')
-    parser.add_argument('client_version', help='Desired client version (git commit)')
-    parser.add_argument('--freeplay', action='store_true', help='Use freeplay account module?')
-    options = parser.parse_args()
-
-    if options.replay_file.endswith('.gz'):
-        data = gzip.open(options.replay_file, 'r').read()
-    else:
-        data = open(options.replay_file, 'r').read()
-
-    data = data.decode('utf-8').split('\n')
-    names = data.pop(0)[2:].split(', ')  # Names
-    data.pop(0)  # Ver
-    gid = int(data.pop(0).split()[-1])  # GameId
-    data.pop(0)  # Time
-
-    game_mode, game_params, game_items, rnd_seed, usergdhist, gdhist = data
-    gdhist = json.loads(gdhist)
-    game_params = json.loads(game_params)
+def convert(archive, options):
+    hdr = archive.header
+    names = hdr['names']
 
     rep = Replay()
     rep.client_version = options.client_version
-    rep.game_mode = game_mode
-    rep.game_params = game_params
-    rep.game_items = json.loads(game_items)
+    rep.game_mode = hdr['mode']
+    rep.game_params = hdr['params']
+    rep.game_items = hdr['items']
     rep.users = [gen_fake_account(i, options.freeplay) for i in names]
 
-    assert len(names) == len(gdhist), [names, len(gdhist)]
+    for i in xrange(len(names)):
+        # one pass per player, only one player's gamedata in memory
+        rep.me_index = i
+        rep.gamedata = [
+            Endpoint.decode(rec[2])[1]
+            for rec in archive
+            if rec[0] == REC_GAMEDATA and rec[1] == i
+        ]
 
-    for i, gd in enumerate(gdhist):
-        fn = '%s_%s.thbrep' % (gid, i)
+        fn = '%s_%s.thbrep' % (hdr['gameid'], i)
         with open(fn, 'w') as f:
             print 'Writing %s...' % fn
-            rep.me_index = i
-            rep.gamedata = gd
             f.write(rep.dumps())
 
 
+def main():
+    autoenv.init('Client')
+
+    parser = argparse.ArgumentParser('log2thbrep')
+    parser.add_argument('replay_file', help='Server side replay')
+    parser.add_argument('client_version', help='Desired client version (git commit)')
+    parser.add_argument('--freeplay', action='store_true', help='Use freeplay account module?')
+    options = parser.parse_args()
+
+    archive = open_archive(options.replay_file)
+    try:
+        convert(archive, options)
+    finally:
+        archive.close()
+
+
 if __name__ == '__main__':
     main()
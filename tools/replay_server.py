@@ -6,9 +6,8 @@ autoenv.init('Server')
 
 # -- stdlib --
 from argparse import ArgumentParser
+from itertools import islice
 from weakref import WeakSet
-import gzip
-import json
 import logging
 import random
 import sys
@@ -21,7 +20,8 @@ import gevent
 # -- own --
 from account.freeplay import Account
 from endpoint import EndpointDied
-from game import Gamedata
+from game.archive import REC_USER_GAMEDATA, open_archive
+from game.base import Gamedata
 from server.core import Player, NPCPlayer, NPCClient
 from utils import BatchList
 
@@ -48,14 +48,21 @@ def ask_for_feed(player_index, tag):
 
     data = gdlist[0]
     if tuple(data[:2]) == (player_index, tag):
-        gdlist.pop(0)
+        gdlist[:] = islice(gditer, 1)
         return data[1:]
     elif (player_index, tag) not in gdlist_tag:
         return EndpointDied
     else:
         return None, Gamedata.NODATA
 
-gdlist = []
+
+def user_gamedata(archive):
+    for rec in archive:
+        if rec[0] == REC_USER_GAMEDATA:
+            yield rec[1:]
+
+gdlist = []  # lookahead of gditer
+gditer = iter(())
 gdlist_tag = set()
 
 
@@ -92,21 +99,18 @@ class MockClient(object):
     def gclear(self):
         pass
 
-if options.replay_file.endswith('.gz'):
-    data = gzip.open(options.replay_file, 'r').read().split('\n')
-else:
-    data = open(options.replay_file, 'r').read().split('\n')
-
-while data[0].startswith('#'):
-    print data.pop(0)
+archive = open_archive(options.replay_file)
+hdr = archive.header
+print hdr
 
-mode = data.pop(0)
-params = json.loads(data.pop(0))
-items = json.loads(data.pop(0))
-rndseed = long(data.pop(0))
+mode = hdr['mode']
+params = hdr['params']
+items = hdr['items']
+rndseed = long(hdr['rndseed'])
 
-gdlist = json.loads(data.pop(0))
-gdlist_tag = set(tuple(i[:2]) for i in gdlist)
+gdlist_tag = set(tuple(i[:2]) for i in user_gamedata(archive))
+gditer = user_gamedata(open_archive(options.replay_file))
+gdlist = list(islice(gditer, 1))
 print gdlist_tag
 
 from gamepack import gamemodes
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+# -- prioritized --
+import sys
+sys.path.append('../src')
+import options as opmodule
+opmodule.options.freeplay = True
+from game import autoenv
+autoenv.init('Server')
+
+# -- stdlib --
+from argparse import ArgumentParser
+from itertools import combinations
+from weakref import WeakSet
+import logging
+import random
+import time
+
+# -- third party --
+from gevent import Timeout, getcurrent
+import gevent
+
+# -- own --
+from game.base import GameEnded
+from server.core.endpoint import NPCClient
+from server.core.game_server import NPCPlayer
+from thb import modes
+from thb.inputlets import ActionInputlet, ChooseGirlInputlet, ChooseIndividualCardInputlet
+from thb.inputlets import ChooseOptionInputlet, ChoosePeerCardInputlet
+from utils import BatchList
+from utils.stats import StubBackend, sink
+
+
+# -- code --
+log = logging.getLogger('selfplay')
+sink.configure(StubBackend())  # keep game stats off the network
+
+# Modes with npc_players (THBattleNewbie) are scripted tutorials, the game
+# only moves on when the player does exactly what it asks. Random bots never
+# get through them.
+SELFPLAY_MODES = sorted(k for k, v in modes.items() if not v.npc_players)
+
+
+class RandomAnswerer(object):
+    '''
+    NPCPlayer input handler, answers inputlets with random but legal choices.
+    '''
+
+    def __init__(self, seed):
+        self.rnd = random.Random(seed)
+
+    def __call__(self, trans, ilet):
+        rnd = self.rnd
+        p = ilet.actor
+
+        if isinstance(ilet, ChooseOptionInputlet):
+            ilet.set_option(rnd.choice(list(ilet.options)))
+
+        elif isinstance(ilet, ChooseGirlInputlet):
+            l = [c for c in ilet.mapping.get(p, []) if not c.chosen]
+            l and ilet.set_choice(rnd.choice(l))
+
+        elif isinstance(ilet, ChooseIndividualCardInputlet):
+            ilet.cards and ilet.set_card(rnd.choice(list(ilet.cards)))
+
+        elif isinstance(ilet, ChoosePeerCardInputlet):
+            l = [c for cat in ilet.categories for c in getattr(ilet.target, cat)]
+            l and ilet.set_card(rnd.choice(l))
+
+        elif isinstance(ilet, ActionInputlet):
+            if rnd.random() < 0.1:
+                return
+
+            cards = [c for cat in ilet.categories or () for c in getattr(p, cat)]
+            alive = [i for i in autoenv.Game.getgame().players if not i.dead]
+            if ilet.categories:
+                cand = [[c] for c in cards] + [list(l) for l in combinations(cards, 2)]
+            else:
+                cand = [[]]
+
+            rnd.shuffle(cand)
+            for cl in cand[:30]:
+                tl = rnd.sample(alive, min(len(alive), rnd.choice([1, 1, 2]))) if ilet.candidates else []
+                if ilet.post_process(p, [[], cl, tl, {}]):
+                    ilet.set_result([], cl, tl)
+                    return
+
+
+def create_game(mode, seed):
+    '''
+    Server side game with every seat taken by a RandomAnswerer bot, pause disabled.
+    '''
+    # emit_event yields to the hub randomly, seed it too
+    random.seed(seed)
+
+    cls = modes[mode]
+    answerer = RandomAnswerer(seed)
+
+    g = cls()
+    g.players = BatchList([NPCPlayer(NPCClient(u'bot%d' % i), answerer) for i in xrange(cls.n_persons)])
+    g.gameid = 0
+    g.rndseed = seed
+    g.random = random.Random(seed)
+    g.gr_groups = WeakSet()
+    g.synctag = 0
+    g.pause = lambda t: None
+    g.game_params = {k: v[0] for k, v in cls.params_def.items()}
+
+    return g
+
+
+def run_game(g, timeout=None):
+    def main():
+        getcurrent().game = g
+        g.game = getcurrent()
+        try:
+            g.process_action(g.bootstrap(g.game_params, {}))
+        except GameEnded:
+            pass
+
+    gr = gevent.spawn(main)
+    with Timeout(timeout):
+        gr.join()
+
+    if gr.exception:
+        raise gr.exception
+
+
+class ActionTimer(object):
+    '''
+    Counts process_action calls and their self time (nested actions excluded).
+    '''
+
+    def __init__(self):
+        self.latencies = []
+        self.stack = []
+
+    def install(self, g):
+        process_action = g.process_action
+
+        def timed_process_action(act):
+            stack = self.stack
+            stack.append(0.0)  # time spent in nested actions
+            begin = time.time()
+            try:
+                return process_action(act)
+            finally:
+                elapsed = time.time() - begin
+                self.latencies.append(elapsed - stack.pop())
+                if stack:
+                    stack[-1] += elapsed
+
+        g.process_action = timed_process_action
+
+
+def percentile(l, p):
+    return l[int(round(p * (len(l) - 1)))] if l else 0.0
+
+
+def main():
+    parser = ArgumentParser(description='Headless bot-vs-bot games for engine benchmarking')
+    parser.add_argument('--mode', type=str, default='THBattleIdentity', choices=SELFPLAY_MODES)
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=60, help='Seconds per game')
+    options = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    timer = ActionTimer()
+    finished = failed = 0
+    begin = time.time()
+
+    for i in xrange(options.games):
+        g = create_game(options.mode, options.seed + i)
+        timer.install(g)
+        try:
+            run_game(g, options.timeout)
+            finished += 1
+        except Timeout:
+            log.error('Game %d (seed %d) timed out', i, options.seed + i)
+            failed += 1
+        except Exception:
+            log.exception('Game %d (seed %d) failed', i, options.seed + i)
+            failed += 1
+
+    elapsed = time.time() - begin
+    l = sorted(timer.latencies)
+
+    print '%s: %d games (%d failed) in %.2fs' % (options.mode, finished, failed, elapsed)
+    print 'games/sec:   %.2f' % (finished / elapsed)
+    print 'actions/sec: %.0f' % (len(l) / elapsed)
+    print 'action latency p50: %.1fus  p99: %.1fus' % (percentile(l, 0.5) * 1e6, percentile(l, 0.99) * 1e6)
+
+
+if __name__ == '__main__':
+    main()